@@ -1,14 +1,25 @@
 import streamlit as st
 import pandas as pd
 import os
+import memory_report # Imported first so tracemalloc (QUICKBITES_TRACEMALLOC=1) also sees the NLP model loads
 # from config import * # No longer needed if OPENWEATHERMAP_API_KEY was the only thing
 from utils import *  # For load_ratings, save_ratings, add_or_update_rating, get_user_ratings, load_smart_cart_rules
-from nlp_utils import analyze_sentiment_text, semantic_search, extract_food_preferences # Ensure these functions are well-defined
+from nlp_utils import analyze_sentiment_text, extract_food_preferences # Ensure these functions are well-defined
+import recommender
+from recommender import MENU_CSV_PATH, read_menu_data
+from filter_index import filter_index_for
+from autocomplete import prefix_index_for
+from combo_optimizer import build_combos
+import co_purchase
+import trending
+from config import DIET_PREFERENCE_OPTIONS, OCCASION_OPTIONS, MOOD_OPTIONS, WEATHER_CONDITION_OPTIONS, ADMIN_MODE
+from config import DIETARY_OPTIONS
+from config import GROUP_BASKET_SIZE
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import json
 from datetime import datetime, timedelta
 import uuid
 # import geocoder # Not used in this version
-from fuzzywuzzy import fuzz
 from fuzzywuzzy import process
 import re
 import logging
@@ -48,23 +59,14 @@ def load_menu_data():
     """Load menu data from CSV file and cache it in session_state."""
     if st.session_state.menu_df is None:
         try:
-            df = pd.read_csv('data/dummy_menu_dataset.csv')
+            df, missing_columns = read_menu_data(MENU_CSV_PATH)
             # Ensure essential columns exist
-            required_cols = ['Item', 'Price', 'Category', 'Restaurant', 'Is_Vegetarian', 'Tags']
-            for col in required_cols:
-                if col not in df.columns:
-                    st.error(f"Dataset missing essential column: '{col}'. Please add it to 'data/dummy_menu_dataset.csv'.")
-                    # Add placeholder column if missing to prevent immediate crash, but functionality will be limited
-                    if col == 'Tags':
-                         df[col] = "" # Empty string for tags
-                    elif col == 'Price':
-                        df[col] = 0.0
-                    else:
-                        df[col] = "Unknown"
+            for col in missing_columns:
+                st.error(f"Dataset missing essential column: '{col}'. Please add it to '{MENU_CSV_PATH}'.")
             st.session_state.menu_df = df
             return df
         except FileNotFoundError:
-            st.error("Error: 'data/dummy_menu_dataset.csv' not found. Please create it.")
+            st.error(f"Error: '{MENU_CSV_PATH}' not found. Please create it.")
             st.session_state.menu_df = pd.DataFrame() # Empty DataFrame
             return pd.DataFrame()
         except Exception as e:
@@ -97,6 +99,70 @@ def calculate_delivery_time():
     delivery_time = current_time + timedelta(minutes=random.randint(30, 45))
     return delivery_time.strftime("%I:%M %p")
 
+def count_fragment_run():
+    """Count fragment-scoped reruns (read by ui_loadtest.py); full script runs are counted in main()."""
+    ctx = get_script_run_ctx()
+    if ctx is not None and getattr(ctx, 'fragment_ids_this_run', None):
+        st.session_state.fragment_run_count = st.session_state.get('fragment_run_count', 0) + 1
+
+
+def find_cart_item(item_name, item_restaurant):
+    """Return (index, cart item) for an (Item, Restaurant) pair, or (-1, None) if it is not in the cart."""
+    for idx, cart_item in enumerate(st.session_state.cart):
+        if cart_item['Item'] == item_name and cart_item.get('Restaurant') == item_restaurant:
+            return idx, cart_item
+    return -1, None
+
+
+def add_to_cart(item_dict):
+    """Widget callback: add one unit of item_dict to the cart in place."""
+    idx, cart_item = find_cart_item(item_dict.get('Item'), item_dict.get('Restaurant'))
+    if cart_item:
+        cart_item['quantity'] += 1
+        return
+    item_copy = item_dict.copy()
+    item_copy['quantity'] = 1
+    st.session_state.cart.append(item_copy)
+
+
+def change_cart_quantity(item_name, item_restaurant, delta):
+    """Widget callback: change a cart item's quantity in place, removing it when it drops to zero."""
+    idx, cart_item = find_cart_item(item_name, item_restaurant)
+    if cart_item is None:
+        return
+    if cart_item['quantity'] + delta > 0:
+        cart_item['quantity'] += delta
+    else:
+        st.session_state.cart.pop(idx)
+
+
+def add_combo_to_cart(combo):
+    """Widget callback: add every item of a meal combo, one unit per person."""
+    for item_dict in combo['items']:
+        for _ in range(combo['party_size']):
+            add_to_cart(item_dict)
+
+
+def add_basket_to_cart(basket):
+    """Widget callback: add every item of a group basket."""
+    for item_dict in basket['items']:
+        for _ in range(item_dict.get('quantity', 1)):
+            add_to_cart(item_dict)
+
+
+def use_query_suggestion(suggestion):
+    """Widget callback: put an autocomplete suggestion in the search box."""
+    st.session_state.user_query = suggestion
+    st.session_state.pop("user_query_input_main_page", None)  # Re-created with the new value
+
+
+def remove_from_cart(item_name, item_restaurant):
+    """Widget callback: drop an item from the cart."""
+    idx, cart_item = find_cart_item(item_name, item_restaurant)
+    if cart_item is not None:
+        st.session_state.cart.pop(idx)
+
+
 def display_cart_icon():
     """Display floating cart icon with item count"""
     cart_count = len(st.session_state.cart)
@@ -113,7 +179,11 @@ def display_cart_icon():
     )
 
 def display_cart():
-    """Display cart contents in sidebar, including Smart Cart Suggestions"""
+    """
+    Display cart contents in sidebar, including Smart Cart Suggestions.
+    Not a fragment: the cart icon and the item cards show the same cart, so a cart click
+    reruns the page once (its callback has already updated the cart) and redraws them all.
+    """
     st.markdown("### 🛒 Your Cart")
 
     if not st.session_state.cart:
@@ -121,10 +191,6 @@ def display_cart():
         return
 
     total = 0.0
-    cart_item_details = [] # To store (name, restaurant) for smart cart check
-
-    for item in st.session_state.cart:
-        cart_item_details.append((item['Item'], item.get('Restaurant')))
 
     for idx, item in enumerate(st.session_state.cart):
         col1, col2 = st.columns([3, 1])
@@ -137,9 +203,7 @@ def display_cart():
         with col2:
             # More robust key for removal
             remove_key = f"remove_{item.get('Restaurant','')}_{item['Item']}_{idx}".replace(" ","_")
-            if st.button("❌", key=remove_key):
-                st.session_state.cart.pop(idx)
-                st.rerun()
+            st.button("❌", key=remove_key, on_click=remove_from_cart, args=(item['Item'], item.get('Restaurant')))
         total += item_total
 
     st.markdown("---")
@@ -150,65 +214,36 @@ def display_cart():
         # Clear other views
         st.session_state.view_order_history = False
         st.session_state.show_order_details = False
-        st.rerun()
+        st.rerun() # Rerun so the main area, drawn before the sidebar, switches to payment
 
     # --- Smart Cart Suggestions ---
     st.markdown("---")
     st.markdown("#### 🤔 You might also like:")
-    smart_cart_rules = load_smart_cart_rules()
     menu_df = load_menu_data() # Already loaded, but get the DataFrame
-    suggestions_made = 0
 
     if menu_df.empty:
         st.caption("Menu data not available for suggestions.")
         return
 
-    # Create a set of items already in cart for quick lookup (Item Name, Restaurant Name)
-    cart_item_identifiers = set((ci_name, ci_rest) for ci_name, ci_rest in cart_item_details)
-
-    for cart_item_name_in_cart, _ in cart_item_details: # Iterate over items in cart
-        if suggestions_made >= 3: break
-
-        matched_rule_key = None
-        # Fuzzy match against rule keys
-        for rule_key in smart_cart_rules.keys():
-            if fuzz.partial_ratio(cart_item_name_in_cart.lower(), rule_key.lower()) > 85:
-                matched_rule_key = rule_key
-                break
-        
-        if matched_rule_key:
-            for suggested_item_name in smart_cart_rules[matched_rule_key]:
-                if suggestions_made >= 3: break
-
-                # Find the suggested item in the menu (any restaurant offering it)
-                # Check if any variant of this suggested_item_name is already in cart
-                is_suggested_item_name_in_cart_already = any(
-                    s_item_name == suggested_item_name for s_item_name, _ in cart_item_identifiers
-                )
-                if is_suggested_item_name_in_cart_already:
-                    continue
-
-                # Find actual item from menu
-                suggested_item_df_matches = menu_df[menu_df['Item'].str.contains(suggested_item_name, case=False, na=False)]
-                if not suggested_item_df_matches.empty:
-                    item_to_suggest = suggested_item_df_matches.iloc[0].to_dict() # Pick first match
-
-                    # Final check: ensure this specific (Item, Restaurant) combo is not in cart
-                    suggested_item_key_for_cart_check = (item_to_suggest['Item'], item_to_suggest.get('Restaurant'))
-                    if suggested_item_key_for_cart_check not in cart_item_identifiers:
-                        col_sugg_name, col_sugg_add = st.columns([3,1])
-                        with col_sugg_name:
-                            sugg_price = float(item_to_suggest.get('Price', 0))
-                            st.write(f"<small>{item_to_suggest['Item']} (₹{sugg_price:.2f})</small>", unsafe_allow_html=True)
-                        with col_sugg_add:
-                            smart_add_key = f"smart_add_{item_to_suggest.get('Restaurant','')}_{item_to_suggest['Item']}_{suggestions_made}".replace(" ","_")
-                            if st.button("➕ Add", key=smart_add_key):
-                                item_copy = item_to_suggest.copy()
-                                item_copy['quantity'] = 1
-                                st.session_state.cart.append(item_copy)
-                                st.rerun()
-                        suggestions_made += 1
-    if suggestions_made == 0 and st.session_state.cart: # Only show if cart not empty
+    # Suggestions depend only on which items are in the cart, so reuse them across quantity changes and reruns
+    cart_signature = tuple((item['Item'], item.get('Restaurant')) for item in st.session_state.cart)
+    cached_suggestions = st.session_state.get('smart_cart_suggestions')
+    if cached_suggestions and cached_suggestions[0] == cart_signature:
+        suggestions = cached_suggestions[1]
+    else:
+        smart_cart_rules = load_smart_cart_rules()
+        suggestions = get_smart_cart_suggestions(st.session_state.cart, menu_df, smart_cart_rules, max_suggestions=3,
+                                                 learned_complements=co_purchase.model().complements)
+        st.session_state.smart_cart_suggestions = (cart_signature, suggestions)
+    for suggestion_idx, item_to_suggest in enumerate(suggestions):
+        col_sugg_name, col_sugg_add = st.columns([3,1])
+        with col_sugg_name:
+            sugg_price = float(item_to_suggest.get('Price', 0))
+            st.write(f"<small>{item_to_suggest['Item']} (₹{sugg_price:.2f})</small>", unsafe_allow_html=True)
+        with col_sugg_add:
+            smart_add_key = f"smart_add_{item_to_suggest.get('Restaurant','')}_{item_to_suggest['Item']}_{suggestion_idx}".replace(" ","_")
+            st.button("➕ Add", key=smart_add_key, on_click=add_to_cart, args=(item_to_suggest,))
+    if not suggestions and st.session_state.cart: # Only show if cart not empty
         st.caption("No specific suggestions right now.")
 
 
@@ -388,6 +423,7 @@ def process_order(total, payment_method):
 
     order = {
         'order_id': order_id,
+        'user_id': st.session_state.user_id, # For the taste profile (taste_profile.py)
         'items': st.session_state.cart.copy(), # Critical: copy the cart
         'total': total,
         'delivery_partner': delivery_partner,
@@ -400,6 +436,7 @@ def process_order(total, payment_method):
     }
 
     st.session_state.order_history.append(order)
+    record_order(order) # Learned co-purchase complements (co_purchase.py)
     st.session_state.cart = [] # Clear the cart
     st.session_state.show_payment = False
     st.session_state.show_order_details = True
@@ -448,7 +485,11 @@ def display_order_details():
         st.rerun()
 
 def display_swipe_card(item_dict, index_key_suffix):
-    """Display a food item card with quantity controls. item_dict is a dictionary."""
+    """
+    Display a food item card with quantity controls. item_dict is a dictionary.
+    Cart buttons update st.session_state.cart in place via callbacks, so a click costs one
+    page run, which also redraws the sidebar cart and the cart icon.
+    """
     if not isinstance(item_dict, dict):
         st.error(f"Invalid item format: {item_dict}")
         return
@@ -473,213 +514,67 @@ def display_swipe_card(item_dict, index_key_suffix):
         with col_price_info:
             st.markdown(f"**Price:** ₹{item_price:.2f}")
             if item_discount and float(item_discount) > 0:
-                st.markdown(f"**Discount:** {item_discount}%")
+                st.markdown(f"**Discount:** {float(item_discount):g}%")
 
         with col_cart_controls: # This is now our primary column for all cart actions
             if 'cart' not in st.session_state: st.session_state.cart = []
 
-            cart_item_index = -1
-            found_cart_item = None
-            for idx, cart_item_loop in enumerate(st.session_state.cart):
-                if cart_item_loop['Item'] == item_name and cart_item_loop.get('Restaurant') == item_restaurant:
-                    cart_item_index = idx
-                    found_cart_item = cart_item_loop
-                    break
+            cart_item_index, found_cart_item = find_cart_item(item_name, item_restaurant)
 
             if cart_item_index == -1: # Item not in cart
-                if st.button("Add to Cart", key=f"add_{item_identifier_key}", type="primary", use_container_width=True):
-                    item_copy = item_dict.copy()
-                    item_copy['quantity'] = 1
-                    st.session_state.cart.append(item_copy)
-                    st.rerun()
+                st.button("Add to Cart", key=f"add_{item_identifier_key}", type="primary", use_container_width=True,
+                          on_click=add_to_cart, args=(item_dict,))
             else: # Item is in cart, show quantity controls
-                # --- MODIFIED PART: Use st.columns HERE for the +/- buttons and quantity display ---
-                # This is the first level of nesting within col_cart_controls, which is allowed.
-                # We removed the col1_price, col2_controls structure that was causing the double nesting.
-                # Now, the structure is:
-                # main_page_columns (rec_cols)
-                #  -> col_cart_controls (within display_swipe_card)
-                #     -> (button_minus, qty_display, button_plus) using st.columns - THIS IS FINE.
-
-                # The issue was likely:
-                # main_page_columns (rec_cols)
-                #  -> one_of_rec_cols (e.g. rec_cols[0])
-                #     -> col1_price, col2_controls (from display_swipe_card's first st.columns)
-                #        -> col2_controls (which IS a column)
-                #           -> col_minus, col_qty, col_plus (SECOND st.columns INSIDE a column) - THIS WAS THE PROBLEM.
-
-                # Let's re-evaluate the structure. The original structure was:
-                # rec_cols[i % num_cols_rec] (This is a column)
-                #   WITHIN THIS: display_swipe_card is called.
-                #   display_swipe_card:
-                #     st.container(border=True)
-                #       col1_price, col2_controls = st.columns([2, 1.5]) # First level of columns *inside the container*, NOT directly inside rec_cols[i]
-                #       with col2_controls: # This is a column from the above line
-                #         col_minus, col_qty, col_plus = st.columns([1, 1, 1]) # This is nested.
-
-                # The key is that `with col2_controls:` makes the current context a column.
-                # So, `st.columns` inside it is a nested column.
-
-                # --- Corrected approach for quantity controls ---
-                # We are ALREADY inside `col_cart_controls`. We can lay out elements horizontally
-                # using Streamlit's natural flow or with a bit of HTML for precise control if needed.
-                # For simplicity, let's use three separate elements that will flow.
-                # If `col_cart_controls` is narrow, they might stack. If wider, they might go side-by-side.
-                # To force side-by-side, we might need a sub-column here IF col_cart_controls itself wasn't already a column
-                # generated from the main page.
-
-                # The error occurs because the `with rec_cols[i % num_cols_rec]:` in main()
-                # establishes a column context. Then `display_swipe_card` is called.
-                # Inside `display_swipe_card`, `col1_price, col2_controls = st.columns(...)`
-                # is the *first level of nesting*.
-                # Then, `with col2_controls:` you are inside one of *those* columns.
-                # So, `st.columns([1,1,1])` inside `col2_controls` is the *second level of nesting*.
-
-                # Let's simplify `display_swipe_card` to have only ONE `st.columns` call AT ITS TOP LEVEL.
-                # All subsequent layout will happen within those top-level columns.
-
-                # Simplification: Assume col_cart_controls is where all controls go.
-                # We can't use st.columns again directly here for the +/-/qty.
-                # We can use st.button and st.markdown in sequence. They will flow based on col_cart_controls width.
-                # To get them on one line if space allows, we can try putting them in a container
-                # or just let them flow.
-
-                # Let's try placing them sequentially inside col_cart_controls.
-                # If you need them strictly horizontal and compact, this might not be perfect.
-                
-                # --- Attempt 1: Sequential elements in col_cart_controls ---
-                # This will likely stack them vertically if col_cart_controls is narrow.
-
-                # --- Attempt 2: Use a sub-column structure if absolutely needed,
-                # but this requires the parent (col_cart_controls) to NOT be a column itself,
-                # or for this to be the *only* level of column nesting from its parent.
-
-                # The core issue:
-                # main.py: `rec_cols = st.columns(num_cols_rec)`
-                # `with rec_cols[i % num_cols_rec]:` (CONTEXT A = COLUMN)
-                #    `display_swipe_card(...)`
-                #       `display_swipe_card`: `col1, col2 = st.columns(...)` (CONTEXT B = COLUMN, NESTED IN A)
-                #          `with col2:` (CONTEXT C = STILL WITHIN COLUMN B)
-                #             `st.columns(...)` (TRYING TO NEST COLUMNS AGAIN WITHIN C - ERROR)
-
-                #Revised display_swipe_card to avoid the double nesting of st.columns
-                #We will have one st.columns call at the top of the card for price and controls.
-                #The quantity controls will be laid out within the 'controls' column without a further st.columns call.
-
-                # If we want the +/- buttons and quantity to be horizontal *within* col_cart_controls,
-                # we must ensure col_cart_controls itself isn't already a column that's nested.
-                #
-                # The structure in main.py:
-                # `rec_cols = st.columns(num_cols_rec)`
-                # `with rec_cols[i % num_cols_rec]:` -> This makes the current DeltaGenerator a column.
-                #    `display_swipe_card(...)` is called.
-                #
-                # Inside `display_swipe_card(item_dict, index_key_suffix)`:
-                # `with st.container(border=True):` -> Good, containers don't count as column nesting level for st.columns
-                #    `col_price_info, col_cart_controls = st.columns([0.6, 0.4])` -> This is fine, 1st level of columns INSIDE the container.
-                #    `with col_cart_controls:` -> Now we are inside a column.
-                #       `if cart_item_index == -1: ... else: ...`
-                #          IF WE DO `st.columns` here for +/-/qty, IT'S A NESTED COLUMN.
-                #
-                # Solution: Place buttons and text for quantity sequentially in `col_cart_controls`
-                # or use HTML/Markdown for layout if precise horizontal alignment is critical.
-
-                # Let's use a more manual horizontal layout with st.columns, but carefully.
-                # The problem is that the `col_cart_controls` is ALREADY a column.
-                # The simplest way to get horizontal layout for a few small elements is often
-                # to use multiple `st.button` calls within a single, wider column, and they will
-                # try to fit side-by-side if space allows, or wrap.
-                # For explicit control, we can use Markdown with HTML, but let's try to avoid that.
-
-                # If we want the "Add to Cart" button OR the "+/-/qty" controls:
-                # `col_cart_controls` is the column where these should live.
-
-                # Let's make the quantity controls directly within `col_cart_controls`
-                # We can have one row for the buttons, and the quantity above/below or let them flow.
-
-                # Alternative structure for quantity controls inside `col_cart_controls`
-                # This places them sequentially. They will flow based on the width of `col_cart_controls`.
-                # If col_cart_controls is wide enough, they might appear somewhat horizontal.
-                
-                # To make them appear more like a single control unit:
-                # We can use st.columns for the +/- buttons and quantity display *if*
-                # the PARENT of these columns (i.e., the context where we call st.columns for them)
-                # is NOT itself a column that has already been nested.
-                #
-                # The issue is that `rec_cols[i % num_cols_rec]` IS A COLUMN.
-                # And then `col_cart_controls` IS A COLUMN NESTED INSIDE IT.
-                # So, we cannot use `st.columns` again for the quantity controls inside `col_cart_controls`.
-
-                # **Revised Logic for Quantity Controls (No further `st.columns`)**
-                # We are inside `col_cart_controls`. Let's lay out elements.
-                # This might not look perfectly like [ - QTY + ] horizontally if col_cart_controls is too narrow.
-                
-                # One approach: use a sub-container if that helps Streamlit's layout engine,
-                # but containers don't directly solve the column nesting.
-
-                # The most robust way if you need fine-grained horizontal layout for the quantity
-                # controls *inside* an already nested column (`col_cart_controls`) is often
-                # to use `st.markdown` with custom HTML and CSS (e.g., using flexbox).
-                #
-                # However, let's try a simpler approach first by just placing them.
-                # Streamlit's layout might be good enough.
-
-                # Let's try placing button, then quantity, then button.
-                # This will likely stack them if col_cart_controls is narrow.
-                # For a horizontal layout, they ideally need to be in their own columns,
-                # but that's what's causing the error.
-
-                # --- Final Attempt at a clean structure for quantity controls ---
-                # We are inside `col_cart_controls`.
-                # Let's try to use HTML for the quantity controls to ensure they are on one line.
-                
-                # Build HTML for the quantity controls
-                button_style = "padding: 0.25rem 0.5rem; margin: 0 2px; border-radius: 5px; border: 1px solid #ccc; background-color: #f0f0f0; cursor: pointer;"
-                qty_style = "padding: 0.25rem 0.5rem; font-weight: bold; margin: 0 5px;"
-
-                # We need to trigger Streamlit buttons for the actions.
-                # So, we still need st.button. HTML is only for visual grouping if st.columns fails.
-
-                # The error is quite specific. `st.columns` cannot be nested that deep.
-                # The problem is that `rec_cols[i % num_cols_rec]` is a column.
-                # `col_cart_controls` is a column *within* that.
-                # Calling `st.columns` again for `col_minus, col_qty, col_plus` is the forbidden second level of nesting.
-
-                # **Corrected structure for display_swipe_card:**
-                # The `st.columns` for `col_price_info` and `col_cart_controls` is the *only* `st.columns` call
-                # directly within the `st.container` of the card.
-                # The quantity controls (+/-/qty) must be laid out *within* `col_cart_controls`
-                # *without* using another `st.columns` call.
-
-                # Simple sequential layout within col_cart_controls:
-                if st.button("➖", key=f"minus_{item_identifier_key}"):
-                    if found_cart_item['quantity'] > 1:
-                        found_cart_item['quantity'] -= 1
-                    else:
-                        st.session_state.cart.pop(cart_item_index)
-                    st.rerun()
+                # col_cart_controls is already nested inside the page's recommendation columns,
+                # so the controls are laid out sequentially rather than with another st.columns.
+                st.button("➖", key=f"minus_{item_identifier_key}",
+                          on_click=change_cart_quantity, args=(item_name, item_restaurant, -1))
 
                 # Display quantity next to the minus button
-                # Use st.markdown for better control over display if needed, or just st.write
                 st.markdown(f"<div style='display: inline-block; padding: 0.3rem 0.5rem; text-align: center; font-weight: bold;'>{found_cart_item['quantity']}</div>", unsafe_allow_html=True)
-                # st.write(f"{found_cart_item['quantity']}") # Simpler alternative
 
-                if st.button("➕", key=f"plus_{item_identifier_key}"):
-                    found_cart_item['quantity'] += 1
-                    st.rerun()
-                
-                # This sequential layout might not be perfectly horizontal.
-                # If col_cart_controls is narrow, they will stack.
-                # If you absolutely need them horizontal in a compact way,
-                # you'd typically use st.columns for them, but that's what's failing.
-                # The alternative is custom HTML/CSS with st.markdown.
+                st.button("➕", key=f"plus_{item_identifier_key}",
+                          on_click=change_cart_quantity, args=(item_name, item_restaurant, 1))
+
+
+def rate_item(item_name, item_restaurant, rating_value):
+    """Widget callback: store a rating (0 clears it) and update the session's copy of the user's ratings."""
+    add_or_update_rating(st.session_state.user_id, item_name, item_restaurant, rating_value)
+    st.session_state.user_ratings[(item_name, item_restaurant)] = rating_value
+    if rating_value:
+        st.toast(f"You rated '{item_name}' ({item_restaurant}) {rating_value} stars!")
+    else:
+        st.toast(f"Rating for '{item_name}' ({item_restaurant}) cleared.")
+
+
+@st.fragment
+def display_item_rating(order_id, item_name, item_restaurant, order_idx):
+    """Star rating widget for one ordered item; runs as a fragment so a click reruns only this row."""
+    count_fragment_run()
+    st.write(f"Rate '{item_name}' from '{item_restaurant}':")
+    current_rating_for_item = st.session_state.user_ratings.get((item_name, item_restaurant))
+    rating_options = [1, 2, 3, 4, 5]
+    cols_rating = st.columns(len(rating_options) + 1) # +1 for clear button
+
+    for r_idx, r_val in enumerate(rating_options):
+        with cols_rating[r_idx]:
+            button_char = "⭐" if current_rating_for_item and r_val <= current_rating_for_item else "☆"
+            rate_key = f"rate_{order_id}_{item_restaurant}_{item_name}_{r_val}_{order_idx}".replace(" ","_")
+            st.button(button_char, key=rate_key, on_click=rate_item, args=(item_name, item_restaurant, r_val))
+    if current_rating_for_item: # Show clear button only if rated
+        with cols_rating[len(rating_options)]:
+            clear_key = f"clear_rate_{order_id}_{item_restaurant}_{item_name}_{order_idx}".replace(" ","_")
+            st.button("Clear", key=clear_key, on_click=rate_item, args=(item_name, item_restaurant, 0))
+
+
 def display_order_history():
     st.markdown("## 📜 Your Order History")
     if not st.session_state.order_history:
         st.info("You have no past orders yet.")
         return
 
-    user_ratings = get_user_ratings(st.session_state.user_id) # Load user's ratings
+    # Load user's ratings once per full run; the rating fragments read and update this copy
+    st.session_state.user_ratings = get_user_ratings(st.session_state.user_id)
 
     for i, order in enumerate(reversed(st.session_state.order_history)): # Show newest first
         order_total = float(order.get('total', 0))
@@ -691,178 +586,163 @@ def display_order_history():
                 item_name = item_in_order['Item']
                 # Restaurant for this item (important for rating uniqueness)
                 item_restaurant = item_in_order.get('Restaurant', order.get('restaurant', 'Unknown Restaurant'))
-                item_key_for_rating = (item_name, item_restaurant) # Composite key for rating
                 item_price_ordered = float(item_in_order.get('Price',0))
                 item_qty_ordered = item_in_order.get('quantity',1)
 
                 st.markdown(f"- {item_name} ({item_restaurant}) - {item_qty_ordered} x ₹{item_price_ordered:.2f}")
 
                 # Rating Section
-                st.write(f"Rate '{item_name}' from '{item_restaurant}':")
-                current_rating_for_item = user_ratings.get(item_key_for_rating)
-                rating_options = [1, 2, 3, 4, 5]
-                cols_rating = st.columns(len(rating_options) + 1) # +1 for clear button
-
-                for r_idx, r_val in enumerate(rating_options):
-                    with cols_rating[r_idx]:
-                        button_char = "⭐" if current_rating_for_item and r_val <= current_rating_for_item else "☆"
-                        rate_key = f"rate_{order['order_id']}_{item_restaurant}_{item_name}_{r_val}_{i}".replace(" ","_")
-                        if st.button(button_char, key=rate_key):
-                            add_or_update_rating(st.session_state.user_id, item_name, item_restaurant, r_val)
-                            st.success(f"You rated '{item_name}' ({item_restaurant}) {r_val} stars!")
-                            st.rerun()
-                if current_rating_for_item: # Show clear button only if rated
-                    with cols_rating[len(rating_options)]:
-                        clear_key = f"clear_rate_{order['order_id']}_{item_restaurant}_{item_name}_{i}".replace(" ","_")
-                        if st.button("Clear", key=clear_key):
-                            add_or_update_rating(st.session_state.user_id, item_name, item_restaurant, 0) # 0 or None to clear
-                            st.info(f"Rating for '{item_name}' ({item_restaurant}) cleared.")
-                            st.rerun()
+                display_item_rating(order['order_id'], item_name, item_restaurant, i)
             st.markdown("---")
 
 
-def get_recommendations(category=None, dietary_preferences=None, limit=10, user_query=None,
-                        occasion=None, mood=None, current_weather_input=None):
-    df = load_menu_data()
-    if df.empty:
-        return []
-
-    results_df = df.copy()
-    results_df['recommendation_score'] = 0.0 # Initialize score
-
-    # 0. User Ratings Boost
-    if 'user_id' in st.session_state:
-        user_ratings = get_user_ratings(st.session_state.user_id)
-        if user_ratings:
-            def rating_boost(row):
-                item_key = (row['Item'], row.get('Restaurant'))
-                rating = user_ratings.get(item_key, 0) # Default to 0 if not rated
-                if rating >= 4: return rating * 2.0
-                if rating == 3: return rating * 0.5
-                return 0.0
-            results_df['recommendation_score'] += results_df.apply(rating_boost, axis=1)
-
-    # 1. Dietary Preferences
-    if dietary_preferences: # dietary_preferences is a list e.g. ['vegetarian']
-        if 'vegetarian' in dietary_preferences:
-            results_df = results_df[results_df['Is_Vegetarian'].str.lower() == 'veg']
-        elif 'non-vegetarian' in dietary_preferences:
-            results_df = results_df[results_df['Is_Vegetarian'].str.lower() == 'non-veg']
-        # If empty (i.e., 'any'), no filter applied here.
-
-    # 2. Category Filter
-    if category and category != 'All':
-        results_df = results_df[results_df['Category'] == category]
-
-    # Ensure 'Tags' column is string type for safe operations
-    if 'Tags' in results_df.columns:
-        results_df['Tags'] = results_df['Tags'].astype(str)
-
-    # 3. Occasion-Based Boosting
-    if occasion and occasion != "Any Occasion" and 'Tags' in results_df.columns:
-        occasion_tags_map = {
-            "Quick Lunch": ["quick_lunch", "snack", "light_meal", "roll", "fast_food"],
-            "Family Dinner": ["family_meal", "main_course", "shareable", "combo", "biryani", "curry"],
-            "Party": ["party_pack", "bulk", "snack_platter", "pizza", "finger_food", "appetizer"],
-            "Healthy Meal": ["healthy", "salad", "low_calorie", "grilled", "soup", "steamed", "fruit"]
-        }
-        if occasion in occasion_tags_map:
-            for tag in occasion_tags_map[occasion]:
-                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 5 if tag in x.lower() else 0)
-
-    # 4. Mood-Based Boosting
-    if mood and mood != "Any Mood" and 'Tags' in results_df.columns:
-        mood_tags_map = {
-            "Happy": ["dessert", "celebration", "treat", "sweet", "ice_cream", "cake", "chocolate"],
-            "Stressed": ["comfort_food", "chocolate", "sweet", "rich", "creamy", "pasta", "pizza"],
-            "Cozy": ["soup", "warm", "tea", "coffee", "comfort_food", "hot_drink", "stew", "pasta"],
-            "Adventurous": ["exotic", "new_flavor", "spicy_high", "unique", "fusion", "sushi", "thai"] # Assuming some tags
-        }
-        if mood in mood_tags_map:
-            for tag in mood_tags_map[mood]:
-                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 3 if tag in x.lower() else 0)
-
-    # 5. Weather-Based Boosting (User Input)
-    if current_weather_input and 'Tags' in results_df.columns:
-        temp = current_weather_input.get('temperature') # Float
-        condition = current_weather_input.get('condition', '').lower() # String
-
-        if temp is not None:
-            if temp > 28: # Hot
-                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 4 if any(t in x.lower() for t in ["cold", "refreshing", "juice", "lassi", "ice_cream", "salad"]) else 0)
-            elif temp < 15: # Cold
-                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 4 if any(t in x.lower() for t in ["hot", "warm", "soup", "tea", "coffee", "hearty", "stew", "spicy"]) else 0)
-
-        if condition:
-            if condition == 'rainy':
-                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 5 if any(t in x.lower() for t in ["hot", "soup", "comfort_food", "pakora", "chai", "fried", "warm"]) else 0)
-            elif condition == 'sunny' and (temp is None or temp > 20):
-                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 3 if any(t in x.lower() for t in ["refreshing", "light_meal", "salad", "juice", "fruit", "cold_drink", "ice_cream"]) else 0)
-            elif condition == 'cloudy':
-                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 1 if "comfort_food" in x.lower() else 0)
-
-    # 6. User Query (Semantic Search) - Needs robust integration
-    if user_query:
-        # semantic_search should return a DataFrame with original columns + 'semantic_score' or similar
-        # Or it returns a list of items with scores.
-        # For this example, assume it returns a DataFrame of the same structure but re-ordered or with a score.
-        # This is a critical part that depends on your nlp_utils.semantic_search implementation.
-        
-        # Option A: Semantic search filters and returns a new DataFrame
-        # query_filtered_df = semantic_search(user_query, results_df.copy(), top_n=len(results_df)) # or a smaller top_n
-        # if not query_filtered_df.empty:
-        #     results_df = query_filtered_df # Overwrite results_df if semantic search is the primary filter
-
-        # Option B: Semantic search adds a score to existing items
-        # For example, if semantic_search can add a 'semantic_score' column to results_df:
-        # results_df = semantic_search(user_query, results_df, add_score_column='semantic_score')
-        # results_df['recommendation_score'] += results_df.get('semantic_score', 0) * 10 # High weight
-        
-        # Placeholder: Assuming semantic_search returns a list of item names that match
-        # This is a simplified integration.
-        try:
-            matched_items_df_from_query = semantic_search(user_query, results_df.copy(), top_n=20) # semantic_search returns df
-            if not matched_items_df_from_query.empty:
-                # Give a high score boost to items found by semantic search
-                # We need to merge this boost back to the main results_df
-                # Create a dictionary of boosts: {(Item, Restaurant): boost_value}
-                query_boosts = {}
-                for _, row in matched_items_df_from_query.iterrows():
-                    # Assuming semantic_search might provide its own score, or we assign a flat boost
-                    boost_val = row.get('semantic_score', 20) # Use semantic_score if available, else 20
-                    query_boosts[(row['Item'], row.get('Restaurant'))] = boost_val
-                
-                def apply_query_boost(row):
-                    return query_boosts.get((row['Item'], row.get('Restaurant')), 0)
-
-                results_df['recommendation_score'] += results_df.apply(apply_query_boost, axis=1)
-
-        except Exception as e:
-            # st.warning(f"Semantic search integration issue: {e}") # For debugging
-            pass # Continue without semantic search if it fails
-
-
-    # Sort by final recommendation score, then by original Rating (if available)
-    sort_by_cols = ['recommendation_score']
-    ascending_order = [False]
-    if 'Rating' in results_df.columns: # Assuming 'Rating' is numerical
-        results_df['Rating'] = pd.to_numeric(results_df['Rating'], errors='coerce').fillna(0)
-        sort_by_cols.append('Rating')
-        ascending_order.append(False)
+def display_memory_report():
+    """Admin view: memory by component (catalog, NLP models, indexes, sessions), diffed against the last snapshot."""
+    with st.expander("🧠 Memory report (admin)"):
+        if st.button("Take memory snapshot", key="memory_snapshot_button_sidebar", use_container_width=True):
+            sessions = memory_report.live_streamlit_sessions() or {st.session_state.user_id: st.session_state.to_dict()}
+            snapshot = memory_report.take_snapshot(load_menu_data(), sessions)
+            st.session_state.memory_snapshot_previous = memory_report.remember_snapshot(snapshot)
+            st.session_state.memory_snapshot = snapshot
+
+        snapshot = st.session_state.get('memory_snapshot')
+        if not snapshot:
+            st.caption("No snapshot taken yet.")
+            return
+
+        st.markdown(f"**RSS:** {memory_report.format_bytes(snapshot['rss_bytes'])} · "
+                    f"**Sessions:** {snapshot['session_count']}")
+        st.dataframe(pd.DataFrame(
+            [(name, memory_report.format_bytes(size)) for name, size in snapshot['components'].items()],
+            columns=['Component', 'Size']
+        ), hide_index=True, use_container_width=True)
+        if not snapshot['packages']:
+            st.caption("Start the app with QUICKBITES_TRACEMALLOC=1 to attribute NLP model memory.")
+
+        previous = st.session_state.get('memory_snapshot_previous')
+        if previous:
+            diff = memory_report.diff_snapshots(previous, snapshot)
+            st.markdown(f"**Since {diff['from']}:** RSS {memory_report.format_bytes(diff['rss_bytes'])}")
+            changes = list(diff['components'].items()) + [(f"session:{k}", v) for k, v in diff['session_keys'].items()]
+            if changes:
+                st.dataframe(pd.DataFrame(
+                    [(name, memory_report.format_bytes(delta)) for name, delta in changes[:10]],
+                    columns=['Component', 'Change']
+                ), hide_index=True, use_container_width=True)
+
+        st.download_button("Download snapshot (JSON)", data=json.dumps(snapshot, indent=4),
+                           file_name=f"memory_{snapshot['timestamp'].replace(' ', '_').replace(':', '')}.json",
+                           mime="application/json", key="memory_snapshot_download_sidebar")
+
+
+def display_combo_builder(preferences):
+    """Meal combos within a budget and calorie limit; the query's budget, party size and kcal fill the defaults."""
+    budget = preferences.get('budget') if preferences else None
+    with st.expander("🍱 Build a meal combo", expanded=bool(preferences and preferences.get('party_size'))):
+        col_budget, col_people, col_calories = st.columns(3)
+        with col_budget:
+            max_budget = st.number_input("Budget (₹):", min_value=50.0, step=50.0, key="combo_budget",
+                                         value=max(50.0, float(budget[1])) if budget and budget[1] else 800.0)
+        with col_people:
+            party_size = st.number_input("People:", min_value=1, max_value=20, step=1, key="combo_people",
+                                         value=min(20, max(1, int((preferences or {}).get('party_size') or 1))))
+        with col_calories:
+            max_calories = st.number_input("Max kcal per person (0 = no limit):", min_value=0.0, step=100.0,
+                                           key="combo_calories",
+                                           value=float((preferences or {}).get('max_calories') or 0.0))
+        if st.button("Build combos", key="build_combos_button", use_container_width=True):
+            st.session_state.combo_results = build_combos(
+                load_menu_data(), max_budget, max_calories or None, party_size,
+                dietary_preferences=st.session_state.dietary_preferences,
+                dietary_options=st.session_state.dietary_options, cuisine=st.session_state.selected_cuisine,
+                available_at=st.session_state.available_at_time if st.session_state.only_available else None
+            )
+        if st.session_state.combo_results is None:
+            return
+        if not st.session_state.combo_results:
+            st.info("No combo fits that budget and calorie limit. Try raising either.")
+        for combo_idx, combo in enumerate(st.session_state.combo_results):
+            with st.container(border=True):
+                calories = combo['calories_per_person']
+                st.markdown(f"**{combo['restaurant']}** · ₹{combo['total_price']:.2f} for {combo['party_size']}"
+                            + (f" · {calories:.0f} kcal per person" if calories is not None else ""))
+                st.markdown(" + ".join(str(item['Item']) for item in combo['items']))
+                st.button("➕ Add combo to cart", key=f"add_combo_{combo_idx}", on_click=add_combo_to_cart, args=(combo,))
+
+
+def display_trending_now():
+    """The catalog's most-ordered items over the last day or so (trending.py's decayed counters)."""
+    menu_df = load_menu_data()
+    if menu_df.empty:
+        return
+    rows = trending.model().top_rows(menu_df, n=4)
+    if len(rows) == 0:
+        return
+    st.markdown("---")
+    st.subheader("🔥 Trending now")
+    trending_cols = st.columns(2)
+    for i, rec_item in enumerate(menu_df.iloc[rows].to_dict('records')):
+        with trending_cols[i % 2]:
+            display_swipe_card(rec_item, index_key_suffix=f"trending_item_{i}")
+
+
+def display_group_order():
+    """A shared basket for several user ids ordering together (recommender.get_group_recommendations)."""
+    with st.expander("👨‍👩‍👧 Group order"):
+        member_text = st.text_input("Member user ids (comma-separated):", value=st.session_state.user_id,
+                                    key="group_members")
+        col_aggregation, col_size = st.columns(2)
+        with col_aggregation:
+            aggregation = st.radio("Pick dishes by:", ['least_misery', 'average'], horizontal=True,
+                                   key="group_aggregation",
+                                   format_func=lambda name: "Least misery" if name == 'least_misery' else "Average")
+        with col_size:
+            basket_size = st.number_input("Dishes:", min_value=1, max_value=20, step=1, value=GROUP_BASKET_SIZE,
+                                          key="group_basket_size")
+        if st.button("Build group basket", key="build_group_basket_button", use_container_width=True):
+            member_ids = [member.strip() for member in member_text.split(',') if member.strip()]
+            st.session_state.group_basket = recommender.get_group_recommendations(
+                load_menu_data(), member_ids or [st.session_state.user_id], aggregation=aggregation,
+                basket_size=int(basket_size),
+                category=st.session_state.selected_category if st.session_state.selected_category != 'All' else None,
+                dietary_preferences=st.session_state.dietary_preferences,
+                dietary_options=st.session_state.dietary_options, cuisine=st.session_state.selected_cuisine,
+                spice_level=st.session_state.selected_spice_level,
+                available_at=st.session_state.available_at_time if st.session_state.only_available else None,
+                user_query=st.session_state.user_query, occasion=st.session_state.selected_occasion,
+                mood=st.session_state.selected_mood, current_weather_input=st.session_state.user_weather_input
+            )
+        basket = st.session_state.group_basket
+        if basket is None:
+            return
+        if not basket['items']:
+            st.info("No dishes match the group's filters. Try relaxing them.")
+            return
+        for item_dict in basket['items']:
+            st.markdown(f"**{item_dict['Item']}** ({item_dict['Restaurant']}) · ₹{float(item_dict.get('Price', 0) or 0):.2f}")
+        st.button("➕ Add basket to cart", key="add_group_basket", on_click=add_basket_to_cart, args=(basket,))
+        st.code(basket['share_text'], language=None)
 
-    results_df = results_df.sort_values(by=sort_by_cols, ascending=ascending_order)
-    
-    # Remove duplicates keeping the one with highest recommendation_score
-    # Considering 'Item' and 'Restaurant' as unique identifier for a dish
-    results_df = results_df.drop_duplicates(subset=['Item', 'Restaurant'], keep='first')
 
-    return results_df.head(limit).to_dict('records')
+def get_recommendations(category=None, dietary_preferences=None, limit=10, user_query=None,
+                        occasion=None, mood=None, current_weather_input=None, dietary_options=None,
+                        cuisine=None, spice_level=None, available_at=None):
+    """Rank the session's menu for the current context (see recommender.get_recommendations)."""
+    return recommender.get_recommendations(
+        load_menu_data(), category=category, dietary_preferences=dietary_preferences, limit=limit,
+        user_query=user_query, occasion=occasion, mood=mood, current_weather_input=current_weather_input,
+        user_id=st.session_state.get('user_id'), dietary_options=dietary_options, cuisine=cuisine,
+        spice_level=spice_level, available_at=available_at
+    )
 
 
 # --- Main Application ---
 def main():
     st.set_page_config(page_title="QuickBites AI", layout="wide", initial_sidebar_state="expanded")
 
+    # Count full script runs (read by ui_loadtest.py to measure reruns per interaction)
+    st.session_state.script_run_count = st.session_state.get('script_run_count', 0) + 1
+
     # --- Initialize session state variables (Robustly) ---
     default_session_state = {
         'menu_df': None, 'cart': [], 'order_history': [], 'wallet_balance': 1000.0,
@@ -870,6 +750,8 @@ def main():
         'show_payment': False, 'show_order_details': False, 'current_order': None,
         'show_recommendations': False, 'current_recommendations': [],
         'user_query': "", 'selected_category': 'All',
+        'dietary_options': [], 'selected_cuisine': 'All', 'selected_spice_level': 'Any',
+        'only_available': False, 'available_at_time': None, 'combo_results': None, 'group_basket': None,
         'selected_occasion': "Any Occasion", 'selected_mood': "Any Mood",
         'view_order_history': False,
         'user_weather_input': {'condition': 'Clear', 'temperature': 25.0},
@@ -895,7 +777,7 @@ def main():
     # --- Sidebar ---
     with st.sidebar:
         st.header("👤 User Preferences")
-        dietary_pref_options = ["any", "vegetarian", "non-vegetarian"]
+        dietary_pref_options = DIET_PREFERENCE_OPTIONS
         current_diet_pref = st.session_state.dietary_preferences[0] if st.session_state.dietary_preferences else "any"
         selected_diet_pref_val = st.radio(
             "Dietary preference:", dietary_pref_options,
@@ -904,19 +786,45 @@ def main():
         )
         st.session_state.dietary_preferences = [] if selected_diet_pref_val == "any" else [selected_diet_pref_val]
 
+        # Extra filters, offered only when the loaded catalog has the columns for them
+        menu_filter_index = filter_index_for(load_menu_data())
+        dietary_option_choices = menu_filter_index.supported_dietary_options(DIETARY_OPTIONS)
+        if dietary_option_choices:
+            st.session_state.dietary_options = st.multiselect(
+                "Dietary needs:", dietary_option_choices,
+                default=[o for o in st.session_state.dietary_options if o in dietary_option_choices],
+                key="dietary_options_sidebar")
+        if menu_filter_index.has('Cuisine'):
+            cuisines = ['All'] + [str(c) for c in menu_filter_index.values('Cuisine')]
+            st.session_state.selected_cuisine = st.selectbox("Cuisine:", cuisines,
+                index=cuisines.index(st.session_state.selected_cuisine) if st.session_state.selected_cuisine in cuisines else 0,
+                key="cuisine_select_sidebar")
+        if menu_filter_index.has('Spice_Level'):
+            spice_levels = ['Any'] + [str(s) for s in menu_filter_index.values('Spice_Level')]
+            st.session_state.selected_spice_level = st.selectbox("Spice level:", spice_levels,
+                index=spice_levels.index(st.session_state.selected_spice_level) if st.session_state.selected_spice_level in spice_levels else 0,
+                key="spice_select_sidebar")
+        if menu_filter_index.availability is not None:
+            st.session_state.only_available = st.checkbox(
+                "Only items available at:", value=st.session_state.only_available, key="only_available_sidebar")
+            if st.session_state.only_available:
+                st.session_state.available_at_time = st.time_input(
+                    "Available at", value=st.session_state.available_at_time or datetime.now().time().replace(second=0, microsecond=0),
+                    key="available_at_sidebar", label_visibility="collapsed")
+
         st.markdown("---")
         st.header("🎉 Occasion & Mood")
-        occasions = ["Any Occasion", "Quick Lunch", "Family Dinner", "Party", "Healthy Meal"]
+        occasions = OCCASION_OPTIONS
         st.session_state.selected_occasion = st.selectbox("What's the occasion?", occasions,
             index=occasions.index(st.session_state.selected_occasion), key="occasion_select_sidebar")
 
-        moods = ["Any Mood", "Happy", "Stressed", "Cozy", "Adventurous"]
+        moods = MOOD_OPTIONS
         st.session_state.selected_mood = st.selectbox("How are you feeling?", moods,
             index=moods.index(st.session_state.selected_mood), key="mood_select_sidebar")
 
         st.markdown("---")
         st.header("☀️ Current Weather")
-        weather_conditions_options = ["Clear", "Sunny", "Cloudy", "Rainy", "Windy", "Snowy", "Foggy"]
+        weather_conditions_options = WEATHER_CONDITION_OPTIONS
         user_weather_cond_val = st.session_state.user_weather_input.get('condition', 'Clear')
         user_weather_temp_val = float(st.session_state.user_weather_input.get('temperature', 25.0))
 
@@ -937,6 +845,10 @@ def main():
         st.markdown(f"### 💰 Wallet: ₹{st.session_state.wallet_balance:.2f}")
         display_cart() # Cart display and smart suggestions
 
+        if ADMIN_MODE:
+            st.markdown("---")
+            display_memory_report()
+
     # --- Main Page Content Routing ---
     if st.session_state.view_order_history:
         display_order_history()
@@ -957,8 +869,17 @@ def main():
         )
 
         menu_df_for_categories = load_menu_data()
+        if st.session_state.user_query and not menu_df_for_categories.empty:
+            typed = st.session_state.user_query.strip().lower()
+            suggestions = [suggestion for suggestion in prefix_index_for(menu_df_for_categories).suggest(st.session_state.user_query)
+                           if suggestion.lower() != typed]
+            if suggestions:
+                suggestion_cols = st.columns(len(suggestions))
+                for i, suggestion in enumerate(suggestions):
+                    with suggestion_cols[i]:
+                        st.button(suggestion, key=f"query_suggestion_{i}", on_click=use_query_suggestion, args=(suggestion,))
         if not menu_df_for_categories.empty and 'Category' in menu_df_for_categories.columns:
-             available_categories = ['All'] + sorted(list(menu_df_for_categories['Category'].astype(str).unique()))
+             available_categories = ['All'] + [str(c) for c in filter_index_for(menu_df_for_categories).values('Category')]
         else:
             available_categories = ['All']
         
@@ -973,6 +894,10 @@ def main():
             recommendations_list = get_recommendations(
                 category=st.session_state.selected_category if st.session_state.selected_category != 'All' else None,
                 dietary_preferences=st.session_state.dietary_preferences,
+                dietary_options=st.session_state.dietary_options,
+                cuisine=st.session_state.selected_cuisine,
+                spice_level=st.session_state.selected_spice_level,
+                available_at=st.session_state.available_at_time if st.session_state.only_available else None,
                 user_query=st.session_state.user_query,
                 occasion=st.session_state.selected_occasion,
                 mood=st.session_state.selected_mood,
@@ -983,6 +908,7 @@ def main():
             # No rerun here, allow flow to display section
 
         # Display NLP feedback if a query is active
+        preferences = None
         if st.session_state.user_query:
             # Assuming extract_food_preferences is robust and returns a dict
             preferences = extract_food_preferences(st.session_state.user_query)
@@ -1001,6 +927,24 @@ def main():
                 taste_list = preferences.get('taste') # taste should be a list of strings
                 if taste_list and isinstance(taste_list, list) and len(taste_list) > 0:
                     pref_text_parts.append(f"that's {', '.join(taste_list)}")
+
+                budget = preferences.get('budget') # (min_price, max_price), either end may be None
+                if budget:
+                    if budget[0] is not None and budget[1] is not None:
+                        pref_text_parts.append(f"between ₹{budget[0]:.0f} and ₹{budget[1]:.0f}")
+                    elif budget[1] is not None:
+                        pref_text_parts.append(f"under ₹{budget[1]:.0f}")
+                    else:
+                        pref_text_parts.append(f"over ₹{budget[0]:.0f}")
+
+                available_at = preferences.get('available_at')
+                if available_at:
+                    pref_text_parts.append(f"available at {available_at.strftime('%H:%M')}")
+
+                if preferences.get('party_size'):
+                    pref_text_parts.append(f"for {preferences['party_size']}")
+                if preferences.get('max_calories'):
+                    pref_text_parts.append(f"under {preferences['max_calories']:.0f} kcal")
                 
                 if pref_text_parts:
                     st.markdown(f"**Looking for:** {', '.join(pref_text_parts)} food.")
@@ -1024,6 +968,10 @@ def main():
                  st.session_state.selected_mood != "Any Mood":
                 st.info("🤔 No items found matching your current criteria. Try adjusting your search or filters.")
 
+        display_combo_builder(preferences)
+        display_group_order()
+        display_trending_now()
+
         # Complementary items logic (optional, if you have a specific use case beyond smart cart)
         # if 'show_complementary' in st.session_state and st.session_state.show_complementary:
         #     display_complementary_items(st.session_state.show_complementary)
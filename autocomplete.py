@@ -0,0 +1,193 @@
+"""
+Query autocomplete for the "What are you craving?" box: a sorted-array prefix index over item
+names, tags, cuisines, categories and the Hinglish keywords of config.FOOD_TYPES ("meethe",
+"peene", ...).
+
+Every term is indexed under each of its word starts ("chicken biryani" under "chicken biryani"
+and "biryani"), so "bir" completes it too. The keys are kept sorted, so the keys starting with
+a prefix are one contiguous range found by two binary searches. Completions are the distinct
+terms of that range, most popular first (ties alphabetically):
+    popularity = catalog rows the term matches (+ placed orders of the dish, for item names)
+where a FOOD_TYPES keyword matches the rows of the category or cuisine it maps to.
+Ranking a range is a numpy sort over it. Prefixes with more than AUTOCOMPLETE_SCAN_LIMIT keys
+(a letter or two) get their top AUTOCOMPLETE_CACHED_K precomputed when the index is built, so
+no lookup sorts more than AUTOCOMPLETE_SCAN_LIMIT keys.
+
+The index is built once per catalog DataFrame and cached by id() like filter_index, so it is
+rebuilt only when the catalog changes; popularity is counted at that point.
+
+Usage:
+    python autocomplete.py corrected_menu_dataset.csv chi bir "spicy pa"
+"""
+import argparse
+import bisect
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+import co_purchase
+import memory_report
+from config import AUTOCOMPLETE_CACHED_K, AUTOCOMPLETE_SCAN_LIMIT, AUTOCOMPLETE_SUGGESTIONS, FOOD_TYPES
+from taste_profile import EMPTY_VALUES
+
+_PREFIX_END = '\uffff'  # Sorts after every character of an indexed key
+
+
+def _normalize(text):
+    return ' '.join(str(text).replace('_', ' ').lower().split())
+
+
+def _value_counts(series):
+    """{normalized value: rows having it} of a column."""
+    codes, uniques = pd.factorize(series.astype(str))
+    counts = {}
+    for value, count in zip(uniques, np.bincount(codes[codes >= 0], minlength=len(uniques))):
+        key = _normalize(value)
+        counts[key] = counts.get(key, 0) + int(count)
+    return counts
+
+
+def catalog_terms(df):
+    """{normalized term: [display text, popularity]} of a catalog; see the module docstring."""
+    terms = {}
+
+    def add(display, popularity):
+        key = _normalize(display)
+        if key and key not in EMPTY_VALUES:
+            entry = terms.setdefault(key, [' '.join(str(display).replace('_', ' ').split()), 0])
+            entry[1] = max(entry[1], popularity)
+
+    if 'Item' in df.columns:
+        item_orders = co_purchase.model().item_orders
+        codes, names = pd.factorize(df['Item'].astype(str))
+        for name, count in zip(names, np.bincount(codes[codes >= 0], minlength=len(names))):
+            add(name, int(count) + item_orders.get(name, 0))
+    value_rows = {}  # Normalized Category / Cuisine value -> rows (for FOOD_TYPES keywords)
+    for col in ('Category', 'Cuisine'):
+        if col in df.columns:
+            for value, count in _value_counts(df[col]).items():
+                add(value, count)
+                value_rows[value] = value_rows.get(value, 0) + count
+    if 'Tags' in df.columns:
+        tag_rows = {}
+        for value, count in _value_counts(df['Tags'].fillna('')).items():
+            for tag in {_normalize(tag) for tag in value.split(',')}:
+                tag_rows[tag] = tag_rows.get(tag, 0) + count
+        for tag, count in tag_rows.items():
+            add(tag, count)
+    for keyword, value in FOOD_TYPES.items():
+        add(keyword, value_rows.get(_normalize(value), 0))
+    return terms
+
+
+class PrefixIndex:
+    """Sorted word-start keys over completion terms; see the module docstring."""
+
+    def __init__(self, terms, cached_k=AUTOCOMPLETE_CACHED_K, scan_limit=AUTOCOMPLETE_SCAN_LIMIT):
+        ordered = sorted(terms)  # Term ids in alphabetical order, so ties rank alphabetically
+        self.texts = [terms[key][0] for key in ordered]
+        self.popularity = np.array([terms[key][1] for key in ordered], dtype=np.float64)
+        entries = sorted((key[start:], term) for term, key in enumerate(ordered)
+                         for start in [0] + [i + 1 for i, char in enumerate(key) if char == ' '])
+        self.keys = [key for key, _ in entries]
+        self.key_terms = np.array([term for _, term in entries], dtype=np.int32)
+        self.cached_k = cached_k
+        self.scan_limit = scan_limit
+        self.cached = {}  # Prefix with more than scan_limit keys -> its top cached_k term ids
+        self._cache_common_prefixes()
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _top(self, lo, hi, k):
+        terms = np.unique(self.key_terms[lo:hi])
+        return terms[np.argsort(-self.popularity[terms], kind='stable')[:k]]
+
+    def _cache_common_prefixes(self):
+        # Ranges one character longer are only looked for inside ranges that were too large
+        pending = [(0, len(self.keys), 1)]
+        while pending:
+            lo, hi, length = pending.pop()
+            i = lo
+            while i < hi:
+                if len(self.keys[i]) < length:
+                    i += 1
+                    continue
+                prefix = self.keys[i][:length]
+                j = bisect.bisect_left(self.keys, prefix + _PREFIX_END, i, hi)
+                if j - i > self.scan_limit:
+                    self.cached[prefix] = tuple(self._top(i, j, self.cached_k))
+                    pending.append((i, j, length + 1))
+                i = j
+
+    def complete(self, prefix, k=AUTOCOMPLETE_SUGGESTIONS):
+        """Display texts of the k most popular terms with a word starting with prefix."""
+        prefix = _normalize(prefix)
+        if not prefix or k <= 0:
+            return []
+        terms = self.cached.get(prefix) if k <= self.cached_k else None
+        if terms is None:
+            lo = bisect.bisect_left(self.keys, prefix)
+            hi = bisect.bisect_left(self.keys, prefix + _PREFIX_END, lo)
+            terms = self._top(lo, hi, k)
+        return [self.texts[term] for term in terms[:k]]
+
+    def suggest(self, query, k=AUTOCOMPLETE_SUGGESTIONS):
+        """
+        Completions of the whole query or, when it has none and several words, of its last word
+        after the words before it, e.g. "spicy chi" -> "spicy Chicken Biryani".
+        """
+        suggestions = self.complete(query, k)
+        words = str(query).split()
+        if not suggestions and len(words) > 1:
+            lead = ' '.join(words[:-1])
+            for completion in self.complete(words[-1], k):
+                suggestion = f"{lead} {completion}"
+                if suggestion not in suggestions:
+                    suggestions.append(suggestion)
+        return suggestions
+
+
+# Index per catalog DataFrame, keyed by id() and dropped when the DataFrame is collected
+_INDEXES = {}
+
+
+def prefix_index_for(df):
+    """The PrefixIndex of df, built on first use."""
+    entry = _INDEXES.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    index = PrefixIndex(catalog_terms(df))
+    key = id(df)
+    _INDEXES[key] = (weakref.ref(df, lambda _: _INDEXES.pop(key, None)), index)
+    return index
+
+
+memory_report.register_component('autocomplete', lambda: sum(memory_report.deep_sizeof(index)
+                                                             for _, index in _INDEXES.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Try query autocomplete against a menu CSV")
+    parser.add_argument('csv_path', help="Menu CSV")
+    parser.add_argument('queries', nargs='*', default=['c', 'chi', 'bir', 'meethe'])
+    parser.add_argument('-k', type=int, default=AUTOCOMPLETE_SUGGESTIONS)
+    args = parser.parse_args()
+
+    from menu_catalog import load_catalog
+    df, _, _ = load_catalog(args.csv_path)
+    start = time.perf_counter()
+    index = prefix_index_for(df)
+    print(f"{len(index)} terms, {len(index.keys)} keys, {len(index.cached)} precomputed prefixes; "
+          f"built in {(time.perf_counter() - start) * 1000:.0f} ms")
+    for query in args.queries:
+        start = time.perf_counter()
+        suggestions = index.suggest(query, args.k)
+        elapsed = time.perf_counter() - start
+        print(f"  {query!r} ({elapsed * 1e6:.0f} µs): {', '.join(suggestions) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
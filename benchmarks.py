@@ -0,0 +1,217 @@
+"""
+Benchmark suite over synthetic catalogs.
+
+Times the hot paths (menu loading, recommendations, semantic search, preference extraction,
+smart-cart suggestions and the ratings store) at several catalog sizes and saves the results
+as JSON so runs can be compared across commits.
+
+Usage:
+    python benchmarks.py run --sizes 1k,100k,1M
+    python benchmarks.py compare benchmark_results/old.json benchmark_results/new.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import co_purchase
+import item_cf
+import rating_stats
+import recommender
+import synthetic_data
+import taste_profile
+import trending
+import utils
+from nlp_utils import semantic_search, extract_food_preferences
+
+RESULTS_DIR = 'benchmark_results'
+
+SAMPLE_QUERIES = [
+    "spicy chicken for dinner",
+    "something sweet and creamy",
+    "healthy vegetarian lunch",
+    "crispy fried snack for a rainy evening",
+    "cold refreshing drink",
+]
+
+# Benchmarks that scale badly enough to be skipped above this many rows unless --no-limits is given
+MAX_ROWS = {
+    'semantic_search': 10000,
+    'get_recommendations_query': 10000,
+}
+
+
+def time_call(fn, repeat):
+    """Run fn `repeat` times and return timing stats in seconds."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {
+        'runs': [round(r, 6) for r in runs],
+        'min': round(min(runs), 6),
+        'median': round(statistics.median(runs), 6),
+        'mean': round(statistics.mean(runs), 6),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def ensure_dataset(size, data_dir, seed=0):
+    """Return dataset paths for `size`, generating the files if they do not exist yet."""
+    paths = {
+        'menu': os.path.join(data_dir, f"menu_{size}.csv"),
+        'ratings': os.path.join(data_dir, f"ratings_{size}.json"),
+        'orders': os.path.join(data_dir, f"orders_{size}.json"),
+    }
+    if not all(os.path.exists(p) for p in paths.values()):
+        print(f"Generating synthetic dataset with {size} rows...")
+        paths = synthetic_data.write_dataset(size, data_dir, seed=seed)
+    return paths
+
+
+@contextlib.contextmanager
+def scratch_state(ratings_path):
+    """
+    Serve the ratings store from a scratch copy of `ratings_path` and keep the state learned from
+    benchmark ratings and orders (config.STATE_DIR) in a scratch directory.
+    """
+    scratch_dir = tempfile.mkdtemp(prefix='quickbites_state_')
+    saved = (utils.RATINGS_FILE_PATH, item_cf._MODEL, rating_stats._MODEL, taste_profile._MODEL,
+             trending._MODEL, trending.TRENDING_FILE_PATH, co_purchase._MODEL, co_purchase.CO_PURCHASE_FILE_PATH)
+    utils.RATINGS_FILE_PATH = os.path.join(scratch_dir, 'ratings.json')
+    shutil.copyfile(ratings_path, utils.RATINGS_FILE_PATH)
+    item_cf._MODEL = rating_stats._MODEL = None  # Rebuilt from the scratch ratings on first use
+    taste_profile._MODEL = taste_profile.TasteProfiles(profile_dir=os.path.join(scratch_dir, 'taste_profiles'))
+    trending._MODEL, trending.TRENDING_FILE_PATH = None, os.path.join(scratch_dir, 'trending.json')
+    co_purchase._MODEL, co_purchase.CO_PURCHASE_FILE_PATH = None, os.path.join(scratch_dir, 'co_purchase.json')
+    try:
+        yield scratch_dir
+    finally:
+        (utils.RATINGS_FILE_PATH, item_cf._MODEL, rating_stats._MODEL, taste_profile._MODEL,
+         trending._MODEL, trending.TRENDING_FILE_PATH, co_purchase._MODEL, co_purchase.CO_PURCHASE_FILE_PATH) = saved
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def benchmark_size(size, paths, repeat, only=None, no_limits=False):
+    """Run every benchmark for one catalog size and return {benchmark_name: stats}."""
+    results = {}
+
+    def run(name, fn, repeat_override=None):
+        if only and name not in only:
+            return
+        if not no_limits and size > MAX_ROWS.get(name, float('inf')):
+            results[name] = {'skipped': f"size above {MAX_ROWS[name]} rows (use --no-limits)"}
+            return
+        print(f"  {name}...", flush=True)
+        results[name] = time_call(fn, repeat_override or repeat)
+
+    menu_df, _ = recommender.read_menu_data(paths['menu'], ingested_csv_path=None)
+    with open(paths['ratings'], 'r') as f:
+        sample_rating = (json.load(f) or [{}])[0]
+    user_id = sample_rating.get('user_id', 'bench_user')
+
+    run('load_menu_data', lambda: recommender.read_menu_data(paths['menu'], ingested_csv_path=None))
+    run('get_recommendations', lambda: recommender.get_recommendations(
+        menu_df, category='Main Course', dietary_preferences=['vegetarian'], occasion="Family Dinner",
+        mood="Cozy", current_weather_input={'condition': 'Rainy', 'temperature': 22.0}, user_id=user_id))
+    run('get_recommendations_query', lambda: recommender.get_recommendations(
+        menu_df, user_query=SAMPLE_QUERIES[0], occasion="Party", user_id=user_id))
+    run('semantic_search', lambda: semantic_search(SAMPLE_QUERIES[1], menu_df, top_n=20))
+    run('extract_food_preferences', lambda: [extract_food_preferences(q) for q in SAMPLE_QUERIES])
+
+    cart = [dict(row, quantity=1) for row in menu_df.head(3).to_dict('records')]
+    smart_cart_rules = utils.load_smart_cart_rules()
+    run('smart_cart_suggestions', lambda: utils.get_smart_cart_suggestions(cart, menu_df, smart_cart_rules))
+
+    # Ratings store: scratch_state serves it from a copy of the synthetic ratings file
+    item = menu_df.iloc[0]
+    run('add_or_update_rating', lambda: utils.add_or_update_rating(user_id, item['Item'], item['Restaurant'], 4))
+    run('get_user_ratings', lambda: utils.get_user_ratings(user_id))
+    return results
+
+
+def run_benchmarks(sizes, data_dir, repeat, only=None, no_limits=False):
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'sizes': {},
+    }
+    for size in sizes:
+        print(f"Benchmarking {size} rows")
+        paths = ensure_dataset(size, data_dir)
+        with scratch_state(paths['ratings']):
+            report['sizes'][str(size)] = benchmark_size(size, paths, repeat, only=only, no_limits=no_limits)
+    return report
+
+
+def compare_reports(old_report, new_report):
+    """Print median timings of two reports side by side with the new/old ratio."""
+    print(f"old: {old_report.get('commit')} ({old_report.get('timestamp')})")
+    print(f"new: {new_report.get('commit')} ({new_report.get('timestamp')})")
+    print(f"{'size':>9}  {'benchmark':<28}{'old (ms)':>12}{'new (ms)':>12}{'ratio':>8}")
+    for size, new_results in new_report['sizes'].items():
+        old_results = old_report['sizes'].get(size, {})
+        for name, new_stats in new_results.items():
+            old_stats = old_results.get(name, {})
+            if 'median' not in new_stats or 'median' not in old_stats:
+                continue
+            old_ms = old_stats['median'] * 1000
+            new_ms = new_stats['median'] * 1000
+            ratio = new_ms / old_ms if old_ms else float('inf')
+            print(f"{size:>9}  {name:<28}{old_ms:>12.2f}{new_ms:>12.2f}{ratio:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QuickBites benchmark suite")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Run the benchmarks and save a JSON report")
+    run_parser.add_argument('--sizes', default="1k,100k,1M", help="Comma-separated catalog sizes")
+    run_parser.add_argument('--data-dir', default="synthetic_data", help="Where synthetic datasets are cached")
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--only', help="Comma-separated benchmark names to run")
+    run_parser.add_argument('--no-limits', action='store_true', help="Run slow benchmarks at every size")
+    run_parser.add_argument('--output', help=f"Report path (default: {RESULTS_DIR}/bench_<commit>_<time>.json)")
+
+    compare_parser = subparsers.add_parser('compare', help="Compare two saved reports")
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        with open(args.old, 'r') as f_old, open(args.new, 'r') as f_new:
+            compare_reports(json.load(f_old), json.load(f_new))
+        return
+
+    only = set(args.only.split(',')) if args.only else None
+    report = run_benchmarks(synthetic_data.parse_sizes(args.sizes), args.data_dir, args.repeat,
+                            only=only, no_limits=args.no_limits)
+    output_path = args.output or os.path.join(
+        RESULTS_DIR, f"bench_{report['commit']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Learned co-purchase complements, to go with the hand-written data/smart_cart_rules.json.
+
+Every placed order (utils.record_order) adds one to the pair count of each two distinct item
+names in it, and one to each item's order count. Pair counts per item are kept in a
+Space-Saving summary of CO_PURCHASE_COUNTERS counters: when a new partner arrives and the
+summary is full, the partner with the smallest count is replaced and the newcomer inherits
+that count as its error. Memory is therefore bounded per item however large the catalog and
+order stream get, and every partner that accounts for more than 1 / CO_PURCHASE_COUNTERS of the
+item's pair counts is guaranteed to be in the summary. A partner's count minus its error is a lower bound on the
+true pair count; only that lower bound is used.
+
+After each order the complements of the items in it are re-ranked (top CO_PURCHASE_TOP_K by
+guaranteed pair count, at least CO_PURCHASE_MIN_PAIRS of them and at least
+CO_PURCHASE_MIN_CONFIDENCE of the item's orders), so complements() is one dict lookup.
+
+The model is saved to CO_PURCHASE_FILE_PATH at most every CO_PURCHASE_SAVE_SECONDS and on exit.
+
+Usage:
+    python co_purchase.py                           # model stats
+    python co_purchase.py --item "Chicken Biryani"   # learned complements of one item
+"""
+import argparse
+import atexit
+import threading
+import time
+
+import memory_report
+import utils
+from config import (CO_PURCHASE_COUNTERS, CO_PURCHASE_FILE_PATH, CO_PURCHASE_MIN_CONFIDENCE,
+                    CO_PURCHASE_MIN_PAIRS, CO_PURCHASE_SAVE_SECONDS, CO_PURCHASE_TOP_K)
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitter summary: at most `capacity` counters of [count, error] per key."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counters = {}
+
+    def add(self, key, weight=1):
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counters) < self.capacity:
+            self.counters[key] = [weight, 0]
+        else:
+            evicted = min(self.counters, key=lambda k: self.counters[k][0])
+            floor = self.counters.pop(evicted)[0]
+            self.counters[key] = [floor + weight, floor]
+
+    def guaranteed(self):
+        """(key, lower bound on its true count) for every tracked key, highest first (ties by key)."""
+        return sorted(((key, count - error) for key, (count, error) in self.counters.items()),
+                      key=lambda pair: (-pair[1], pair[0]))
+
+
+class CoPurchaseModel:
+    """Item-name co-occurrence counts over placed orders; see the module docstring."""
+
+    def __init__(self, counters=CO_PURCHASE_COUNTERS, top_k=CO_PURCHASE_TOP_K,
+                 min_pairs=CO_PURCHASE_MIN_PAIRS, min_confidence=CO_PURCHASE_MIN_CONFIDENCE):
+        self.counters = counters
+        self.top_k = top_k
+        self.min_pairs = min_pairs
+        self.min_confidence = min_confidence
+        self.orders = 0
+        self.item_orders = {}  # item name -> orders containing it
+        self.partners = {}  # item name -> SpaceSaving of co-ordered item names
+        self._complements = {}  # item name -> ranked complement names (what complements() returns)
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def _rank(self, name):
+        orders = self.item_orders.get(name, 0)
+        summary = self.partners.get(name)
+        if not orders or summary is None:
+            self._complements.pop(name, None)
+            return
+        ranked = tuple(partner for partner, pairs in summary.guaranteed()
+                       if pairs >= self.min_pairs and pairs >= self.min_confidence * orders)[:self.top_k]
+        if ranked:
+            self._complements[name] = ranked
+        else:
+            self._complements.pop(name, None)
+
+    def record_order(self, item_names):
+        """Count one order given the item names in it (quantities and repeats count once)."""
+        names = list(dict.fromkeys(name for name in item_names if name))
+        if not names:
+            return
+        with self._lock:
+            self.orders += 1
+            for name in names:
+                self.item_orders[name] = self.item_orders.get(name, 0) + 1
+            if len(names) > 1:
+                for name in names:
+                    summary = self.partners.get(name)
+                    if summary is None:
+                        summary = self.partners[name] = SpaceSaving(self.counters)
+                    for partner in names:
+                        if partner != name:
+                            summary.add(partner)
+            for name in names:
+                self._rank(name)
+            self.dirty = True
+
+    def complements(self, item_name):
+        """Learned complements of an item name, best first (empty when none is supported yet)."""
+        return self._complements.get(item_name, ())
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'orders': self.orders,
+                'item_orders': dict(self.item_orders),
+                'partners': {name: [[partner, count, error] for partner, (count, error) in summary.counters.items()]
+                             for name, summary in self.partners.items()},
+            }
+
+    @classmethod
+    def from_dict(cls, data, **kwargs):
+        model = cls(**kwargs)
+        model.orders = int(data.get('orders', 0))
+        model.item_orders = {name: int(count) for name, count in data.get('item_orders', {}).items()}
+        for name, counters in data.get('partners', {}).items():
+            summary = model.partners[name] = SpaceSaving(model.counters)
+            # Keep the largest counters if the saved summaries were wider than this model's
+            for partner, count, error in sorted(counters, key=lambda c: c[1], reverse=True)[:model.counters]:
+                summary.counters[partner] = [int(count), int(error)]
+        for name in model.partners:
+            model._rank(name)
+        return model
+
+    def save(self, file_path=None):
+        data = self.to_dict()
+        if utils.save_json_file(file_path or CO_PURCHASE_FILE_PATH, data):
+            self.dirty = False
+            return True
+        return False
+
+    def stats(self):
+        return {
+            'orders': self.orders,
+            'items': len(self.item_orders),
+            'counters': sum(len(summary.counters) for summary in self.partners.values()),
+            'items_with_complements': len(self._complements),
+        }
+
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+_last_saved = time.monotonic()
+
+
+def model():
+    """The process-wide model, loaded from CO_PURCHASE_FILE_PATH on first use."""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                _MODEL = CoPurchaseModel.from_dict(utils.load_json_file(CO_PURCHASE_FILE_PATH, default_data={}))
+    return _MODEL
+
+
+def flush():
+    """Save the model if it changed since the last save."""
+    global _last_saved
+    if _MODEL is not None and _MODEL.dirty:
+        _MODEL.save()
+        _last_saved = time.monotonic()
+
+
+def _on_order(order):
+    model().record_order(item.get('Item') for item in order.get('items', []))
+    if time.monotonic() - _last_saved >= CO_PURCHASE_SAVE_SECONDS:
+        flush()
+
+
+utils.add_order_listener(_on_order)
+atexit.register(flush)
+memory_report.register_component('co_purchase', lambda: memory_report.deep_sizeof(_MODEL) if _MODEL is not None else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the learned co-purchase complements")
+    parser.add_argument('--item', help="Print the learned complements of this item name")
+    args = parser.parse_args()
+
+    learned = model()
+    print(', '.join(f"{key}={value}" for key, value in learned.stats().items()))
+    if args.item:
+        orders = learned.item_orders.get(args.item, 0)
+        print(f"{args.item}: in {orders} orders")
+        summary = learned.partners.get(args.item)
+        ranked = set(learned.complements(args.item))
+        for partner, pairs in (summary.guaranteed() if summary else []):
+            marker = '*' if partner in ranked else ' '
+            print(f" {marker} {partner:<40}{pairs:>6}  ({pairs / orders:.0%})")
+
+
+if __name__ == '__main__':
+    main()
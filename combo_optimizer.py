@@ -0,0 +1,359 @@
+"""
+Meal-combo builder: the best few item combinations under a budget and a calorie limit.
+
+A combo is at most one item per course slot (COMBO_SLOTS: a main plus an optional side,
+starter, dessert and drink), all from one restaurant, each item ordered once per person:
+    Price (what the cart charges), summed over the items, x party_size <= max_budget
+    Calories summed over the items (per person)                        <= max_calories
+    diet, dietary needs, cuisine and availability filters              (filter_index.py)
+Combos are ranked by the sum of item ratings plus COMBO_COMPLEMENT_BONUS for every item that
+goes with the main, according to the smart cart rules or the main's Complementary_Items.
+
+The search is branch-and-bound over a pruned candidate set. Per restaurant and slot, an item is
+dropped when k other items are no more expensive, have no more calories, are rated at least as
+high and complement the same mains; at most COMBO_CANDIDATES_PER_SLOT of the rest are kept, spread
+from the best rated to the cheapest. Slots are then filled in order with candidates tried best
+first, and a branch stops once the best score it could still reach is no better than the k-th
+best combo found so far.
+
+Usage:
+    python combo_optimizer.py data/corrected_menu_dataset.csv --budget 800 --people 2 --max-calories 1500
+    python combo_optimizer.py corrected_menu_dataset.csv --budget 600 --diet vegetarian --top 3
+"""
+import argparse
+import heapq
+import itertools
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import COMBO_TOP_K, COMBO_CANDIDATES_PER_SLOT, COMBO_COMPLEMENT_BONUS
+import rating_stats
+from filter_index import filter_index_for
+from utils import load_smart_cart_rules
+
+logger = logging.getLogger(__name__)
+
+# Course slots filled in this order as (name, catalog categories, required)
+COMBO_SLOTS = [
+    ('main', ['Main Course'], True),
+    ('side', ['Bread', 'Accompaniment'], False),
+    ('starter', ['Starter', 'Snack'], False),
+    ('dessert', ['Dessert'], False),
+    ('drink', ['Beverage'], False),
+]
+BUDGET_EPSILON = 1e-6
+BOUND_BUDGET_CELLS = 2048  # Resolution of the budget-aware bound
+PARETO_BLOCK_ROWS = 256
+
+
+def _slot_codes(df):
+    """Slot number of every row (-1 for categories no slot takes)."""
+    slot_by_category = {category: slot for slot, (_, categories, _) in enumerate(COMBO_SLOTS) for category in categories}
+    codes, uniques = pd.factorize(df['Category'])
+    lookup = np.array([slot_by_category.get(str(value), -1) for value in uniques] + [-1], dtype=np.int64)
+    return lookup[codes]
+
+
+def _item_scores(df, rows):
+    # Live community ratings (static Rating smoothed with user ratings; see rating_stats.py)
+    return rating_stats.model().for_catalog(df)[rows]
+
+
+def _complement_names(item_name, complementary_items, smart_cart_rules):
+    """Lowercase names of what goes with a main: smart cart rules whose key is in its name, plus its own list."""
+    name = item_name.lower()
+    names = {suggestion.lower() for key, suggestions in smart_cart_rules.items() if key.lower() in name
+             for suggestion in suggestions}
+    if isinstance(complementary_items, str):
+        names.update(part.strip().lower() for part in complementary_items.split(','))
+    names.discard('')
+    return names
+
+
+def _goes_with(complements, name):
+    return any(c in name or name in c for c in complements)
+
+
+def _links(main_keys, other_names):
+    """Boolean (mains x others) matrix: does the other item's name match one of the main's complement names?"""
+    other_codes, other_uniques = pd.factorize(pd.Series(other_names, dtype=object).str.lower())
+    main_codes, main_uniques = pd.factorize(pd.Series(main_keys, dtype=object))
+    table = np.zeros((len(main_uniques), len(other_uniques) + 1), dtype=bool)
+    for i, complements in enumerate(main_uniques):
+        if complements:
+            for j, other in enumerate(other_uniques):
+                table[i, j] = _goes_with(complements, other)
+    return table[main_codes][:, other_codes]
+
+
+def pareto_front(prices, calories, scores, keys, depth=1):
+    """
+    Positions of the items that fewer than depth other items with the same key beat or match on
+    price, calories and score at once, ordered by score (best first) then price. Swapping an
+    item for each of its depth dominators gives depth combos at least as good, so with
+    depth = k no top-k combo is lost.
+    """
+    order = np.lexsort((prices, -scores))
+    kept = np.zeros(len(order), dtype=bool)
+    for key in np.unique(keys):
+        members = order[keys[order] == key]  # Best first, so an item can only be beaten by an earlier one
+        front_prices, front_calories = np.empty(0), np.empty(0)
+        for start in range(0, len(members), PARETO_BLOCK_ROWS):
+            # A dropped item's own dominators beat everything it beats, so comparing against the
+            # items kept so far (plus the earlier ones in this block) finds enough dominators
+            block = members[start:start + PARETO_BLOCK_ROWS]
+            p, c = prices[block], calories[block]
+            beaten = ((front_prices[:, None] <= p) & (front_calories[:, None] <= c)).sum(axis=0)
+            earlier = np.tri(len(block), k=-1, dtype=bool).T
+            beaten += ((p[:, None] <= p) & (c[:, None] <= c) & earlier).sum(axis=0)
+            survivors = block[beaten < depth]
+            kept[survivors] = True
+            front_prices = np.concatenate([front_prices, prices[survivors]])
+            front_calories = np.concatenate([front_calories, calories[survivors]])
+    return order[kept[order]]
+
+
+def _spread(front, limit):
+    """At most limit entries of a best-first front, evenly spaced so both the best and the cheapest stay."""
+    if len(front) <= limit:
+        return front
+    return front[np.unique(np.linspace(0, len(front) - 1, limit).round().astype(np.int64))]
+
+
+def _candidates(prices, calories, scores, link_keys, limit, depth):
+    front = pareto_front(prices, calories, scores, link_keys, depth)
+    linked = front[link_keys[front] != 0]
+    unlinked = _spread(front[link_keys[front] == 0], max(limit - len(linked), 1))
+    chosen = np.concatenate([linked[:limit], unlinked])
+    return chosen[np.lexsort((prices[chosen], -scores[chosen]))]
+
+
+class _TopCombos:
+    """The k best (score, -price) combos seen so far."""
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+        self._counter = itertools.count()
+
+    @property
+    def threshold(self):
+        return self.heap[0][0] if len(self.heap) >= self.k else -np.inf
+
+    def push(self, score, price, combo):
+        entry = (score, -price, next(self._counter), combo)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def best(self):
+        return [entry[3] for entry in sorted(self.heap, reverse=True)]
+
+
+def reachable_scores(levels, budget):
+    """
+    best[i][b]: the highest score the slots from level i on can add within b budget units (at
+    most one item per slot, skipping scores 0). Prices are floored to units of
+    budget / BOUND_BUDGET_CELLS, which only ever overestimates, so it is a safe bound.
+    """
+    unit = max(budget / BOUND_BUDGET_CELLS, 1.0)
+    cells = int(budget // unit) + 1
+    best = [None] * len(levels) + [np.zeros(cells)]
+    for i in range(len(levels) - 1, -1, -1):
+        after = best[i + 1]
+        current = after.copy()
+        for price, score in zip(levels[i][0], levels[i][2]):
+            cost = int(price // unit)
+            if cost < cells:
+                np.maximum(current[cost:], score + after[:cells - cost], out=current[cost:])
+        best[i] = current
+    return best, unit
+
+
+def _search_restaurant(mains, slots, budget, max_calories, bonus, top):
+    """Branch-and-bound over one restaurant's candidates; mains/slots hold (price, calories, score, row, links)."""
+    m_price, m_cal, m_score, m_row = mains
+    for m in range(len(m_row)):
+        budget_left = budget - m_price[m]
+        calories_left = max_calories - m_cal[m]
+        if budget_left < -BUDGET_EPSILON or calories_left < -BUDGET_EPSILON:
+            continue
+        levels = []
+        for price, cal, score, row, links in slots:
+            adjusted = score + bonus * links[m]
+            order = np.lexsort((price, -adjusted))
+            levels.append((price[order].tolist(), cal[order].tolist(), adjusted[order].tolist(), row[order].tolist()))
+        # Best score reachable from each level on, ignoring the budget (skipping a slot scores 0)
+        reachable = [0.0] * (len(levels) + 1)
+        for i in range(len(levels) - 1, -1, -1):
+            reachable[i] = reachable[i + 1] + max(levels[i][2][0] if levels[i][2] else 0.0, 0.0)
+        if m_score[m] + reachable[0] <= top.threshold:
+            continue
+        if budget_left >= sum(max(level[0], default=0.0) for level in levels):
+            best, unit = [[value] for value in reachable], np.inf  # The budget cannot bind below this main
+        else:
+            best, unit = reachable_scores(levels, budget_left)
+            best = [bound.tolist() for bound in best]
+            if m_score[m] + best[0][-1] <= top.threshold:
+                continue
+
+        chosen = [int(m_row[m])]
+
+        def within(bound, budget_left):
+            return bound[min(int(max(budget_left, 0.0) // unit), len(bound) - 1)]
+
+        def descend(level, score, budget_left, calories_left, price_so_far):
+            if level == len(levels):
+                top.push(score, price_so_far, list(chosen))
+                return
+            prices, cals, scores, rows = levels[level]
+            rest = best[level + 1]
+            for price, cal, item_score, row in zip(prices, cals, scores, rows):
+                if score + item_score + rest[-1] <= top.threshold:
+                    break  # Candidates are best first: nothing further down this list can do better
+                if price > budget_left + BUDGET_EPSILON or cal > calories_left + BUDGET_EPSILON:
+                    continue
+                if score + item_score + within(rest, budget_left - price) <= top.threshold:
+                    continue
+                chosen.append(row)
+                descend(level + 1, score + item_score, budget_left - price, calories_left - cal, price_so_far + price)
+                chosen.pop()
+            if score + within(rest, budget_left) > top.threshold:
+                descend(level + 1, score, budget_left, calories_left, price_so_far)
+
+        descend(0, float(m_score[m]), budget_left, calories_left, float(m_price[m]))
+
+
+def build_combos(df, max_budget, max_calories=None, party_size=1, top_k=COMBO_TOP_K, dietary_preferences=None,
+                 dietary_options=None, cuisine=None, available_at=None, smart_cart_rules=None,
+                 candidates_per_slot=COMBO_CANDIDATES_PER_SLOT, complement_bonus=COMBO_COMPLEMENT_BONUS):
+    """
+    Top-k meal combos from the catalog df for party_size people within max_budget (₹ of Price as
+    the cart charges it, before tax) and max_calories per person (ignored when the catalog has no
+    Calories column). Returns dicts with 'restaurant', 'items' (catalog row dicts), 'party_size',
+    'total_price', 'calories_per_person', 'complements' and 'score', best first.
+    """
+    index = filter_index_for(df)
+    party_size = max(int(party_size), 1)
+    if df.empty or index.price is None or 'Category' not in df.columns or max_budget is None:
+        return []
+    budget = float(max_budget) / party_size  # Per person
+    rows = index.select(dietary_preferences, dietary_options, cuisine=cuisine, price_range=(None, budget),
+                        available_at=available_at)
+    rows = rows[_slot_codes(df)[rows] >= 0]
+
+    has_calories = 'Calories' in df.columns
+    if max_calories is not None and not has_calories:
+        logger.warning("Catalog has no Calories column; the calorie limit is ignored")
+    if has_calories:
+        calories = pd.to_numeric(df['Calories'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)[rows]
+    else:
+        calories = np.zeros(len(rows))
+    calorie_limit = float(max_calories) if max_calories is not None and has_calories else np.inf
+    if np.isfinite(calorie_limit):
+        known = calories <= calorie_limit  # Items with unknown calories cannot be shown to fit
+        rows, calories = rows[known], calories[known]
+    calories = np.nan_to_num(calories)
+    prices = index.price.prices[rows]
+    scores = _item_scores(df, rows)
+    slots = _slot_codes(df)[rows]
+    restaurant_codes, restaurants = pd.factorize(df['Restaurant'].iloc[rows].astype(str))
+    names = df['Item'].iloc[rows].astype(str).to_numpy()
+    complementary = (df['Complementary_Items'].iloc[rows].to_numpy() if 'Complementary_Items' in df.columns
+                     else np.full(len(rows), None))
+    if smart_cart_rules is None:
+        smart_cart_rules = load_smart_cart_rules()
+    complement_cache = {}
+
+    def complements_of(name, complementary_items):
+        key = (name, complementary_items if isinstance(complementary_items, str) else None)
+        if key not in complement_cache:
+            complement_cache[key] = frozenset(_complement_names(name, complementary_items, smart_cart_rules))
+        return complement_cache[key]
+
+    top = _TopCombos(top_k)
+    for restaurant in range(len(restaurants)):
+        in_restaurant = restaurant_codes == restaurant
+        main = np.flatnonzero(in_restaurant & (slots == 0))
+        if not len(main):
+            continue
+        main_keys = np.array([complements_of(names[i], complementary[i]) for i in main], dtype=object)
+        # Mains with the same complements share a key; mains with none get key 0
+        main_key_codes = np.where([bool(key) for key in main_keys], pd.factorize(pd.Series(main_keys))[0] + 1, 0)
+        keep = _candidates(prices[main], calories[main], scores[main], main_key_codes, candidates_per_slot, top_k)
+        main, main_keys = main[keep], main_keys[keep]
+
+        slot_candidates = []
+        for slot in range(1, len(COMBO_SLOTS)):
+            members = np.flatnonzero(in_restaurant & (slots == slot))
+            if not len(members):
+                if COMBO_SLOTS[slot][2]:
+                    break
+                continue
+            links = _links(main_keys, names[members])
+            # Items linked to the same set of mains share a key; unlinked items get key 0
+            link_keys = pd.factorize(pd.Series([row.tobytes() for row in links.T]))[0]
+            link_keys = np.where(links.any(axis=0), link_keys + 1, 0)
+            keep = _candidates(prices[members], calories[members], scores[members], link_keys, candidates_per_slot,
+                               top_k)
+            members = members[keep]
+            slot_candidates.append((prices[members], calories[members], scores[members], members, links[:, keep]))
+        else:
+            _search_restaurant((prices[main], calories[main], scores[main], main), slot_candidates, budget,
+                               calorie_limit, complement_bonus, top)
+
+    combos = []
+    for chosen in top.best():
+        positions = rows[chosen]
+        items = [df.iloc[position].to_dict() for position in positions]
+        main_complements = complements_of(names[chosen[0]], complementary[chosen[0]])
+        linked = sum(_goes_with(main_complements, names[i].lower()) for i in chosen[1:])
+        combos.append({
+            'restaurant': restaurants[restaurant_codes[chosen[0]]],
+            'items': items,
+            'party_size': party_size,
+            'total_price': round(float(prices[chosen].sum()) * party_size, 2),
+            'calories_per_person': float(calories[chosen].sum()) if has_calories else None,
+            'complements': linked,
+            'score': round(float(scores[chosen].sum()) + complement_bonus * linked, 3),
+        })
+    return combos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build meal combos under a budget and calorie limit")
+    parser.add_argument('csv_path')
+    parser.add_argument('--budget', type=float, required=True, help="Total for the party, in ₹ as charged at checkout (before tax)")
+    parser.add_argument('--people', type=int, default=1)
+    parser.add_argument('--max-calories', type=float, default=None, help="Per person")
+    parser.add_argument('--diet', choices=['vegetarian', 'non-vegetarian'], default=None)
+    parser.add_argument('--needs', default='', help="Comma-separated dietary needs, e.g. Vegan,Nut-Free")
+    parser.add_argument('--cuisine', default=None)
+    parser.add_argument('--at', default=None, help="Only items available at this time, e.g. 20:30")
+    parser.add_argument('--top', type=int, default=COMBO_TOP_K)
+    args = parser.parse_args()
+
+    from menu_catalog import load_catalog
+    df, _, schema_name = load_catalog(args.csv_path)
+    filter_index_for(df)  # Built once per catalog; not part of the per-query time
+    start = time.perf_counter()
+    combos = build_combos(df, args.budget, args.max_calories, args.people, args.top,
+                          dietary_preferences=[args.diet] if args.diet else None,
+                          dietary_options=[n.strip() for n in args.needs.split(',') if n.strip()],
+                          cuisine=args.cuisine, available_at=args.at)
+    elapsed = time.perf_counter() - start
+    print(f"{args.csv_path}: schema '{schema_name}', {len(df)} items; {len(combos)} combos in {elapsed * 1000:.1f} ms")
+    for rank, combo in enumerate(combos, 1):
+        calories = f", {combo['calories_per_person']:.0f} kcal/person" if combo['calories_per_person'] is not None else ""
+        print(f"{rank}. {combo['restaurant']}: ₹{combo['total_price']:.2f} for {combo['party_size']}{calories}, "
+              f"score {combo['score']:.2f}")
+        for item in combo['items']:
+            print(f"     {item['Item']} ({item['Category']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,7 +9,37 @@ GROQ_API_KEY = os.getenv('GROQ_API_KEY', '')  # Default to empty string if not f
 
 # File paths
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
-MENU_DATASET_PATH = os.path.join(DATA_DIR, 'corrected_menu_dataset.csv')
+# Menu CSV the app loads; any of the schemas menu_catalog.py understands
+MENU_DATASET_PATH = os.getenv('QUICKBITES_MENU_PATH', os.path.join(DATA_DIR, 'dummy_menu_dataset.csv'))
+MENU_CHUNK_ROWS = 100_000  # Rows per chunk when loading the menu (bounds peak memory on large files)
+# State the app learns from orders and ratings (gitignored); QUICKBITES_STATE_DIR moves it elsewhere
+STATE_DIR = os.getenv('QUICKBITES_STATE_DIR', 'data')
+TASTE_PROFILE_DIR = os.path.join(STATE_DIR, 'taste_profiles')  # One JSON file per user (taste_profile.py)
+TRENDING_FILE_PATH = os.path.join(STATE_DIR, 'trending.json')  # Decayed order counters (trending.py)
+CO_PURCHASE_FILE_PATH = os.path.join(STATE_DIR, 'co_purchase.json')  # Learned cart complements (co_purchase.py)
+
+# Admin / diagnostics
+ADMIN_MODE = os.getenv('QUICKBITES_ADMIN', '') == '1'  # Shows the admin memory report in the sidebar
+TRACEMALLOC_ENABLED = os.getenv('QUICKBITES_TRACEMALLOC', '') == '1'  # Trace allocations for the memory report
+
+# Scraper
+SCRAPER_BASE_URL = os.getenv('QUICKBITES_SCRAPER_BASE_URL', 'https://www.zomato.com/kolkata')  # Point at standin_site.py to test offline
+SCRAPER_SNAPSHOT_DIR = os.getenv('QUICKBITES_SNAPSHOT_DIR', '')  # Save each restaurant page here for offline re-extraction
+
+# Scraper pacing. Politeness delays are the minimum pause between finishing one page and requesting
+# the next (seconds, drawn uniformly from the range); they are independent of readiness waits.
+SCRAPER_PAGE_DELAY_RANGE = (2, 4)  # Between pages of the same dish
+SCRAPER_DISH_DELAY_RANGE = (5, 8)  # Between dishes
+SCRAPER_READY_TIMEOUT = 15  # Max seconds to wait for a page to become ready
+SCRAPER_QUIET_SECONDS = 0.5  # Page is ready once DOM and network stay unchanged this long
+SCRAPER_SETTLE_SECONDS = 3  # ...or this long when the expected element never appears
+SCRAPER_CRAWL_WORKERS = 3  # Browser workers used by crawler.py
+SCRAPER_MAX_REQUESTS_PER_SECOND = 0.5  # Per-host cap shared by all crawler workers
+SCRAPER_RATE_BURST = 2  # Requests a host may receive back to back before the cap applies
+SCRAPER_PAGE_CACHE_DIR = os.getenv('QUICKBITES_PAGE_CACHE_DIR', '')  # Cache rendered pages here (page_cache.py); empty disables
+SCRAPER_PAGE_CACHE_TTL_SECONDS = 24 * 60 * 60
+SCRAPER_PAGE_CACHE_ONLY = os.getenv('QUICKBITES_PAGE_CACHE_ONLY', '') == '1'  # Replay from the cache without a browser
+INGEST_STATE_SAVE_SECONDS = 10  # ingest.py --follow: minimum seconds between saves of the ingest manifest
 
 # App settings
 APP_TITLE = "Guli - Food Recommendations"
@@ -35,6 +65,72 @@ DIETARY_OPTIONS = ["Vegan", "Vegetarian", "Gluten-Free", "Keto", "Nut-Free"]
 # Stopwords
 STOPWORDS = {"bhi", "hai", "kya", "ka", "i", "want"}
 
+# Budget words in queries ("cheap", "premium") as price bounds, in ₹ (Price as charged at checkout)
+BUDGET_CHEAP_MAX_PRICE = 200
+BUDGET_PREMIUM_MIN_PRICE = 500
+BUDGET_AROUND_TOLERANCE = 0.2  # "around 300" means 300 ± 20%
+
+# Meal combo builder (combo_optimizer.py)
+COMBO_TOP_K = 5  # Combos returned
+COMBO_CANDIDATES_PER_SLOT = 64  # Items kept per restaurant and course slot after pruning
+COMBO_COMPLEMENT_BONUS = 0.5  # Added to a combo's rating sum for each item that goes with its main
+
+# Item-item collaborative filtering (item_cf.py)
+CF_NEIGHBORS = 20  # Most similar items kept per item
+CF_RATING_CENTER = 3.0  # Ratings above count as liked, below as disliked
+CF_SHRINKAGE = 5  # Similarities from fewer co-rating users are shrunk towards 0
+CF_BOOST_WEIGHT = 4.0  # Recommendation score per star of predicted rating above CF_RATING_CENTER
+
+# Learned co-purchase complements (co_purchase.py)
+CO_PURCHASE_COUNTERS = 32  # Partner counters kept per item (Space-Saving summary)
+CO_PURCHASE_TOP_K = 5  # Complements kept per item
+CO_PURCHASE_MIN_PAIRS = 2  # Orders an item pair needs before it is suggested
+CO_PURCHASE_MIN_CONFIDENCE = 0.1  # ...and the share of the item's orders that included the complement
+CO_PURCHASE_SAVE_SECONDS = 60  # Minimum seconds between saves of CO_PURCHASE_FILE_PATH
+
+# Trending counters (trending.py)
+TRENDING_HALF_LIFE_HOURS = 24  # An order counts half as much this long after it was placed
+TRENDING_ITEM_WEIGHT = 2.0  # Recommendation score per log1p of the item's decayed order count
+TRENDING_RESTAURANT_WEIGHT = 0.5  # ...and per log1p of its restaurant's
+TRENDING_MIN_COUNT = 1.0  # Decayed orders an item needs to be listed under "Trending now"
+TRENDING_SAVE_SECONDS = 60  # Minimum seconds between saves of TRENDING_FILE_PATH
+
+# Community ratings (rating_stats.py)
+RATING_PRIOR_WEIGHT = 5  # Pseudo-ratings at the static Rating that user ratings are averaged with
+RATING_DEFAULT_PRIOR = 3.5  # Prior for catalogs without a Rating column
+
+# Taste profiles (taste_profile.py)
+TASTE_PRICE_BANDS = (150, 300, 500)  # ₹ bounds of the price-band features
+TASTE_ORDER_WEIGHT = 1.0  # Profile weight added to a dish's features per unit ordered
+TASTE_RATING_WEIGHT = 1.0  # ...and per star its rating is above CF_RATING_CENTER (negative below)
+TASTE_BOOST_WEIGHT = 6.0  # Recommendation score of a dish that matches the profile exactly (cosine 1)
+TASTE_REMEMBERED_DISHES = 50  # Recently ordered dishes whose features a profile keeps (for rating them)
+TASTE_SAVE_SECONDS = 60  # Minimum seconds between saves of changed profiles to TASTE_PROFILE_DIR
+
+# Group orders (recommender.get_group_recommendations)
+GROUP_BASKET_SIZE = 6  # Dishes in a group basket
+GROUP_MAX_PER_CATEGORY = 2  # Dishes per category before other categories get a turn
+GROUP_CANDIDATE_FACTOR = 50  # Best-scoring rows considered per basket slot
+
+# Diversity re-ranking (diversity.py)
+DIVERSITY_LAMBDA = 0.7  # Relevance vs. novelty in MMR (1.0 keeps the plain ranking)
+DIVERSITY_CANDIDATE_FACTOR = 5  # Re-rank the best limit x this many dishes
+DIVERSITY_TEXT_WEIGHT = 0.5  # Share of the name/description cosine in item similarity (the rest: taste features)
+DIVERSITY_MAX_PER_RESTAURANT = 3  # Dishes per restaurant before others get a turn
+DIVERSITY_MAX_PER_CATEGORY = 4  # Dishes per category before others get a turn
+DIVERSITY_MAX_PER_ITEM = 1  # Restaurants per dish name (the same dish from several places)
+
+# Query autocomplete (autocomplete.py)
+AUTOCOMPLETE_SUGGESTIONS = 5  # Completions shown under the search box
+AUTOCOMPLETE_CACHED_K = 10  # Completions precomputed per common prefix
+AUTOCOMPLETE_SCAN_LIMIT = 1024  # Prefixes matching more index keys than this are precomputed
+
 # Tax and discount settings
 TAX_RATE = 0.05
-MIN_WALLET_BALANCE = 100 
\ No newline at end of file
+MIN_WALLET_BALANCE = 100 
+
+# Sidebar option lists (shared with the headless load-test tooling)
+DIET_PREFERENCE_OPTIONS = ["any", "vegetarian", "non-vegetarian"]
+OCCASION_OPTIONS = ["Any Occasion", "Quick Lunch", "Family Dinner", "Party", "Healthy Meal"]
+MOOD_OPTIONS = ["Any Mood", "Happy", "Stressed", "Cozy", "Adventurous"]
+WEATHER_CONDITION_OPTIONS = ["Clear", "Sunny", "Cloudy", "Rainy", "Windy", "Snowy", "Foggy"]
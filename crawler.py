@@ -0,0 +1,315 @@
+"""
+Bounded parallel crawl of the dish search and restaurant pages, with resume.
+
+A small pool of browser workers (one WebDriver each) takes tasks from a shared queue:
+a 'search' task per dish yields 'restaurant' tasks for its top restaurants. Requests to a
+host are capped by a token bucket shared by all workers, on top of each browser's own
+politeness delays (scraper.PolitenessPolicy).
+
+Every task's status lives in a checkpoint file that is rewritten after each change, so an
+interrupted crawl resumes with only the unfinished tasks. Each scraped restaurant is appended
+to `{output_dir}/{dish}.jsonl.gz` as soon as it is done (same records as scraper.py).
+
+Usage:
+    python crawler.py --workers 3 --rate 0.5 --output-dir scraped/
+    python crawler.py --dishes burger,pizza --base-url http://127.0.0.1:8765/kolkata   # standin_site.py
+    python crawler.py --restart   # ignore the checkpoint and crawl everything again
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import WebDriverException
+
+import scraper
+from config import (
+    SCRAPER_BASE_URL, SCRAPER_SNAPSHOT_DIR, SCRAPER_PAGE_DELAY_RANGE, SCRAPER_CRAWL_WORKERS,
+    SCRAPER_MAX_REQUESTS_PER_SECOND, SCRAPER_RATE_BURST, SCRAPER_PAGE_CACHE_DIR, SCRAPER_PAGE_CACHE_ONLY
+)
+from jsonl_stream import JsonlWriter
+from page_cache import PageCache
+
+logger = logging.getLogger(__name__)
+
+CRAWL_STATE_PATH = 'crawl_state.json'
+MAX_ATTEMPTS = 3
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, at most `capacity` saved up for bursts."""
+
+    def __init__(self, rate, capacity):
+        if not rate > 0:
+            raise ValueError(f"rate must be greater than 0, got {rate}")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class HostRateLimiter:
+    """One TokenBucket per host, shared by all workers (caps the total request rate per host)."""
+
+    def __init__(self, rate=SCRAPER_MAX_REQUESTS_PER_SECOND, burst=SCRAPER_RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlparse(url or '').netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return bucket.acquire()
+
+
+class CrawlCheckpoint:
+    """
+    Persistent task list: {task_id: {'kind', 'dish', 'url', 'status', 'attempts'}}.
+    Status is pending, running, done or failed; 'running' tasks go back to pending on load,
+    since a crash interrupted them.
+    """
+
+    def __init__(self, path=CRAWL_STATE_PATH):
+        self.path = path
+        self.tasks = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.tasks = json.load(f).get('tasks', {})
+            for task in self.tasks.values():
+                if task['status'] == 'running':
+                    task['status'] = 'pending'
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'tasks': self.tasks}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)  # Atomic, so a crash never leaves a half-written checkpoint
+
+    def add(self, kind, dish, url):
+        """Register a task unless it is already known; returns its id if newly added."""
+        task_id = f"{kind}:{url}"
+        with self._lock:
+            if task_id in self.tasks:
+                return None
+            self.tasks[task_id] = {'kind': kind, 'dish': dish, 'url': url, 'status': 'pending', 'attempts': 0}
+            self._save()
+        return task_id
+
+    def update(self, task_id, **fields):
+        with self._lock:
+            self.tasks[task_id].update(fields)
+            self._save()
+
+    def pending(self):
+        with self._lock:
+            return [task_id for task_id, task in self.tasks.items() if task['status'] == 'pending']
+
+    def summary(self):
+        counts = {}
+        with self._lock:
+            for task in self.tasks.values():
+                counts[task['status']] = counts.get(task['status'], 0) + 1
+        return counts
+
+
+class ResultWriter:
+    """
+    Appends each restaurant to {output_dir}/{dish}.jsonl.gz as soon as it is scraped.
+    A page interrupted between its write and its checkpoint update can appear twice after a
+    resume; readers keep the last record per url.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self._writers = {}
+        self._lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, dish, record):
+        with self._lock:
+            writer = self._writers.get(dish)
+            if writer is None:
+                path = os.path.join(self.output_dir, f"{dish}{scraper.RESULTS_EXTENSION}")
+                writer = self._writers[dish] = JsonlWriter(path, append=True)
+            writer.write(record)
+
+    def close(self):
+        with self._lock:
+            for writer in self._writers.values():
+                writer.close()
+            self._writers = {}
+
+
+class Crawler:
+    """Runs checkpointed search/restaurant tasks on `workers` browser workers."""
+
+    def __init__(self, dishes, output_dir='.', state_path=CRAWL_STATE_PATH, workers=SCRAPER_CRAWL_WORKERS,
+                 rate_limiter=None, base_url=SCRAPER_BASE_URL, driver_factory=None,
+                 restaurants_per_dish=scraper.RESTAURANTS_PER_DISH, page_delay_range=SCRAPER_PAGE_DELAY_RANGE,
+                 snapshot_dir=SCRAPER_SNAPSHOT_DIR, page_cache=None):
+        self.checkpoint = CrawlCheckpoint(state_path)
+        self.writer = ResultWriter(output_dir)
+        self.workers = workers
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.driver_factory = driver_factory or scraper.initialize_driver
+        self.restaurants_per_dish = restaurants_per_dish
+        self.page_delay_range = page_delay_range
+        self.snapshot_dir = snapshot_dir
+        self.page_cache = page_cache
+        self.timings = {}
+        self._timings_lock = threading.Lock()
+        self._queue = queue.Queue()
+        for dish in dishes:
+            self.checkpoint.add('search', dish, f"{base_url}/delivery/dish-{dish}")
+
+    def _record_timings(self, page_timings):
+        with self._timings_lock:
+            for stage, seconds in page_timings.items():
+                self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def _run_task(self, driver, politeness, task_id):
+        task = self.checkpoint.tasks[task_id]
+        page_timings = {}
+        if task['kind'] == 'search':
+            links = scraper.get_restaurant_links(driver, task['url'], timings=page_timings, politeness=politeness,
+                                                 page_cache=self.page_cache)
+            if not links:
+                raise RuntimeError(f"No restaurant links found on {task['url']}")
+            for url in links[:self.restaurants_per_dish]:
+                new_id = self.checkpoint.add('restaurant', task['dish'], url)
+                if new_id:
+                    self._queue.put(new_id)
+        else:
+            snapshot_path = (scraper.snapshot_path_for(self.snapshot_dir, task['dish'], task['url'])
+                             if self.snapshot_dir else None)
+            data = scraper.scrape_restaurant_data(driver, task['url'], timings=page_timings,
+                                                  snapshot_path=snapshot_path, politeness=politeness,
+                                                  page_cache=self.page_cache)
+            if not data['name'] and not data['menu']:
+                raise RuntimeError(f"Nothing extracted from {task['url']}")
+            self.writer.write(task['dish'], dict(data, url=task['url']))
+        self._record_timings(page_timings)
+
+    def _worker(self, worker_id):
+        driver = None
+        politeness = scraper.PolitenessPolicy(self.page_delay_range, rate_limiter=self.rate_limiter)
+        try:
+            while True:
+                task_id = self._queue.get()
+                if task_id is None:
+                    self._queue.task_done()
+                    return
+                task = self.checkpoint.tasks[task_id]
+                self.checkpoint.update(task_id, status='running', attempts=task['attempts'] + 1)
+                try:
+                    if driver is None and not (self.page_cache and self.page_cache.cache_only):
+                        driver = self.driver_factory()
+                    self._run_task(driver, politeness, task_id)
+                    self.checkpoint.update(task_id, status='done')
+                    logger.info(f"[worker {worker_id}] done {task_id}")
+                except Exception as e:
+                    logger.error(f"[worker {worker_id}] {task_id} failed: {str(e)}")
+                    if isinstance(e, WebDriverException) and driver is not None:
+                        # The browser session is gone; start a fresh one for the next task
+                        try:
+                            driver.quit()
+                        except Exception:
+                            pass
+                        driver = None
+                    if self.checkpoint.tasks[task_id]['attempts'] < MAX_ATTEMPTS:
+                        self.checkpoint.update(task_id, status='pending')
+                        self._queue.put(task_id)
+                    else:
+                        self.checkpoint.update(task_id, status='failed')
+                finally:
+                    if task_id is not None:
+                        self._queue.task_done()
+        finally:
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+
+    def run(self):
+        """Crawl until every task is done or failed; returns the checkpoint status counts."""
+        for task_id in self.checkpoint.pending():
+            self._queue.put(task_id)
+        threads = [threading.Thread(target=self._worker, args=(i,), daemon=True) for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        self._queue.join()  # Restaurant tasks are queued before their search task is marked done
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+        self.writer.close()
+        return self.checkpoint.summary()
+
+
+def _positive_float(value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number: {value}")
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel, resumable crawl of dish and restaurant pages")
+    parser.add_argument('--dishes', default=','.join(scraper.FOOD_ITEMS), help="Comma-separated dishes")
+    parser.add_argument('--workers', type=int, default=SCRAPER_CRAWL_WORKERS, help="Browser workers")
+    parser.add_argument('--rate', type=_positive_float, default=SCRAPER_MAX_REQUESTS_PER_SECOND, help="Max requests per second per host")
+    parser.add_argument('--burst', type=int, default=SCRAPER_RATE_BURST, help="Requests allowed in a burst")
+    parser.add_argument('--base-url', default=SCRAPER_BASE_URL)
+    parser.add_argument('--output-dir', default='.', help="Where {dish}.jsonl.gz files are written")
+    parser.add_argument('--state', default=CRAWL_STATE_PATH, help="Checkpoint file")
+    parser.add_argument('--restart', action='store_true', help="Discard the checkpoint and start over")
+    parser.add_argument('--cache-dir', default=SCRAPER_PAGE_CACHE_DIR, help="Page cache directory (page_cache.py)")
+    parser.add_argument('--cache-only', action='store_true', default=SCRAPER_PAGE_CACHE_ONLY,
+                        help="Replay pages from the cache without a browser")
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.state):
+        os.remove(args.state)
+    crawler = Crawler(args.dishes.split(','), output_dir=args.output_dir, state_path=args.state,
+                      workers=args.workers, rate_limiter=HostRateLimiter(args.rate, args.burst),
+                      base_url=args.base_url,
+                      page_cache=PageCache(args.cache_dir, cache_only=args.cache_only) if args.cache_dir else None)
+    start = time.perf_counter()
+    summary = crawler.run()
+    logger.info(f"Crawl finished in {time.perf_counter() - start:.1f}s: {summary}")
+    if crawler.page_cache is not None:
+        logger.info(f"Page cache: {crawler.page_cache.stats}")
+    logger.info(f"Time by stage: {scraper.format_timings(crawler.timings)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Diversity re-ranking of the top recommendations (maximal marginal relevance, MMR).
+
+A plain ranking tends to repeat itself: most of one restaurant's menu, or the same dish from
+several restaurants (drop_duplicates keeps one row per Item *and* Restaurant). rerank() takes the
+best candidates (get_recommendations passes limit x DIVERSITY_CANDIDATE_FACTOR) and picks them one
+at a time, each time the candidate maximizing
+    λ·relevance - (1 - λ)·max similarity to the dishes already picked
+where relevance is the score rescaled to [0, 1] over the candidates and λ = DIVERSITY_LAMBDA.
+Candidates whose restaurant, category or dish name has reached its cap (DIVERSITY_MAX_PER_*) are
+skipped while any other candidate is left.
+
+Similarity is the cosine between item vectors precomputed per catalog DataFrame: the feature
+vector taste_profile already builds (cuisine, category, spice level, tags, price band) next to a
+TF-IDF vector of the item name and description, weighted so that
+    similarity = (1 - DIVERSITY_TEXT_WEIGHT)·feature cosine + DIVERSITY_TEXT_WEIGHT·text cosine
+TF-IDF is fitted on the distinct (name, description) pairs only; rows gather theirs by code.
+Per request the cost is two candidates x candidates sparse products and one vector update per pick.
+
+Usage:
+    python diversity.py corrected_menu_dataset.csv --top 10   # plain vs. diversified top dishes
+"""
+import argparse
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import memory_report
+import taste_profile
+from config import (DIVERSITY_LAMBDA, DIVERSITY_MAX_PER_CATEGORY, DIVERSITY_MAX_PER_ITEM,
+                    DIVERSITY_MAX_PER_RESTAURANT, DIVERSITY_TEXT_WEIGHT)
+
+# Column -> most candidates sharing a value of it
+DIVERSITY_CAPS = {
+    'Restaurant': DIVERSITY_MAX_PER_RESTAURANT,
+    'Category': DIVERSITY_MAX_PER_CATEGORY,
+    'Item': DIVERSITY_MAX_PER_ITEM,
+}
+
+
+class ItemVectors:
+    """Text vectors of one catalog DataFrame (the feature vectors are taste_profile's)."""
+
+    def __init__(self, df, text_weight=DIVERSITY_TEXT_WEIGHT):
+        self.df = weakref.ref(df)
+        self.text_weight = text_weight
+        item_codes, items = pd.factorize(df['Item'].astype(str))
+        if 'Description' in df.columns:
+            description_codes, descriptions = pd.factorize(df['Description'].fillna('').astype(str))
+        else:
+            description_codes, descriptions = np.zeros(len(df), dtype=np.int64), pd.Index([''])
+        text_codes, pairs = pd.factorize(item_codes.astype(np.int64) * len(descriptions) + description_codes)
+        self.text_codes = text_codes.astype(np.int32)
+        texts = [f"{items[pair // len(descriptions)]} {descriptions[pair % len(descriptions)]}" for pair in pairs]
+        try:
+            self.text_matrix = TfidfVectorizer(stop_words='english', dtype=np.float32).fit_transform(texts).tocsr()
+        except ValueError:  # No words left (e.g. empty names)
+            self.text_matrix = sparse.csr_matrix((len(texts), 0), dtype=np.float32)
+        self._value_codes = {}  # Column -> code of each row's value (for the caps)
+        for col in DIVERSITY_CAPS:
+            if col in df.columns:
+                self.value_codes(col)
+
+    @property
+    def nbytes(self):
+        return (self.text_codes.nbytes + self.text_matrix.data.nbytes + self.text_matrix.indices.nbytes
+                + self.text_matrix.indptr.nbytes + sum(codes.nbytes for codes in self._value_codes.values()))
+
+    def value_codes(self, col):
+        """Code of each row's value in col (equal values, equal codes); the DIVERSITY_CAPS columns are precomputed."""
+        codes = self._value_codes.get(col)
+        if codes is None:
+            codes = self._value_codes[col] = pd.factorize(self.df()[col].astype(str))[0].astype(np.int32)
+        return codes
+
+    def similarity(self, positions):
+        """Dense similarity matrix of the given row positions."""
+        features = taste_profile.model().features_for(self.df()).matrix[positions]
+        texts = self.text_matrix[self.text_codes[positions]]
+        return ((1 - self.text_weight) * (features @ features.T).toarray()
+                + self.text_weight * (texts @ texts.T).toarray())
+
+
+# Vectors per catalog DataFrame, keyed by id() and dropped when the DataFrame is collected
+_VECTORS = {}
+
+
+def item_vectors_for(df):
+    """The ItemVectors of df, built on first use."""
+    entry = _VECTORS.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    vectors = ItemVectors(df)
+    key = id(df)
+    _VECTORS[key] = (weakref.ref(df, lambda _: _VECTORS.pop(key, None)), vectors)
+    return vectors
+
+
+def rerank(df, positions, scores, k, diversity_lambda=DIVERSITY_LAMBDA, caps=None):
+    """
+    Indices into positions (row positions of df's candidate dishes, with their scores) of the
+    k dishes MMR picks, in pick order.
+    """
+    positions = np.asarray(positions)
+    k = min(k, len(positions))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+    spread = scores.max() - scores.min()
+    relevance = (scores - scores.min()) / spread if spread > 0 else np.ones(len(scores))
+    vectors = item_vectors_for(df)
+    similarity = vectors.similarity(positions)
+
+    # Per capped column: the candidates' value codes and how many picks have each value
+    cap_state = [(vectors.value_codes(col)[positions], {}, cap)
+                 for col, cap in (DIVERSITY_CAPS if caps is None else caps).items() if col in df.columns and cap]
+
+    max_similarity = np.zeros(len(positions))
+    available = np.ones(len(positions), dtype=bool)
+    within_caps = np.ones(len(positions), dtype=bool)
+    picks = []
+    for _ in range(k):
+        mmr = diversity_lambda * relevance - (1 - diversity_lambda) * max_similarity
+        candidates = available & within_caps
+        if not candidates.any():
+            candidates = available  # Every remaining dish is over a cap: fall back to plain MMR
+        pick = int(np.argmax(np.where(candidates, mmr, -np.inf)))
+        picks.append(pick)
+        available[pick] = False
+        np.maximum(max_similarity, similarity[pick], out=max_similarity)
+        for codes, counts, cap in cap_state:
+            code = codes[pick]
+            counts[code] = counts.get(code, 0) + 1
+            if counts[code] >= cap:
+                within_caps &= codes != code
+    return np.array(picks, dtype=np.int64)
+
+
+memory_report.register_component('diversity_vectors', lambda: sum(vectors.nbytes for _, vectors in _VECTORS.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a catalog's plain and diversified top dishes")
+    parser.add_argument('csv_path', help="Menu CSV")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--candidates', type=int, default=50, help="Best-rated dishes to re-rank")
+    args = parser.parse_args()
+
+    from menu_catalog import load_catalog
+    import rating_stats
+    df, _, _ = load_catalog(args.csv_path)
+    community = rating_stats.model().for_catalog(df)
+    first_rows = np.flatnonzero(~df.duplicated(subset=['Item', 'Restaurant']).to_numpy())
+    positions = first_rows[np.argsort(-community[first_rows], kind='stable')[:args.candidates]]
+
+    start = time.perf_counter()
+    item_vectors_for(df)
+    taste_profile.model().features_for(df)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    picks = rerank(df, positions, community[positions], args.top)
+    elapsed = time.perf_counter() - start
+    for title, rows in (("Plain", positions[:args.top]), ("Diversified", positions[picks])):
+        print(f"{title}:")
+        for row in rows:
+            print(f"  {community[row]:.2f}  {df['Item'].iat[row]} ({df['Restaurant'].iat[row]}, "
+                  f"{df['Category'].iat[row] if 'Category' in df.columns else '-'})")
+    print(f"Vectors for {len(df)} rows built in {built * 1000:.0f} ms; re-ranked {len(positions)} "
+          f"candidates in {elapsed * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
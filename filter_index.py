@@ -0,0 +1,275 @@
+"""
+Precomputed bitmap indexes for the catalog's filter predicates.
+
+For every value of Is_Vegetarian, Category, Cuisine, Spice_Level, Is_Vegan, Is_Gluten_Free and
+every allergen listed in Allergens, the rows holding that value are stored as a packed bitmap
+(one bit per catalog row). Any combination of filters is then a few bitwise ANDs over
+len(df) / 8 bytes instead of string comparisons over the whole catalog.
+
+Prices are indexed separately (PriceIndex): Price as the cart charges it (Discount is shown on
+the cards but not deducted at checkout), sorted once, so a budget range is two binary searches
+and only the rows inside it are touched.
+
+Available_Time windows ("11:00-23:00", "18:00-02:00", "11:00-15:00, 19:00-23:00") are parsed
+once per distinct value into minute-of-day intervals, overnight windows split in two
+(AvailabilityIndex). "Open at 21:30" ORs the bitmaps of the windows containing 21:30.
+
+Indexes are built once per catalog DataFrame (filter_index_for caches them) and show up as
+the 'filter_indexes' component of the memory report.
+"""
+import re
+import weakref
+from datetime import datetime, time as dt_time
+
+import numpy as np
+import pandas as pd
+
+import memory_report
+
+# Columns indexed by exact value
+INDEXED_COLUMNS = ['Is_Vegetarian', 'Category', 'Cuisine', 'Spice_Level', 'Is_Vegan', 'Is_Gluten_Free']
+# Comma-separated list columns indexed by each listed value ("Dairy, Nuts")
+LIST_COLUMNS = ['Allergens']
+EMPTY_LIST_VALUES = {'', 'none', 'nan', 'n/a', '-'}
+
+# Sidebar dietary options (config.DIETARY_OPTIONS) as (column, value, required): rows must have
+# (required=True) or must not have (required=False) that value
+DIETARY_OPTION_PREDICATES = {
+    'Vegetarian': ('Is_Vegetarian', 'Veg', True),
+    'Vegan': ('Is_Vegan', True, True),
+    'Gluten-Free': ('Is_Gluten_Free', True, True),
+    'Nut-Free': ('Allergens', 'nuts', False),
+}
+# Values of the sidebar's dietary preference radio
+DIET_PREFERENCE_PREDICATES = {
+    'vegetarian': ('Is_Vegetarian', 'Veg', True),
+    'non-vegetarian': ('Is_Vegetarian', 'Non-Veg', True),
+}
+
+
+class PriceIndex:
+    """Row positions sorted by Price, the amount the cart charges per unit."""
+
+    def __init__(self, df):
+        price = pd.to_numeric(df['Price'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        self.prices = price
+        order = np.argsort(price, kind='stable')  # NaN prices sort last
+        self.valid = int(np.count_nonzero(~np.isnan(price)))
+        self.order = order[:self.valid].astype(np.int64)
+        self.sorted_prices = price[self.order]
+
+    @property
+    def nbytes(self):
+        return self.prices.nbytes + self.order.nbytes + self.sorted_prices.nbytes
+
+    def positions(self, min_price=None, max_price=None):
+        """Row positions (unsorted) with min_price <= Price <= max_price."""
+        lo = 0 if min_price is None else int(np.searchsorted(self.sorted_prices, min_price, side='left'))
+        hi = self.valid if max_price is None else int(np.searchsorted(self.sorted_prices, max_price, side='right'))
+        return self.order[lo:max(lo, hi)]
+
+
+MINUTES_PER_DAY = 24 * 60
+TIME_WINDOW_RE = re.compile(
+    r'(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm)?\s*(?:-|–|to)\s*(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm)?', re.IGNORECASE)
+ALL_DAY_VALUES = {'24 hours', '24x7', '24/7', 'all day', 'always', 'open 24 hours'}
+
+
+def _minutes(hour, minute, meridiem):
+    hour, minute = int(hour), int(minute or 0)
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem.lower() == 'pm' else 0)
+    return hour * 60 + minute
+
+
+def parse_time_windows(text):
+    """
+    Available_Time text as half-open [start, end) minute-of-day intervals. A window that ends
+    at or before it starts runs past midnight and is split in two. Returns None when the text
+    gives no usable window (the item is then treated as always available).
+    """
+    if text is None or (isinstance(text, float) and text != text):
+        return None
+    text = str(text).strip()
+    if text.lower() in ALL_DAY_VALUES:
+        return [(0, MINUTES_PER_DAY)]
+    windows = []
+    for match in TIME_WINDOW_RE.finditer(text):
+        start = _minutes(match.group(1), match.group(2), match.group(3)) % MINUTES_PER_DAY
+        end = _minutes(match.group(4), match.group(5), match.group(6))
+        end = MINUTES_PER_DAY if end == MINUTES_PER_DAY else end % MINUTES_PER_DAY
+        if start == end:
+            windows.append((0, MINUTES_PER_DAY))
+        elif end > start:
+            windows.append((start, end))
+        else:
+            windows.append((start, MINUTES_PER_DAY))
+            windows.append((0, end))
+    return windows or None
+
+
+def minute_of_day(value):
+    """Minutes since midnight for a datetime / time, an "HH:MM" string or an int."""
+    if isinstance(value, (datetime, dt_time)):
+        return value.hour * 60 + value.minute
+    if isinstance(value, str):
+        match = re.fullmatch(r'\s*(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm)?\s*', value, re.IGNORECASE)
+        if not match:
+            raise ValueError(f"Unrecognized time of day: {value!r}")
+        return _minutes(*match.groups()) % MINUTES_PER_DAY
+    return int(value) % MINUTES_PER_DAY
+
+
+class AvailabilityIndex:
+    """
+    Packed bitmap per distinct Available_Time value plus its parsed windows. Rows whose value
+    is missing or unparseable are in `always` and match every time.
+    """
+
+    def __init__(self, series):
+        self.size = len(series)
+        codes, uniques = pd.factorize(series)
+        self.windows = []  # [(intervals, bitmap)] per distinct parseable value
+        always = codes == -1
+        for code, text in enumerate(uniques):
+            intervals = parse_time_windows(text)
+            if intervals is None:
+                always |= codes == code
+            else:
+                self.windows.append((intervals, np.packbits(codes == code)))
+        self.always = np.packbits(always)
+
+    @property
+    def nbytes(self):
+        return self.always.nbytes + sum(bitmap.nbytes for _, bitmap in self.windows)
+
+    def bitmap_at(self, when):
+        """Rows available at `when` (anything minute_of_day accepts)."""
+        minute = minute_of_day(when)
+        result = self.always.copy()
+        for intervals, bitmap in self.windows:
+            if any(start <= minute < end for start, end in intervals):
+                result |= bitmap
+        return result
+
+
+def _bits_at(bitmap, positions):
+    """Values of a packed bitmap at the given row positions (no unpacking of the whole bitmap)."""
+    return ((bitmap[positions >> 3] >> (7 - (positions & 7))) & 1).astype(bool)
+
+
+def _list_values(text):
+    return {part.strip().lower() for part in str(text).split(',')} - EMPTY_LIST_VALUES
+
+
+class FilterIndex:
+    """Packed bitmaps {column: {value: bitmap}} over the rows of one catalog DataFrame."""
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.bitmaps = {}
+        for col in INDEXED_COLUMNS:
+            if col in df.columns:
+                codes, uniques = pd.factorize(df[col])
+                self.bitmaps[col] = {value: np.packbits(codes == code) for code, value in enumerate(uniques)}
+        for col in LIST_COLUMNS:
+            if col in df.columns:
+                codes, uniques = pd.factorize(df[col])
+                rows_by_value = {}
+                for code, text in enumerate(uniques):
+                    for value in _list_values(text):
+                        rows_by_value.setdefault(value, []).append(code)
+                self.bitmaps[col] = {value: np.packbits(np.isin(codes, value_codes))
+                                     for value, value_codes in rows_by_value.items()}
+        self._none = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.price = PriceIndex(df) if 'Price' in df.columns else None
+        self.availability = AvailabilityIndex(df['Available_Time']) if 'Available_Time' in df.columns else None
+
+    @property
+    def nbytes(self):
+        extra = sum(index.nbytes for index in (self.price, self.availability) if index is not None)
+        return extra + sum(bitmap.nbytes for values in self.bitmaps.values() for bitmap in values.values())
+
+    def has(self, column):
+        return column in self.bitmaps
+
+    def values(self, column):
+        """Indexed values of column (sorted), e.g. for building sidebar options."""
+        return sorted(self.bitmaps.get(column, {}), key=str)
+
+    def bitmap(self, column, value):
+        """Rows where column == value (for list columns: rows listing value)."""
+        if column in LIST_COLUMNS:
+            value = str(value).strip().lower()
+        return self.bitmaps.get(column, {}).get(value, self._none)
+
+    def supported_dietary_options(self, options):
+        """The dietary options this catalog has the columns to filter on."""
+        return [option for option in options
+                if option in DIETARY_OPTION_PREDICATES and self.has(DIETARY_OPTION_PREDICATES[option][0])]
+
+    def select(self, dietary_preferences=None, dietary_options=None, category=None, cuisine=None,
+               spice_level=None, price_range=None, available_at=None):
+        """
+        Sorted positions of the rows matching every filter, or None when no filter applies.
+        price_range is (min_price, max_price) on Price, what the cart charges; either end may be None.
+        available_at keeps items served at that time of day (see minute_of_day).
+        Predicates on columns this catalog lacks are skipped.
+        """
+        result = None
+        predicates = []
+        for preference in dietary_preferences or []:
+            if preference in DIET_PREFERENCE_PREDICATES:
+                predicates.append(DIET_PREFERENCE_PREDICATES[preference])
+        for option in dietary_options or []:
+            if option in DIETARY_OPTION_PREDICATES:
+                predicates.append(DIETARY_OPTION_PREDICATES[option])
+        for column, value in (('Category', category), ('Cuisine', cuisine), ('Spice_Level', spice_level)):
+            if value and value not in ('All', 'Any'):
+                predicates.append((column, value, True))
+
+        for column, value, required in predicates:
+            if not self.has(column):
+                continue
+            bitmap = self.bitmap(column, value)
+            if result is None:
+                result = bitmap if required else ~bitmap
+            else:
+                result = result & bitmap if required else result & ~bitmap
+        if available_at is not None and self.availability is not None:
+            bitmap = self.availability.bitmap_at(available_at)
+            result = bitmap if result is None else result & bitmap
+
+        if price_range is not None and self.price is not None and any(v is not None for v in price_range):
+            # Binary search on the sorted prices, then test only those rows against the bitmaps
+            positions = self.price.positions(*price_range)
+            if len(positions) * 8 > self.size:
+                # Wide range: scattering into a dense mask is cheaper than sorting the positions
+                in_range = np.zeros(self.size, dtype=bool)
+                in_range[positions] = True
+                if result is not None:
+                    in_range &= np.unpackbits(result, count=self.size).astype(bool)
+                return np.flatnonzero(in_range)
+            positions = np.sort(positions)
+            return positions if result is None else positions[_bits_at(result, positions)]
+        if result is None:
+            return None
+        return np.flatnonzero(np.unpackbits(result, count=self.size))
+
+
+# Index per catalog DataFrame, keyed by id() and dropped when the DataFrame is collected
+_INDEXES = {}
+
+
+def filter_index_for(df):
+    """The FilterIndex of df, built on first use."""
+    entry = _INDEXES.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    index = FilterIndex(df)
+    key = id(df)
+    _INDEXES[key] = (weakref.ref(df, lambda _: _INDEXES.pop(key, None)), index)
+    return index
+
+
+memory_report.register_component('filter_indexes', lambda: sum(index.nbytes for _, index in _INDEXES.values()))
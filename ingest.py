@@ -0,0 +1,370 @@
+"""
+Incremental ingestion of scraper output into the menu catalog.
+
+scraper.main() writes one `{food_item}.jsonl.gz` per dish: one restaurant record per line
+({"name", "location", "rating", "menu": [raw text blobs], "url"}); older `{food_item}.json`
+lists are still accepted. This module parses those blobs
+into catalog rows (item, price, description), deduplicates them against the catalog by a
+normalized (item, restaurant) key and upserts only new or changed rows.
+
+The base menu CSV is never rewritten: upserted rows are appended to INGESTED_MENU_CSV_PATH,
+which menu_catalog.load_catalog merges over the base catalog (last row per key wins).
+A small manifest (INGEST_STATE_PATH) remembers the content hash of every ingested key.
+An Ingester hashes the base catalog once per run, so each record costs O(its rows); it saves
+the manifest at most every INGEST_STATE_SAVE_SECONDS while following and once at the end.
+Rows appended after the last save are re-appended by the next run, which is harmless.
+
+Usage:
+    python ingest.py burger.jsonl.gz pizza.jsonl.gz
+    python ingest.py --dir scraped/ --dry-run
+    python ingest.py --dir scraped/ --follow   # ingest each record while crawler.py is still writing
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+
+from config import FOOD_TYPES, INGEST_STATE_SAVE_SECONDS, MENU_DATASET_PATH
+from jsonl_stream import iter_records
+from utils import load_json_file, save_json_file
+
+INGESTED_MENU_CSV_PATH = 'data/ingested_menu.csv'
+INGEST_STATE_PATH = 'data/ingest_state.json'
+SCRAPER_FILE_EXTENSIONS = ('.jsonl.gz', '.jsonl', '.json')
+
+CATALOG_COLUMNS = ['Item', 'Description', 'Price', 'Category', 'Restaurant', 'Location', 'Rating',
+                   'Is_Vegetarian', 'Discount', 'Tags']
+# Columns whose values decide whether an already-known (item, restaurant) row has changed
+HASHED_COLUMNS = ['Item', 'Description', 'Price', 'Category', 'Location', 'Rating', 'Is_Vegetarian', 'Discount']
+
+PRICE_RE = re.compile(r'(?:₹|\bRs\.?|\bINR)\s*([\d,]+(?:\.\d{1,2})?)', re.IGNORECASE)
+RATING_RE = re.compile(r'\b([0-5](?:\.\d)?)\b')
+
+# Badge / button text that appears inside menu cards but is never an item name
+NOISE_LINES = {
+    'bestseller', 'must try', 'customisable', 'customizable', 'add', 'add +', '+', 'new', 'veg', 'non-veg',
+    'read more', 'spicy', 'chef special', "chef's special", 'recommended', 'sold out', 'menu', 'items',
+    'out of stock', 'order now', 'serves 1', 'serves 2',
+}
+NON_VEG_KEYWORDS = {'chicken', 'mutton', 'fish', 'prawn', 'egg', 'meat', 'lamb', 'keema', 'beef', 'pork', 'seafood', 'crab'}
+MAX_NAME_WORDS = 8
+MIN_DESCRIPTION_WORDS = 6
+
+
+def normalize_key_part(text):
+    """Lowercase, drop punctuation and collapse whitespace (used for dedup keys)."""
+    text = re.sub(r'[^\w\s]', ' ', str(text or '').lower())
+    return ' '.join(text.split())
+
+
+def catalog_key(item_name, restaurant_name):
+    return (normalize_key_part(item_name), normalize_key_part(restaurant_name))
+
+
+def parse_price(text):
+    """Extract the first ₹ / Rs. / INR amount from text as a float, or None."""
+    match = PRICE_RE.search(text or '')
+    if not match:
+        return None
+    try:
+        return float(match.group(1).replace(',', ''))
+    except ValueError:
+        return None
+
+
+def parse_rating(text):
+    """Extract a 0-5 rating from text like '4.2' or '4.2\\nDelivery Rating', or None."""
+    match = RATING_RE.search(str(text or ''))
+    return float(match.group(1)) if match else None
+
+
+def _is_noise(line):
+    return line.lower() in NOISE_LINES or line.replace('.', '').isdigit()
+
+
+def _looks_like_name(line):
+    return not _is_noise(line) and len(line.split()) <= MAX_NAME_WORDS and any(c.isalpha() for c in line)
+
+
+def _looks_like_description(line):
+    return len(line.split()) >= MIN_DESCRIPTION_WORDS and not PRICE_RE.search(line)
+
+
+def parse_menu_blob(blob):
+    """
+    Split one raw menu text blob into [{'Item', 'Price', 'Description'}, ...].
+    A price line closes an item: its name is the last name-like line seen since the previous
+    item (or the text before the price on the same line); the first long line after the
+    price becomes the description.
+    """
+    items = []
+    pending = []
+    current = None
+    for raw_line in str(blob or '').splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        price = parse_price(line)
+        if price is not None:
+            inline_name = PRICE_RE.split(line, maxsplit=1)[0].strip(' -:|')
+            candidates = [l for l in pending if _looks_like_name(l)]
+            name = inline_name if inline_name and _looks_like_name(inline_name) else (candidates[-1] if candidates else None)
+            if name:
+                current = {'Item': name, 'Price': price, 'Description': ''}
+                items.append(current)
+            pending = []
+        elif current is not None and not current['Description'] and not pending and _looks_like_description(line):
+            current['Description'] = line
+        else:
+            pending.append(line)
+    return items
+
+
+def infer_category(item_name, dish_term=None):
+    """Map an item to a catalog category using the FOOD_TYPES keywords (default 'Main Course')."""
+    text = f" {normalize_key_part(item_name)} "
+    for keyword, category in FOOD_TYPES.items():
+        if f" {keyword} " in text:
+            return category
+    if dish_term and dish_term.lower() in FOOD_TYPES:
+        return FOOD_TYPES[dish_term.lower()]
+    return 'Main Course'
+
+
+def restaurant_to_rows(restaurant, dish_term=None):
+    """Turn one scraped restaurant record into catalog rows (deduplicated within the restaurant)."""
+    restaurant_name = (restaurant.get('name') or '').strip()
+    if not restaurant_name:
+        return []
+    location = (restaurant.get('location') or '').strip()
+    rating = parse_rating(restaurant.get('rating'))
+
+    rows = {}
+    for blob in restaurant.get('menu') or []:
+        for parsed in parse_menu_blob(blob):
+            key = catalog_key(parsed['Item'], restaurant_name)
+            if key in rows:
+                # Overlapping selectors capture the same card several times; keep the richest copy
+                if not rows[key]['Description'] and parsed['Description']:
+                    rows[key]['Description'] = parsed['Description']
+                continue
+            words = set(normalize_key_part(f"{parsed['Item']} {parsed['Description']}").split())
+            is_veg = not (words & NON_VEG_KEYWORDS)
+            category = infer_category(parsed['Item'], dish_term)
+            tags = ['veg' if is_veg else 'non-veg', category.lower().replace(' ', '_')]
+            if dish_term:
+                tags.append(dish_term.lower())
+            rows[key] = {
+                'Item': parsed['Item'],
+                'Description': parsed['Description'],
+                'Price': parsed['Price'],
+                'Category': category,
+                'Restaurant': restaurant_name,
+                'Location': location,
+                'Rating': rating,
+                'Is_Vegetarian': 'Veg' if is_veg else 'Non-Veg',
+                'Discount': 0,
+                'Tags': ','.join(tags),
+            }
+    return list(rows.values())
+
+
+def scraper_file_dish(path):
+    """The dish term a scraper output file was written for (its name without the extension)."""
+    name = os.path.basename(path)
+    for extension in SCRAPER_FILE_EXTENSIONS:
+        if name.endswith(extension):
+            return name[:-len(extension)]
+    return os.path.splitext(name)[0]
+
+
+def iter_scraper_records(path, follow=False, idle_timeout=None):
+    """Restaurant records of one scraper output file, streamed lazily for JSONL files."""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f) or []
+        return
+    yield from iter_records(path, follow=follow, idle_timeout=idle_timeout)
+
+
+def parse_scraper_file(path):
+    """Parse one scraper output file ({food_item}.jsonl.gz, .jsonl or .json) into catalog rows."""
+    dish_term = scraper_file_dish(path)
+    rows = []
+    for restaurant in iter_scraper_records(path):
+        if isinstance(restaurant, dict):
+            rows.extend(restaurant_to_rows(restaurant, dish_term))
+    return rows
+
+
+def row_hash(row):
+    """Stable content hash of the columns that define a catalog row."""
+    payload = []
+    for col in HASHED_COLUMNS:
+        value = row.get(col)
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        payload.append('' if value is None or (isinstance(value, float) and value != value) else str(value))
+    return hashlib.sha1('\x1f'.join(payload).encode('utf-8')).hexdigest()
+
+
+def known_catalog_hashes(base_menu_df, state):
+    """{normalized key: content hash} for the base catalog overlaid with previously ingested rows."""
+    hashes = {}
+    if base_menu_df is not None and not base_menu_df.empty:
+        for row in base_menu_df.to_dict('records'):
+            hashes[catalog_key(row.get('Item'), row.get('Restaurant'))] = row_hash(row)
+    for key_str, digest in state.get('hashes', {}).items():
+        hashes[tuple(key_str.split('\x1f', 1))] = digest
+    return hashes
+
+
+class Ingester:
+    """Upserts rows into one ingested CSV, deduplicating against the catalog's known content hashes."""
+
+    def __init__(self, base_menu_df=None, ingested_csv_path=INGESTED_MENU_CSV_PATH,
+                 state_path=INGEST_STATE_PATH, dry_run=False):
+        self.ingested_csv_path = ingested_csv_path
+        self.state_path = state_path
+        self.dry_run = dry_run
+        self.state = (load_json_file(state_path, default_data={'hashes': {}}) if os.path.exists(state_path)
+                      else {'hashes': {}})
+        self.state.setdefault('hashes', {})
+        self.known = known_catalog_hashes(base_menu_df, self.state)
+        self.dirty = False  # Manifest has hashes not saved yet
+        self._last_saved = time.monotonic()
+
+    def upsert(self, rows):
+        """
+        Append rows whose (item, restaurant) key is new or whose content changed.
+        Returns {'new': n, 'changed': n, 'unchanged': n}.
+        """
+        to_write = []
+        stats = {'new': 0, 'changed': 0, 'unchanged': 0}
+        for row in rows:
+            key = catalog_key(row['Item'], row['Restaurant'])
+            digest = row_hash(row)
+            if key not in self.known:
+                stats['new'] += 1
+            elif self.known[key] != digest:
+                stats['changed'] += 1
+            else:
+                stats['unchanged'] += 1
+                continue
+            self.known[key] = digest
+            self.state['hashes']['\x1f'.join(key)] = digest
+            to_write.append(row)
+
+        if to_write and not self.dry_run:
+            os.makedirs(os.path.dirname(self.ingested_csv_path) or '.', exist_ok=True)
+            write_header = not os.path.exists(self.ingested_csv_path) or os.path.getsize(self.ingested_csv_path) == 0
+            pd.DataFrame(to_write, columns=CATALOG_COLUMNS).to_csv(
+                self.ingested_csv_path, mode='a', header=write_header, index=False)
+            self.dirty = True
+        return stats
+
+    def save(self):
+        """Write the manifest if it has unsaved hashes."""
+        if self.dirty and save_json_file(self.state_path, self.state):
+            self.dirty = False
+        self._last_saved = time.monotonic()
+
+    def save_if_due(self):
+        if time.monotonic() - self._last_saved >= INGEST_STATE_SAVE_SECONDS:
+            self.save()
+
+
+def upsert_rows(rows, base_menu_df=None, ingested_csv_path=INGESTED_MENU_CSV_PATH,
+                state_path=INGEST_STATE_PATH, dry_run=False):
+    """
+    Append rows whose (item, restaurant) key is new or whose content changed, in one go.
+    Returns {'new': n, 'changed': n, 'unchanged': n}. Use an Ingester for many batches.
+    """
+    ingester = Ingester(base_menu_df, ingested_csv_path, state_path, dry_run)
+    stats = ingester.upsert(rows)
+    ingester.save()
+    return stats
+
+
+def follow_scraper_files(paths, base_menu_df=None, idle_timeout=None, dry_run=False):
+    """
+    Tail each file (one thread per file) and upsert every restaurant as soon as its record
+    is written. A file stops being followed once it has been idle for idle_timeout seconds
+    (None follows until interrupted); returns the summed upsert stats.
+    """
+    totals = {'new': 0, 'changed': 0, 'unchanged': 0}
+    ingester = Ingester(base_menu_df, dry_run=dry_run)
+    lock = threading.Lock()  # The ingester's hashes, CSV and manifest are shared by the threads
+
+    def follow(path):
+        dish_term = scraper_file_dish(path)
+        for restaurant in iter_scraper_records(path, follow=True, idle_timeout=idle_timeout):
+            if not isinstance(restaurant, dict):
+                continue
+            rows = restaurant_to_rows(restaurant, dish_term)
+            with lock:
+                stats = ingester.upsert(rows)
+                ingester.save_if_due()
+                for key in totals:
+                    totals[key] += stats[key]
+            print(f"{path}: {restaurant.get('name') or restaurant.get('url')}: {len(rows)} rows, "
+                  f"{stats['new']} new, {stats['changed']} changed")
+
+    threads = [threading.Thread(target=follow, args=(path,), daemon=True) for path in paths]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    finally:
+        with lock:
+            ingester.save()
+    return totals
+
+
+def main():
+    from menu_catalog import load_catalog
+
+    parser = argparse.ArgumentParser(description="Ingest scraper output into the menu catalog")
+    parser.add_argument('files', nargs='*', help="Scraper output files ({food_item}.jsonl.gz or .json)")
+    parser.add_argument('--dir', help="Ingest every *.jsonl.gz, *.jsonl and *.json file in this directory")
+    parser.add_argument('--menu', default=MENU_DATASET_PATH, help="Base catalog CSV to deduplicate against")
+    parser.add_argument('--dry-run', action='store_true', help="Report what would change without writing")
+    parser.add_argument('--follow', action='store_true', help="Keep ingesting records as they are appended")
+    parser.add_argument('--idle-timeout', type=float, default=None,
+                        help="With --follow, stop following a file after this many seconds without new records")
+    args = parser.parse_args()
+
+    paths = list(args.files)
+    if args.dir:
+        for extension in SCRAPER_FILE_EXTENSIONS:
+            paths.extend(sorted(glob.glob(os.path.join(args.dir, f"*{extension}"))))
+    if not paths:
+        parser.error("No input files given.")
+
+    base_menu_df = load_catalog(args.menu, ingested_csv_path=None)[0] if os.path.exists(args.menu) else None
+    if args.follow:
+        totals = follow_scraper_files(paths, base_menu_df, idle_timeout=args.idle_timeout, dry_run=args.dry_run)
+    else:
+        totals = {'new': 0, 'changed': 0, 'unchanged': 0}
+        ingester = Ingester(base_menu_df, dry_run=args.dry_run)
+        for path in paths:
+            rows = parse_scraper_file(path)
+            stats = ingester.upsert(rows)
+            for key in totals:
+                totals[key] += stats[key]
+            print(f"{path}: {len(rows)} rows parsed, {stats['new']} new, {stats['changed']} changed, "
+                  f"{stats['unchanged']} unchanged")
+        ingester.save()
+    action = "Would write" if args.dry_run else "Wrote"
+    print(f"{action} {totals['new'] + totals['changed']} rows to {INGESTED_MENU_CSV_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+"""
+Item-item collaborative filtering over the ratings store (data/ratings.json).
+
+Ratings form a sparse user x item matrix R (an item is an (item_name, restaurant_name) pair),
+centred on CF_RATING_CENTER so 4-5 stars count as liked and 1-2 as disliked. The model keeps
+two item x item accumulators: S = RᵀR (co-rating dot products) and C, the number of users who
+rated both items. The similarity of two items is their cosine, shrunk towards 0 when few users
+rated both:
+    sim(i, j) = S[i, j] / (|R_i| |R_j|) * C[i, j] / (C[i, j] + CF_SHRINKAGE)
+Only each item's CF_NEIGHBORS most similar items (sim > 0) are kept, in fixed-width
+int32 / float32 arrays.
+
+The model is built in bulk with sparse products the first time it is used (model()). After that
+utils.add_or_update_rating notifies it of every rating change. A change touches one entry of R,
+so S and C change only in that item's row and column (O(items the user rated)). The neighbor
+lists of that item and of the items co-rated with it are marked stale and recomputed only when
+a request reads them.
+
+At request time a user's centred ratings x are multiplied with the rows of the neighbor matrix W
+that belong to the items they rated:
+    score(j) = (x W)[j] / (|x|₀ W)[j]
+the similarity-weighted average of the user's ratings over the rated items that list j as a
+neighbor. Items the user already rated are left out.
+
+Usage:
+    python item_cf.py                      # build from data/ratings.json and print model stats
+    python item_cf.py --user d88b0c87      # and the CF scores for one user
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+
+import memory_report
+import utils
+from config import CF_NEIGHBORS, CF_RATING_CENTER, CF_SHRINKAGE
+
+
+def shrunk_cosine(dots, counts, norms_sq_a, norms_sq_b, shrinkage):
+    """sim = S / (|R_a| |R_b|) * C / (C + shrinkage), elementwise; 0 where an item has no ratings."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sims = dots / np.sqrt(norms_sq_a * norms_sq_b) * counts / (counts + shrinkage)
+    return np.nan_to_num(sims, posinf=0.0, neginf=0.0)
+
+
+class ItemCFModel:
+    """Incrementally maintained item-item neighbor model; see the module docstring."""
+
+    def __init__(self, neighbors=CF_NEIGHBORS, center=CF_RATING_CENTER, shrinkage=CF_SHRINKAGE):
+        self.neighbors = neighbors
+        self.center = center
+        self.shrinkage = shrinkage
+        self.items = []  # Item keys by index
+        self.item_index = {}  # (item_name, restaurant_name) -> index
+        self.user_ratings = {}  # user_id -> {item index: centred rating}
+        self.dots = []  # Per item: {co-rated item: S[i, j]}
+        self.counts = []  # Per item: {co-rated item: C[i, j]}
+        self.norms_sq = np.zeros(0)  # |R_i|²
+        self.neighbor_idx = np.zeros((0, neighbors), dtype=np.int32)  # -1 pads unused slots
+        self.neighbor_sim = np.zeros((0, neighbors), dtype=np.float32)
+        self._stale = set()  # Items whose neighbor lists are out of date (refreshed when next needed)
+        self._matrix = None  # Whole csr W, rebuilt from the neighbor arrays when they change
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_ratings(cls, ratings, **kwargs):
+        """Bulk build from ratings-store entries (the last entry per user and item wins; 0 means cleared)."""
+        model = cls(**kwargs)
+        latest = {}
+        for entry in ratings:
+            key = (entry.get('item_name'), entry.get('restaurant_name'))
+            latest[(entry.get('user_id'), key)] = entry.get('rating')
+        user_rows, item_cols, values = [], [], []
+        user_index = {}
+        for (user_id, key), rating in latest.items():
+            if not rating or not user_id or not key[0]:
+                continue
+            item = model._item(key)
+            value = float(rating) - model.center
+            model.user_ratings.setdefault(user_id, {})[item] = value
+            user_rows.append(user_index.setdefault(user_id, len(user_index)))
+            item_cols.append(item)
+            values.append(value)
+
+        n = len(model.items)
+        ratings_matrix = sparse.csr_matrix((values, (user_rows, item_cols)), shape=(len(user_index), n))
+        rated = ratings_matrix.copy()
+        rated.data = np.ones_like(rated.data)
+        dots = (ratings_matrix.T @ ratings_matrix).tocsr()
+        counts = (rated.T @ rated).tocoo()
+        model.norms_sq = dots.diagonal().astype(np.float64)
+        off_diagonal = counts.row != counts.col
+        rows, cols = counts.row[off_diagonal], counts.col[off_diagonal]
+        pair_counts = counts.data[off_diagonal].astype(np.int64)
+        pair_dots = np.asarray(dots[rows, cols]).ravel()
+        order = np.lexsort((cols, rows))
+        rows, cols, pair_counts, pair_dots = rows[order], cols[order], pair_counts[order], pair_dots[order]
+        starts = np.searchsorted(rows, np.arange(n + 1))
+        for i in range(n):
+            start, end = starts[i], starts[i + 1]
+            row_cols = cols[start:end].tolist()
+            model.counts[i] = dict(zip(row_cols, pair_counts[start:end].tolist()))
+            model.dots[i] = dict(zip(row_cols, pair_dots[start:end].tolist()))
+
+        # Top neighbors of every item at once: rank the pairs within each row by similarity
+        sims = shrunk_cosine(pair_dots, pair_counts, model.norms_sq[rows], model.norms_sq[cols], model.shrinkage)
+        positive = sims > 0
+        rows, cols, sims = rows[positive], cols[positive], sims[positive]
+        order = np.lexsort((cols, -sims, rows))
+        rows, cols, sims = rows[order], cols[order], sims[order]
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        top = rank < model.neighbors
+        model.neighbor_idx[rows[top], rank[top]] = cols[top]
+        model.neighbor_sim[rows[top], rank[top]] = sims[top]
+        return model
+
+    def _item(self, key):
+        """Index of an item key, adding an empty row for a new item."""
+        index = self.item_index.get(key)
+        if index is None:
+            index = self.item_index[key] = len(self.items)
+            self.items.append(key)
+            self.dots.append({})
+            self.counts.append({})
+            self.norms_sq = np.append(self.norms_sq, 0.0)
+            if index >= len(self.neighbor_idx):
+                grow = max(len(self.neighbor_idx), 64)
+                self.neighbor_idx = np.vstack([self.neighbor_idx, np.full((grow, self.neighbors), -1, dtype=np.int32)])
+                self.neighbor_sim = np.vstack([self.neighbor_sim, np.zeros((grow, self.neighbors), dtype=np.float32)])
+        return index
+
+    def _refresh_row(self, i):
+        """Recompute item i's neighbor list from its accumulator rows."""
+        row = self.counts[i]
+        columns = np.fromiter(row.keys(), dtype=np.int64, count=len(row))
+        counts = np.fromiter(row.values(), dtype=np.float64, count=len(row))
+        dots = np.array([self.dots[i].get(j, 0.0) for j in row], dtype=np.float64)
+        sims = shrunk_cosine(dots, counts, self.norms_sq[i], self.norms_sq[columns], self.shrinkage)
+        positive = sims > 0
+        columns, sims = columns[positive], sims[positive]
+        top = np.lexsort((columns, -sims))[:self.neighbors]
+        self.neighbor_idx[i] = -1
+        self.neighbor_sim[i] = 0
+        self.neighbor_idx[i, :len(top)] = columns[top]
+        self.neighbor_sim[i, :len(top)] = sims[top]
+
+    def _refresh(self, items):
+        """Bring the neighbor lists of the given items up to date."""
+        stale = self._stale.intersection(items)
+        for i in stale:
+            self._refresh_row(i)
+        if stale:
+            self._stale -= stale
+            self._matrix = None
+
+    def update(self, user_id, item_name, restaurant_name, rating):
+        """Apply one rating change (rating 0 / None clears the user's rating of the item)."""
+        if not user_id or not item_name:
+            return
+        with self._lock:
+            i = self._item((item_name, restaurant_name))
+            user_items = self.user_ratings.setdefault(user_id, {})
+            old = user_items.get(i)
+            new = float(rating) - self.center if rating else None
+            if old == new:
+                return
+            delta = (new or 0.0) - (old or 0.0)
+            delta_count = (new is not None) - (old is not None)
+            for j, value in user_items.items():
+                if j == i:
+                    continue
+                for a, b in ((i, j), (j, i)):
+                    self.dots[a][b] = self.dots[a].get(b, 0.0) + delta * value
+                    if delta_count:
+                        count = self.counts[a].get(b, 0) + delta_count
+                        if count:
+                            self.counts[a][b] = count
+                        else:
+                            del self.counts[a][b]
+                            self.dots[a].pop(b, None)
+            self.norms_sq[i] += (new or 0.0) ** 2 - (old or 0.0) ** 2
+            if new is None:
+                del user_items[i]
+            else:
+                user_items[i] = new
+
+            # |R_i| changed, so every item co-rated with i (before or after) sees a new sim(k, i)
+            self._stale.add(i)
+            self._stale.update(self.counts[i])
+            self._stale.update(user_items)
+            self._matrix = None
+
+    def _rows_matrix(self, items):
+        """Rows `items` of W as a csr matrix: W[i, j] = sim(i, j) for the neighbors j of item i."""
+        idx, sims = self.neighbor_idx[items], self.neighbor_sim[items]
+        used = idx != -1
+        rows = np.repeat(np.arange(len(items), dtype=np.int32), used.sum(axis=1))
+        return sparse.csr_matrix((sims[used], (rows, idx[used])), shape=(len(items), len(self.items)))
+
+    def neighbor_matrix(self):
+        """The whole neighbor matrix W (csr, items x items)."""
+        with self._lock:
+            self._refresh(range(len(self.items)))
+            if self._matrix is None:
+                self._matrix = self._rows_matrix(np.arange(len(self.items)))
+            return self._matrix
+
+    def scores_for_user(self, user_id):
+        """{(item_name, restaurant_name): predicted centred rating} for items the user has not rated."""
+        with self._lock:
+            user_items = dict(self.user_ratings.get(user_id, {}))
+            if not user_items:
+                return {}
+            rated = np.fromiter(user_items.keys(), dtype=np.int64, count=len(user_items))
+            self._refresh(user_items)  # Only the rows of the user's items are needed
+            matrix = self._rows_matrix(rated)
+        values = np.fromiter(user_items.values(), dtype=np.float64, count=len(user_items))
+        numerator = matrix.T @ values  # x W restricted to the user's rows
+        denominator = matrix.T @ np.ones(len(rated))
+        denominator[rated] = 0  # Already rated
+        scored = np.flatnonzero(denominator > 0)
+        return {self.items[j]: float(numerator[j] / denominator[j]) for j in scored.tolist()}
+
+    def scores_for_users(self, user_ids):
+        """
+        Batched scores_for_user: (item keys, len(user_ids) x len(keys) array of predicted centred
+        ratings, 0 where there is no prediction or the user rated the item). One product of the
+        users' rating matrix with the neighbor rows of every item any of them rated.
+        """
+        with self._lock:
+            rated = [dict(self.user_ratings.get(user_id, {})) for user_id in user_ids]
+            union = sorted(set().union(*rated))
+            if not union:
+                return [], np.zeros((len(user_ids), 0))
+            self._refresh(union)
+            matrix = self._rows_matrix(np.array(union, dtype=np.int64))
+            keys = list(self.items)
+        column = {item: c for c, item in enumerate(union)}
+        rows = np.repeat(np.arange(len(rated)), [len(items) for items in rated])
+        cols = np.array([column[i] for items in rated for i in items], dtype=np.int64)
+        values = np.array([value for items in rated for value in items.values()])
+        shape = (len(user_ids), len(union))
+        numerator = (sparse.csr_matrix((values, (rows, cols)), shape=shape) @ matrix).toarray()
+        # Ratings at the centre are 0 but still count in the denominator
+        denominator = (sparse.csr_matrix((np.ones(len(values)), (rows, cols)), shape=shape) @ matrix).toarray()
+        denominator[rows, np.array(union, dtype=np.int64)[cols]] = 0  # Already rated
+        scores = np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+        return keys, scores
+
+    def stats(self):
+        n = len(self.items)
+        self.neighbor_matrix()
+        return {
+            'users': len(self.user_ratings),
+            'items': n,
+            'ratings': sum(len(items) for items in self.user_ratings.values()),
+            'co_rated_pairs': sum(len(row) for row in self.counts) // 2,
+            'neighbor_entries': int((self.neighbor_idx[:n] != -1).sum()),
+        }
+
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+
+def model():
+    """The process-wide model, built from the ratings store on first use."""
+    global _MODEL
+    with _MODEL_LOCK:
+        if _MODEL is None:
+            _MODEL = ItemCFModel.from_ratings(utils.load_ratings())
+        return _MODEL
+
+
+def _on_rating(user_id, item_name, restaurant_name, rating_value, previous_rating):
+    if _MODEL is not None:  # Otherwise the first model() call reads the new rating from the store
+        _MODEL.update(user_id, item_name, restaurant_name, rating_value)
+
+
+utils.add_rating_listener(_on_rating)
+memory_report.register_component('item_cf', lambda: memory_report.deep_sizeof(_MODEL) if _MODEL is not None else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the item-item CF model from the ratings store")
+    parser.add_argument('--user', default=None, help="Print the CF scores for this user")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cf_model = model()
+    print(f"Built in {(time.perf_counter() - start) * 1000:.1f} ms: {cf_model.stats()}")
+    if args.user:
+        start = time.perf_counter()
+        scores = cf_model.scores_for_user(args.user)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{len(scores)} unseen items scored for {args.user} in {elapsed:.2f} ms")
+        for (item_name, restaurant_name), score in sorted(scores.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {score:+.2f}  {item_name} ({restaurant_name})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Streaming JSONL files for scraper results (one restaurant record per line, optionally gzipped).
+
+JsonlWriter flushes every record as soon as it is written (a gzip sync flush for `.gz` files),
+so a reader sees each record while the crawl is still running. iter_records streams records
+lazily without loading the file, stops cleanly at a partially written last line and, with
+follow=True, keeps tailing the file for new records.
+
+Gzipped files may hold several gzip members (one per writer session, e.g. after a crawl
+resumes); iter_records reads them all.
+"""
+import gzip
+import json
+import os
+import time
+import zlib
+
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class JsonlWriter:
+    """Append-or-truncate JSONL writer; gzip compression when the path ends in .gz."""
+
+    def __init__(self, path, append=True):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        mode = 'ab' if append else 'wb'
+        if path.endswith('.gz'):
+            self._file = gzip.open(path, mode, compresslevel=6)
+        else:
+            self._file = open(path, mode)
+        self.count = 0
+
+    def write(self, record):
+        self._file.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+        self._file.flush()  # GzipFile.flush() is a zlib sync flush: everything so far becomes readable
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _decompressed_chunks(f, gzipped):
+    """Yield decoded bytes from the current position of f until the data available now runs out."""
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16) if gzipped else None
+    while True:
+        raw = f.read(READ_CHUNK_BYTES)
+        if not raw:
+            yield None  # Caller decides whether to wait for more data (the decompressor state is kept)
+            continue
+        if decompressor is None:
+            yield raw
+            continue
+        while raw:
+            data = decompressor.decompress(raw)
+            if data:
+                yield data
+            if decompressor.eof:
+                # End of one gzip member; any remaining bytes start the next member
+                raw = decompressor.unused_data
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            else:
+                raw = b''
+
+
+def iter_records(path, follow=False, poll_interval=1.0, idle_timeout=None):
+    """
+    Lazily yield the records of a JSONL (or .jsonl.gz) file. A trailing partial line is held
+    back until it is complete. With follow=True, wait for new lines instead of stopping at the
+    end; idle_timeout (seconds without new data) ends following, None follows forever.
+    """
+    buffer = b''
+    idle_since = None
+    with open(path, 'rb') as f:
+        for chunk in _decompressed_chunks(f, path.endswith('.gz')):
+            if chunk is None:
+                if not follow:
+                    break
+                idle_since = idle_since or time.monotonic()
+                if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                    break
+                time.sleep(poll_interval)
+                continue
+            idle_since = None
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
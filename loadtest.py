@@ -0,0 +1,210 @@
+"""
+Query replay load test for the recommendation path.
+
+Drives search contexts (query text, category, diet, occasion, mood, weather) through
+recommender.get_recommendations headlessly and reports throughput plus p50/p95/p99
+latency per stage and end to end.
+
+Usage:
+    python loadtest.py generate --count 500 --output contexts.jsonl
+    python loadtest.py run --contexts contexts.jsonl --concurrency 8
+    python loadtest.py run --synthetic 200 --concurrency 4 --output loadtest_report.json
+"""
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import recommender
+from config import DIET_PREFERENCE_OPTIONS, OCCASION_OPTIONS, MOOD_OPTIONS, WEATHER_CONDITION_OPTIONS
+from nlp_utils import FOOD_TERMS, extract_food_preferences
+
+PERCENTILES = [50, 95, 99]
+
+# Phrases used to compose synthetic "What are you craving?" queries
+QUERY_TEMPLATES = [
+    "{term} {item}",
+    "something {term} for {meal}",
+    "{item}",
+    "I want {term} food",
+    "{term} {meal} near me",
+    "",  # Browsing without a query
+]
+
+
+def generate_contexts(menu_df, count, seed=None):
+    """
+    Generate `count` synthetic search contexts from the sidebar option lists
+    and the categories/items in menu_df.
+    """
+    rng = random.Random(seed)
+    categories = ['All']
+    item_names = ['biryani', 'pizza', 'paneer']
+    if menu_df is not None and not menu_df.empty:
+        categories += sorted(menu_df['Category'].astype(str).unique())
+        item_names = menu_df['Item'].astype(str).unique().tolist()
+    terms = [t for key in ('spicy', 'sweet', 'healthy', 'taste', 'cooking_style') for t in FOOD_TERMS[key]]
+    meals = FOOD_TERMS['meal_type']
+
+    contexts = []
+    for _ in range(count):
+        template = rng.choice(QUERY_TEMPLATES)
+        query = template.format(term=rng.choice(terms), item=rng.choice(item_names).lower(), meal=rng.choice(meals))
+        contexts.append({
+            'query': query,
+            'category': rng.choice(categories),
+            'diet': rng.choice(DIET_PREFERENCE_OPTIONS),
+            'occasion': rng.choice(OCCASION_OPTIONS),
+            'mood': rng.choice(MOOD_OPTIONS),
+            'weather': {
+                'condition': rng.choice(WEATHER_CONDITION_OPTIONS),
+                'temperature': float(rng.randint(5, 42)),
+            },
+        })
+    return contexts
+
+
+def load_contexts(path):
+    """Load contexts from a JSON list or a JSONL file (one context per line)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read().strip()
+    if not text:
+        return []
+    if text.startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def save_contexts(contexts, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for context in contexts:
+            f.write(json.dumps(context, ensure_ascii=False) + "\n")
+
+
+def run_context(menu_df, context, limit=10):
+    """Run one context through the recommendation path and return its stage timings (seconds)."""
+    timings = {}
+    start = time.perf_counter()
+
+    query = context.get('query') or None
+    if query:
+        stage_start = time.perf_counter()
+        extract_food_preferences(query)
+        timings['preferences'] = time.perf_counter() - stage_start
+
+    category = context.get('category')
+    diet = context.get('diet', 'any')
+    recommender.get_recommendations(
+        menu_df,
+        category=category if category and category != 'All' else None,
+        dietary_preferences=[] if diet in (None, 'any') else [diet],
+        limit=limit,
+        user_query=query,
+        occasion=context.get('occasion'),
+        mood=context.get('mood'),
+        current_weather_input=context.get('weather'),
+        user_id=context.get('user_id'),
+        timings=timings,
+    )
+    timings['total'] = time.perf_counter() - start
+    return timings
+
+
+def summarize(samples_by_stage, wall_seconds, request_count, concurrency):
+    """Build the report dict: throughput and latency percentiles (ms) per stage."""
+    report = {
+        'requests': request_count,
+        'concurrency': concurrency,
+        'wall_seconds': round(wall_seconds, 4),
+        'throughput_rps': round(request_count / wall_seconds, 2) if wall_seconds > 0 else None,
+        'stages': {},
+    }
+    for stage, samples in samples_by_stage.items():
+        samples_ms = np.array(samples) * 1000.0
+        stage_report = {'count': len(samples), 'mean_ms': round(float(samples_ms.mean()), 3)}
+        for p in PERCENTILES:
+            stage_report[f'p{p}_ms'] = round(float(np.percentile(samples_ms, p)), 3)
+        report['stages'][stage] = stage_report
+    return report
+
+
+def run_load_test(menu_df, contexts, concurrency=4, limit=10):
+    """Replay contexts at the given concurrency and return the summary report."""
+    samples_by_stage = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for timings in executor.map(lambda c: run_context(menu_df, c, limit), contexts):
+            for stage, seconds in timings.items():
+                samples_by_stage.setdefault(stage, []).append(seconds)
+    wall_seconds = time.perf_counter() - start
+    return summarize(samples_by_stage, wall_seconds, len(contexts), concurrency)
+
+
+def print_report(report):
+    print(f"Requests: {report['requests']}  Concurrency: {report['concurrency']}  "
+          f"Wall: {report['wall_seconds']:.2f}s  Throughput: {report['throughput_rps']} req/s")
+    header = f"{'stage':<12}{'count':>8}{'mean':>10}" + "".join(f"{'p' + str(p):>10}" for p in PERCENTILES)
+    print(header)
+    print("-" * len(header))
+    for stage, stats in report['stages'].items():
+        row = f"{stage:<12}{stats['count']:>8}{stats['mean_ms']:>10.2f}"
+        row += "".join(f"{stats[f'p{p}_ms']:>10.2f}" for p in PERCENTILES)
+        print(row)
+    print("(latencies in ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QuickBites recommendation load test")
+    parser.add_argument('--menu', default=recommender.MENU_CSV_PATH, help="Menu CSV to load")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    gen_parser = subparsers.add_parser('generate', help="Write synthetic search contexts as JSONL")
+    gen_parser.add_argument('--count', type=int, default=500)
+    gen_parser.add_argument('--seed', type=int, default=None)
+    gen_parser.add_argument('--output', default='contexts.jsonl')
+
+    run_parser = subparsers.add_parser('run', help="Replay contexts and report latency percentiles")
+    source = run_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--contexts', help="JSON/JSONL file of recorded or generated contexts")
+    source.add_argument('--synthetic', type=int, help="Generate this many contexts on the fly")
+    run_parser.add_argument('--seed', type=int, default=None)
+    run_parser.add_argument('--concurrency', type=int, default=4)
+    run_parser.add_argument('--repeat', type=int, default=1, help="Replay the context list this many times")
+    run_parser.add_argument('--limit', type=int, default=10, help="Recommendations per request")
+    run_parser.add_argument('--warmup', type=int, default=3, help="Untimed requests run first")
+    run_parser.add_argument('--output', help="Write the JSON report here")
+
+    args = parser.parse_args()
+    menu_df, _ = recommender.read_menu_data(args.menu)
+
+    if args.command == 'generate':
+        contexts = generate_contexts(menu_df, args.count, seed=args.seed)
+        save_contexts(contexts, args.output)
+        print(f"Wrote {len(contexts)} contexts to {args.output}")
+        return
+
+    if args.contexts:
+        contexts = load_contexts(args.contexts)
+    else:
+        contexts = generate_contexts(menu_df, args.synthetic, seed=args.seed)
+    contexts = contexts * max(args.repeat, 1)
+    if not contexts:
+        parser.error("No contexts to replay.")
+
+    for context in contexts[:args.warmup]:
+        run_context(menu_df, context, args.limit)
+
+    report = run_load_test(menu_df, contexts, concurrency=args.concurrency, limit=args.limit)
+    report['menu'] = args.menu
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
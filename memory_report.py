@@ -0,0 +1,321 @@
+"""
+Memory report for the QuickBites process.
+
+Breaks resident memory down by component (menu catalog, NLP models, indexes, per-session
+state) using object-size accounting plus tracemalloc attribution by package, and saves
+snapshots as JSON so two of them can be diffed to spot leaks.
+
+Usage:
+    python memory_report.py snapshot --sessions 50 --output mem_before.json
+    python memory_report.py diff mem_before.json mem_after.json
+
+Set QUICKBITES_TRACEMALLOC=1 to trace allocations inside the Streamlit app (see the admin
+view enabled by QUICKBITES_ADMIN=1); tracing starts when this module is first imported.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from config import TRACEMALLOC_ENABLED
+
+if TRACEMALLOC_ENABLED and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+# Packages whose allocations count towards the "NLP models" component
+NLP_PACKAGES = {'spacy', 'thinc', 'nltk', 'srsly', 'blis', 'cymem', 'preshed', 'murmurhash', 'en_core_web_sm'}
+
+# Extra components (e.g. search indexes) registered by other modules: name -> callable returning bytes
+_COMPONENT_SIZERS = {}
+
+# Snapshots taken in this process, oldest first (used by the admin view to diff over time)
+SNAPSHOT_HISTORY = []
+MAX_SNAPSHOT_HISTORY = 20
+
+
+def register_component(name, sizer):
+    """Register a callable returning the current size in bytes of a named component."""
+    _COMPONENT_SIZERS[name] = sizer
+
+
+def current_rss_bytes():
+    """Resident set size of this process in bytes (falls back to peak RSS off Linux)."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def deep_sizeof(obj, _seen=None):
+    """
+    Approximate the memory held by obj and everything it references.
+    DataFrames, numpy arrays and scipy sparse matrices report their buffer sizes.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    # pandas / numpy / scipy containers know their own buffer sizes
+    if hasattr(obj, 'memory_usage') and hasattr(obj, 'columns'):
+        try:
+            return int(obj.memory_usage(deep=True).sum())
+        except Exception:
+            pass
+    if hasattr(obj, 'nbytes') and hasattr(obj, 'dtype'):
+        return int(obj.nbytes) + sys.getsizeof(obj, 0)
+    if hasattr(obj, 'indptr') and hasattr(obj, 'indices') and hasattr(obj, 'data'):
+        return int(obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes)
+
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, _seen) for item in obj)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += deep_sizeof(vars(obj), _seen)
+    return size
+
+
+def session_state_sizes(state, _seen=None):
+    """
+    Size in bytes of each key of one session's state mapping.
+    Objects already in _seen (e.g. a catalog shared across sessions) are not counted again.
+    """
+    if _seen is None:
+        _seen = set()
+    return {str(key): deep_sizeof(value, _seen) for key, value in dict(state).items()}
+
+
+def live_streamlit_sessions():
+    """
+    Return {session_id: state_dict} for every active Streamlit session in this server process.
+    Uses Streamlit's runtime internals, so it returns {} when they are unavailable.
+    """
+    try:
+        from streamlit.runtime import Runtime
+        if not Runtime.exists():
+            return {}
+        session_infos = Runtime.instance()._session_mgr.list_active_sessions()
+        return {info.session.id: dict(info.session.session_state.filtered_state) for info in session_infos}
+    except Exception:
+        return {}
+
+
+def package_of(filename):
+    """Map a source filename to its top-level package (or module name for repo files)."""
+    normalized = filename.replace('\\', '/')
+    for marker in ('site-packages/', 'dist-packages/'):
+        if marker in normalized:
+            return normalized.split(marker, 1)[1].split('/', 1)[0].split('.', 1)[0]
+    if '/lib/python' in normalized:
+        return 'stdlib'
+    return os.path.splitext(os.path.basename(normalized))[0]
+
+
+def tracemalloc_breakdown(top_n=25):
+    """Traced bytes grouped by package and the top allocation sites (empty when not tracing)."""
+    if not tracemalloc.is_tracing():
+        return {}, {}
+    snapshot = tracemalloc.take_snapshot()
+    by_package = {}
+    for stat in snapshot.statistics('filename'):
+        package = package_of(stat.traceback[0].filename)
+        by_package[package] = by_package.get(package, 0) + stat.size
+    top_lines = {}
+    for stat in snapshot.statistics('lineno')[:top_n]:
+        frame = stat.traceback[0]
+        top_lines[f"{frame.filename}:{frame.lineno}"] = stat.size
+    return dict(sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)), top_lines
+
+
+def take_snapshot(menu_df=None, sessions=None, label=None):
+    """
+    Build a JSON-serializable memory snapshot.
+    sessions is {session_id: state_mapping}; per-key sizes are summed across sessions.
+    """
+    by_package, top_lines = tracemalloc_breakdown()
+    components = {}
+    seen = set()
+    if menu_df is not None:
+        components['catalog'] = deep_sizeof(menu_df, seen)
+    if by_package:
+        components['nlp_models'] = sum(size for package, size in by_package.items() if package in NLP_PACKAGES)
+    for name, sizer in _COMPONENT_SIZERS.items():
+        try:
+            components[name] = int(sizer())
+        except Exception:
+            components[name] = None
+
+    session_totals = {}
+    per_session = []
+    for state in (sessions or {}).values():
+        sizes = session_state_sizes(state, seen)
+        per_session.append(sum(sizes.values()))
+        for key, size in sizes.items():
+            session_totals[key] = session_totals.get(key, 0) + size
+    components['sessions'] = sum(per_session)
+
+    traced_current, traced_peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+    return {
+        'label': label,
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'rss_bytes': current_rss_bytes(),
+        'traced_bytes': traced_current,
+        'traced_peak_bytes': traced_peak,
+        'components': components,
+        'session_count': len(per_session),
+        'session_bytes_max': max(per_session) if per_session else 0,
+        'session_keys': dict(sorted(session_totals.items(), key=lambda kv: kv[1], reverse=True)),
+        'packages': by_package,
+        'top_allocations': top_lines,
+    }
+
+
+def remember_snapshot(snapshot):
+    """Keep snapshot in the in-process history (bounded) and return the previous one, if any."""
+    previous = SNAPSHOT_HISTORY[-1] if SNAPSHOT_HISTORY else None
+    SNAPSHOT_HISTORY.append(snapshot)
+    del SNAPSHOT_HISTORY[:-MAX_SNAPSHOT_HISTORY]
+    return previous
+
+
+def _dict_delta(old, new):
+    keys = set(old or {}) | set(new or {})
+    delta = {}
+    for key in keys:
+        old_value = (old or {}).get(key) or 0
+        new_value = (new or {}).get(key) or 0
+        if new_value != old_value:
+            delta[key] = new_value - old_value
+    return dict(sorted(delta.items(), key=lambda kv: abs(kv[1]), reverse=True))
+
+
+def diff_snapshots(old, new):
+    """Byte deltas (new - old) for RSS, components, session keys, packages and allocation sites."""
+    return {
+        'from': old.get('timestamp'),
+        'to': new.get('timestamp'),
+        'rss_bytes': (new.get('rss_bytes') or 0) - (old.get('rss_bytes') or 0),
+        'traced_bytes': (new.get('traced_bytes') or 0) - (old.get('traced_bytes') or 0),
+        'session_count': new.get('session_count', 0) - old.get('session_count', 0),
+        'components': _dict_delta(old.get('components'), new.get('components')),
+        'session_keys': _dict_delta(old.get('session_keys'), new.get('session_keys')),
+        'packages': _dict_delta(old.get('packages'), new.get('packages')),
+        'top_allocations': dict(list(_dict_delta(old.get('top_allocations'), new.get('top_allocations')).items())[:15]),
+    }
+
+
+def format_bytes(n):
+    if n is None:
+        return "n/a"
+    sign = '-' if n < 0 else ''
+    n = abs(n)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024 or unit == 'GB':
+            return f"{sign}{n:.1f} {unit}" if unit != 'B' else f"{sign}{n} B"
+        n /= 1024.0
+
+
+def print_snapshot(snapshot):
+    print(f"RSS: {format_bytes(snapshot['rss_bytes'])}  traced: {format_bytes(snapshot['traced_bytes'])}"
+          f"  sessions: {snapshot['session_count']} (largest {format_bytes(snapshot['session_bytes_max'])})")
+    print("Components:")
+    for name, size in snapshot['components'].items():
+        print(f"  {name:<24}{format_bytes(size):>12}")
+    if snapshot['session_keys']:
+        print("Session state (all sessions):")
+        for key, size in list(snapshot['session_keys'].items())[:10]:
+            print(f"  {key:<24}{format_bytes(size):>12}")
+    if snapshot['packages']:
+        print("Traced allocations by package:")
+        for package, size in list(snapshot['packages'].items())[:10]:
+            print(f"  {package:<24}{format_bytes(size):>12}")
+
+
+def print_diff(diff):
+    print(f"{diff['from']} -> {diff['to']}")
+    print(f"RSS: {format_bytes(diff['rss_bytes'])}  traced: {format_bytes(diff['traced_bytes'])}"
+          f"  sessions: {diff['session_count']:+d}")
+    for section in ('components', 'session_keys', 'packages', 'top_allocations'):
+        if diff[section]:
+            print(f"{section}:")
+            for key, delta in list(diff[section].items())[:10]:
+                print(f"  {key:<60}{format_bytes(delta):>12}")
+
+
+def simulate_sessions(menu_df, count, seed=0):
+    """Build `count` session-state dicts shaped like app.py's (cart, order history, recommendations)."""
+    import synthetic_data
+    histories = synthetic_data.generate_order_histories(menu_df, count * 3, n_users=count, seed=seed)
+    sessions = {}
+    for i, (user_id, orders) in enumerate(histories.items()):
+        sessions[user_id] = {
+            'menu_df': menu_df,  # Shared reference, counted once under 'catalog'
+            'user_id': user_id,
+            'cart': [dict(item) for item in orders[-1]['items']],
+            'order_history': orders,
+            'current_recommendations': menu_df.iloc[(i * 10) % max(len(menu_df) - 10, 1):][:10].to_dict('records'),
+        }
+    return sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QuickBites memory report")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    snap_parser = subparsers.add_parser('snapshot', help="Load the app's components and report memory by component")
+    snap_parser.add_argument('--menu', default=None, help="Menu CSV to load (default: the app's dataset)")
+    snap_parser.add_argument('--sessions', type=int, default=0, help="Simulated sessions to include")
+    snap_parser.add_argument('--query', default="spicy chicken for dinner",
+                             help="Query run once to warm caches and measure transient peak")
+    snap_parser.add_argument('--label', default=None)
+    snap_parser.add_argument('--output', help="Write the snapshot JSON here")
+
+    diff_parser = subparsers.add_parser('diff', help="Diff two saved snapshots")
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new')
+
+    args = parser.parse_args()
+
+    if args.command == 'diff':
+        with open(args.old, 'r') as f_old, open(args.new, 'r') as f_new:
+            print_diff(diff_snapshots(json.load(f_old), json.load(f_new)))
+        return
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    import recommender  # Imports nlp_utils (spaCy, NLTK) while tracing so the models are attributed
+    menu_df, _ = recommender.read_menu_data(args.menu or recommender.MENU_CSV_PATH)
+
+    sessions = simulate_sessions(menu_df, args.sessions) if args.sessions else {}
+    if args.query:
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        recommender.get_recommendations(menu_df, user_query=args.query)
+        print(f"Warm-up query: {time.perf_counter() - start:.3f}s, "
+              f"transient peak {format_bytes(tracemalloc.get_traced_memory()[1])}")
+
+    snapshot = take_snapshot(menu_df, sessions, label=args.label)
+    print_snapshot(snapshot)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(snapshot, f, indent=4)
+        print(f"Snapshot written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+Unified, chunked loader for every menu CSV schema in the repo.
+
+Three schemas are in use:
+    data/dummy_menu_dataset.csv       Item, Category, Restaurant, Location, Is_Vegetarian (Veg/Non-Veg), Tags
+    data/corrected_menu_dataset.csv   Item, Category, Restaurant, Address, Is_Vegetarian (Yes/No), Cuisine, ...
+    corrected_menu_dataset.csv        Item Name, Type, Restaurant Name, Veg/Non-Veg, Discount ("18% off")
+
+Each file is mapped onto one canonical catalog (CATALOG_COLUMNS, the same columns ingest.py
+writes) with typed columns: Price/Rating/Discount are numbers, Is_Vegetarian is 'Veg' or
+'Non-Veg', and low-cardinality text columns are pandas categoricals. Strings such as
+"18% off" or "₹1,200" are parsed once here rather than every time an item is rendered.
+
+Files are read in chunks of MENU_CHUNK_ROWS rows. Each chunk is normalized and compacted
+before the next one is read, so peak memory stays near one raw chunk plus the typed catalog.
+
+Usage:
+    python menu_catalog.py corrected_menu_dataset.csv          # schema, dtypes and memory per column
+    python menu_catalog.py big_menu.csv --chunk-rows 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, union_categoricals
+
+from config import MENU_CHUNK_ROWS
+from ingest import CATALOG_COLUMNS, INGESTED_MENU_CSV_PATH, normalize_key_part
+
+# Columns without which the app loses features (placeholders are added when they are missing)
+REQUIRED_MENU_COLUMNS = ['Item', 'Price', 'Category', 'Restaurant', 'Is_Vegetarian', 'Tags']
+
+# Known schemas: the source columns that identify the schema, and their canonical names
+MENU_SCHEMAS = [
+    {'name': 'catalog', 'detect': {'Item', 'Tags'}, 'rename': {}},
+    {'name': 'restaurant_detail', 'detect': {'Item', 'Address', 'Is_Vegan'},
+     'rename': {'Address': 'Location'}},
+    {'name': 'flat_export', 'detect': {'Item Name', 'Restaurant Name'},
+     'rename': {'Item Name': 'Item', 'Type': 'Category', 'Restaurant Name': 'Restaurant',
+                'Veg/Non-Veg': 'Is_Vegetarian'}},
+]
+
+NUMERIC_COLUMNS = {'Price': 'float64', 'Rating': 'float64', 'Discount': 'float32'}
+TEXT_COLUMNS = ['Item', 'Description', 'Tags']
+# Text columns with few distinct values, stored as categoricals
+CATEGORY_COLUMNS = ['Category', 'Restaurant', 'Location', 'Is_Vegetarian', 'Cuisine', 'Spice_Level',
+                    'Popularity', 'Available_Time']
+YES_NO_COLUMNS = ['Is_Vegan', 'Is_Gluten_Free']
+
+VEG_VALUES = {'veg', 'vegetarian', 'yes', 'y', 'true', '1', 'pure veg'}
+NON_VEG_VALUES = {'non-veg', 'non veg', 'nonveg', 'non-vegetarian', 'no', 'n', 'false', '0'}
+NUMBER_RE = r'(-?\d+(?:\.\d+)?)'
+
+
+def detect_schema(columns):
+    """The MENU_SCHEMAS entry matching a CSV header (the canonical catalog if none does)."""
+    columns = set(columns)
+    for schema in MENU_SCHEMAS:
+        if schema['detect'] <= columns:
+            return schema
+    return MENU_SCHEMAS[0]
+
+
+def map_unique(series, func):
+    """
+    Apply a vectorized func to the distinct values of series only and broadcast the results
+    back (menu columns repeat a handful of values across millions of rows).
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    mapped = func(pd.Series(uniques, dtype=series.dtype if isinstance(series.dtype, pd.CategoricalDtype) else None))
+    return pd.Series(mapped.to_numpy()[codes], index=series.index)
+
+
+def _parse_number_values(series):
+    text = series.astype('string').str.replace(',', '', regex=False)
+    return pd.to_numeric(text.str.extract(NUMBER_RE, expand=False), errors='coerce')
+
+
+def parse_number(series):
+    """Numbers out of strings like "18% off", "₹1,200" or "4.5/5"; unparseable values become NaN."""
+    if is_numeric_dtype(series):
+        return series.astype('float64')
+    return map_unique(series, _parse_number_values).astype('float64')
+
+
+def _normalize_veg_values(series):
+    lowered = series.astype('string').str.strip().str.lower()
+    normalized = series.astype('object').copy()
+    normalized[lowered.isin(VEG_VALUES).fillna(False).to_numpy(bool)] = 'Veg'
+    normalized[lowered.isin(NON_VEG_VALUES).fillna(False).to_numpy(bool)] = 'Non-Veg'
+    return normalized.fillna('Unknown')
+
+
+def normalize_veg(series):
+    """Map Veg/Yes/True/... to 'Veg' and Non-Veg/No/False/... to 'Non-Veg'; other values are kept."""
+    return map_unique(series, _normalize_veg_values)
+
+
+def _is_yes(series):
+    return series.astype('string').str.strip().str.lower().isin(VEG_VALUES).fillna(False).astype(bool)
+
+
+def _tag_word(series):
+    return series.fillna('').astype(str).str.strip().str.lower().str.replace(' ', '_', regex=False)
+
+
+def derive_tags(df):
+    """Tags for schemas that have none: diet, category and cuisine as lowercase tag words."""
+    tags = map_unique(df['Is_Vegetarian'], _tag_word)
+    for col in ('Category', 'Cuisine'):
+        if col in df.columns:
+            tags = tags + ',' + map_unique(df[col], _tag_word)
+    return map_unique(tags, lambda values: values.str.replace(r',+', ',', regex=True).str.strip(','))
+
+
+def normalize_chunk(chunk, schema):
+    """Rename a raw chunk to canonical columns and parse its values (text columns stay object)."""
+    df = chunk.rename(columns=schema['rename'])
+    df = df.loc[:, ~df.columns.duplicated()]
+    for col, dtype in NUMERIC_COLUMNS.items():
+        if col in df.columns:
+            values = parse_number(df[col])
+            if col == 'Discount':
+                values = values.fillna(0)
+            df[col] = values.astype(dtype)
+    if 'Is_Vegetarian' in df.columns:
+        df['Is_Vegetarian'] = normalize_veg(df['Is_Vegetarian'])
+    for col in YES_NO_COLUMNS:
+        if col in df.columns:
+            df[col] = map_unique(df[col], _is_yes).astype(bool)
+    if 'Tags' not in df.columns and 'Is_Vegetarian' in df.columns:
+        df['Tags'] = derive_tags(df)
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            # Interning makes repeated names/descriptions/tags share one string object across chunks
+            values = df[col] if col == 'Item' else df[col].fillna('')
+            df[col] = values.map(sys.intern, na_action='ignore')
+    return df
+
+
+def compact_chunk(df):
+    """Store low-cardinality text columns of a normalized chunk as categoricals."""
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def concat_chunks(chunks):
+    """Concatenate compacted chunks, merging the categories of categorical columns."""
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+    columns = list(dict.fromkeys(col for chunk in chunks for col in chunk.columns))
+    categorical = [col for col in columns
+                   if all(col in chunk.columns and isinstance(chunk[col].dtype, pd.CategoricalDtype) for chunk in chunks)]
+    merged = pd.concat([chunk.drop(columns=categorical) for chunk in chunks], ignore_index=True)
+    for col in categorical:
+        merged[col] = union_categoricals([chunk[col] for chunk in chunks])
+    return compact_chunk(merged[columns])  # Columns missing from some chunks come back as object
+
+
+def iter_catalog_chunks(csv_path, chunk_rows=MENU_CHUNK_ROWS):
+    """Yield (schema, normalized and compacted chunk) for one menu CSV, chunk_rows rows at a time."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    schema = detect_schema(header)
+    # Text columns are read as str so a chunk of all-numeric item names does not become ints
+    text_dtypes = {col: str for col in header if schema['rename'].get(col, col) in TEXT_COLUMNS + CATEGORY_COLUMNS}
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows, dtype=text_dtypes):
+        yield schema, compact_chunk(normalize_chunk(chunk, schema))
+
+
+def drop_superseded_rows(df):
+    """Keep the last row per normalized (Item, Restaurant) key, so ingested rows replace older ones."""
+    keys = df['Item'].map(normalize_key_part) + '\x1f' + df['Restaurant'].astype(str).map(normalize_key_part)
+    return df[~keys.duplicated(keep='last').to_numpy()].reset_index(drop=True)
+
+
+def load_catalog(csv_path, ingested_csv_path=INGESTED_MENU_CSV_PATH, chunk_rows=MENU_CHUNK_ROWS):
+    """
+    Load any supported menu CSV (plus rows upserted by ingest.py) as the canonical typed catalog.
+    Returns (df, missing_columns, schema_name); missing required columns are added as placeholders
+    so callers can warn without crashing.
+    """
+    chunks = []
+    schema = MENU_SCHEMAS[0]
+    for schema, chunk in iter_catalog_chunks(csv_path, chunk_rows):
+        chunks.append(chunk)
+    if not chunks:
+        chunks.append(compact_chunk(normalize_chunk(pd.read_csv(csv_path, nrows=0), schema)))
+
+    has_ingested = bool(ingested_csv_path) and os.path.exists(ingested_csv_path)
+    if has_ingested:
+        chunks.extend(chunk for _, chunk in iter_catalog_chunks(ingested_csv_path, chunk_rows))
+    df = concat_chunks(chunks)
+    del chunks
+    if has_ingested and not df.empty:
+        df = drop_superseded_rows(df)
+
+    missing_columns = []
+    for col in REQUIRED_MENU_COLUMNS:
+        if col not in df.columns:
+            missing_columns.append(col)
+            if col == 'Tags':
+                df[col] = ""
+            elif col == 'Price':
+                df[col] = 0.0
+            else:
+                df[col] = pd.Categorical(["Unknown"] * len(df))
+    ordered = [col for col in CATALOG_COLUMNS if col in df.columns]
+    return df[ordered + [col for col in df.columns if col not in ordered]], missing_columns, schema['name']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a menu CSV through the unified catalog loader")
+    parser.add_argument('csv_path')
+    parser.add_argument('--chunk-rows', type=int, default=MENU_CHUNK_ROWS)
+    parser.add_argument('--ingested', default=None, help="Also overlay this ingest.py output")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df, missing_columns, schema_name = load_catalog(args.csv_path, args.ingested, args.chunk_rows)
+    elapsed = time.perf_counter() - start
+    print(f"{args.csv_path}: schema '{schema_name}', {len(df)} rows in {elapsed:.2f}s, "
+          f"{df.memory_usage(deep=True).sum() / 1e6:.1f} MB in memory")
+    if missing_columns:
+        print(f"Missing columns (placeholders added): {', '.join(missing_columns)}")
+    for col in df.columns:
+        print(f"  {col:<20}{str(df[col].dtype):<12}{df[col].memory_usage(deep=True) / 1e6:>8.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
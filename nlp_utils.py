@@ -5,10 +5,14 @@ from nltk.corpus import stopwords
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+import pandas as pd
 import re
 # from textblob import TextBlob # Not used in the current functions
 import spacy
-from collections import defaultdict
+from datetime import datetime, time as dt_time
+
+from config import BUDGET_CHEAP_MAX_PRICE, BUDGET_PREMIUM_MIN_PRICE, BUDGET_AROUND_TOLERANCE
+from taste_profile import profile_from_orders
 
 # --- NLTK Downloads (run once) ---
 try:
@@ -53,6 +57,128 @@ FOOD_TERMS = {
     'cooking_style': ['grilled', 'fried', 'baked', 'steamed', 'roasted', 'stir-fried', 'curried', 'poached', 'smoked', 'bbq']
 }
 
+# --- Budget phrases (used by parse_budget) ---
+_AMOUNT = r'(?:₹|rs\.?|inr)?\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:₹|rs\.?|inr|rupees|bucks|/-)?'
+BUDGET_PATTERNS = [
+    ('range', re.compile(r'\bbetween\s+' + _AMOUNT + r'\s+(?:and|to|-)\s+' + _AMOUNT)),
+    ('range', re.compile(r'(?<![\w.:])' + _AMOUNT + r'\s*(?:-|to)\s*' + _AMOUNT + r'(?![\w.])')),
+    ('max', re.compile(r'\b(?:under|below|less than|cheaper than|up to|upto|within|max(?:imum)?|not more than|no more than)\s+' + _AMOUNT)),
+    ('max', re.compile(r'(?:<=?)\s*' + _AMOUNT)),
+    ('max', re.compile(_AMOUNT + r'\s+(?:or less|or below|or under|max)\b')),
+    ('max', re.compile(r'\bbudget\s*(?:(?:of|is)\s+|:\s*)?' + _AMOUNT)),
+    ('min', re.compile(r'\b(?:over|above|more than|at least|min(?:imum)?|starting at)\s+' + _AMOUNT)),
+    ('min', re.compile(r'(?:>=?)\s*' + _AMOUNT)),
+    ('min', re.compile(_AMOUNT + r'\s+(?:or more|and above|plus)\b')),
+    ('around', re.compile(r'\b(?:around|about|approx(?:imately)?|roughly|near)\s+' + _AMOUNT)),
+    # A bare amount marked as money ("cheap biryani ₹150") caps the price; it beats the budget words
+    ('max', re.compile(r'(?:₹|\brs\.?|\binr)\s*(\d+(?:,\d{3})*(?:\.\d+)?)|\b(\d+(?:,\d{3})*(?:\.\d+)?)\s*(?:rupees|bucks|/-)')),
+]
+# "under 500 kcal" is a calorie limit, not a price
+CALORIE_UNIT_RE = re.compile(r'\s*(?:kcal|k?cals?\b|calories)')
+# ...nor is "around 9:30 pm" (a time, see AT_TIME_RE), "10 to 12 people" (a head-count),
+# "within 30 minutes" (a duration) or "under 2 km" (a distance)
+NOT_PRICE_RE = re.compile(r'\s*(?::|[ap]\.?m\b|o\'?clock\b|people\b|persons\b|adults\b|guests\b'
+                          r'|min(?:ute)?s?\b|hours?\b|hrs?\b|kms?\b)')
+CHEAP_WORDS = re.compile(r'\b(?:cheap|cheapest|budget|affordable|inexpensive|economical|pocket[- ]friendly)\b')
+PREMIUM_WORDS = re.compile(r'\b(?:premium|expensive|luxury|fancy|splurge)\b')
+
+
+def _amount(text):
+    return float(text.replace(',', ''))
+
+
+def parse_budget(text_query):
+    """
+    Price bounds from budget phrases in a query: "under 200" -> (None, 200.0),
+    "between 100 and 250" / "₹100-250" -> (100.0, 250.0), "over 300" -> (300.0, None),
+    "around 300" -> 300 ± BUDGET_AROUND_TOLERANCE, "budget of 400" / "₹400" -> (None, 400.0).
+    "cheap" / "premium" map to config bounds only when the query gives no amount.
+    Returns None when the query names no budget.
+    """
+    if not isinstance(text_query, str) or not text_query.strip():
+        return None
+    text = text_query.lower()
+    for kind, pattern in BUDGET_PATTERNS:
+        match = next((m for m in pattern.finditer(text)
+                      if not CALORIE_UNIT_RE.match(text, m.end()) and not NOT_PRICE_RE.match(text, m.end())), None)
+        if not match:
+            continue
+        if kind == 'range':
+            low, high = sorted((_amount(match.group(1)), _amount(match.group(2))))
+            if high < 10:
+                continue  # "serves 2-3", not a price
+            return (low, high)
+        amount = _amount(next(group for group in match.groups() if group))
+        if kind == 'max':
+            return (None, amount)
+        if kind == 'min':
+            return (amount, None)
+        return (amount * (1 - BUDGET_AROUND_TOLERANCE), amount * (1 + BUDGET_AROUND_TOLERANCE))
+    if CHEAP_WORDS.search(text):
+        return (None, float(BUDGET_CHEAP_MAX_PRICE))
+    if PREMIUM_WORDS.search(text):
+        return (float(BUDGET_PREMIUM_MIN_PRICE), None)
+    return None
+
+# --- Party size and calorie phrases (used by the meal combo builder) ---
+NUMBER_WORDS = {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8,
+                'nine': 9, 'ten': 10, 'couple': 2}
+PARTY_SIZE_PATTERNS = [
+    re.compile(r'\b(?:for|serves?|feeds?|party of|family of|group of)\s+(?:a\s+)?(' + '|'.join(NUMBER_WORDS) + r')\b'),
+    re.compile(r'\b(?:for|serves?|feeds?|party of|family of|group of)\s+(\d{1,2})\b(?!\s*(?:₹|rs|inr|rupees|/-))'),
+    re.compile(r'\b(\d{1,2}|' + '|'.join(NUMBER_WORDS) + r')\s+(?:people|persons|adults|guests|of us)\b'),
+]
+CALORIE_LIMIT_RE = re.compile(r'(\d+(?:,\d{3})*)' + CALORIE_UNIT_RE.pattern)
+
+
+def parse_party_size(text_query):
+    """People a query orders for: "dinner for two", "for 3 people", "family of four". None if unstated."""
+    if not isinstance(text_query, str) or not text_query.strip():
+        return None
+    text = text_query.lower()
+    for pattern in PARTY_SIZE_PATTERNS:
+        for match in pattern.finditer(text):
+            value = match.group(1)
+            size = NUMBER_WORDS[value] if value in NUMBER_WORDS else int(value)
+            if 1 <= size <= 20:
+                return size
+    return None
+
+
+def parse_calorie_limit(text_query):
+    """Calorie limit named in a query ("under 1500 kcal", "800 calories") as a float, or None."""
+    if not isinstance(text_query, str):
+        return None
+    match = CALORIE_LIMIT_RE.search(text_query.lower())
+    return _amount(match.group(1)) if match else None
+
+# --- Time-of-day phrases (used by parse_available_time) ---
+NOW_WORDS = re.compile(r'\b(?:open now|available now|right now|serving now)\b')
+AT_TIME_RE = re.compile(r'\b(?:at|by|around)\s+(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm)?\b')
+
+
+def parse_available_time(text_query, now=None):
+    """
+    Time of day a query asks items to be available at: "open now" -> now, "at 21:30" /
+    "at 9:30 pm" -> that time. A bare "at 9" needs am/pm or minutes to count as a time.
+    Returns a datetime.time or None.
+    """
+    if not isinstance(text_query, str) or not text_query.strip():
+        return None
+    text = text_query.lower()
+    if NOW_WORDS.search(text):
+        return (now or datetime.now()).time().replace(second=0, microsecond=0)
+    for match in AT_TIME_RE.finditer(text):
+        hour, minute, meridiem = match.groups()
+        if minute is None and meridiem is None:
+            continue
+        hour, minute = int(hour), int(minute or 0)
+        if meridiem:
+            hour = hour % 12 + (12 if meridiem == 'pm' else 0)
+        if hour < 24 and minute < 60:
+            return dt_time(hour, minute)
+    return None
+
 
 def analyze_sentiment_text(text):
     """Analyze sentiment of a given text string."""
@@ -93,7 +219,11 @@ def extract_food_preferences(text_query):
         'vegetarian': False, 'non_vegetarian': False,
         'meal_type': None, # Will store the first matched meal type string
         'taste': [],       # List of matched taste keywords
-        'cooking_style': [] # List of matched cooking style keywords
+        'cooking_style': [], # List of matched cooking style keywords
+        'budget': None, # (min_price, max_price) from parse_budget
+        'available_at': None, # datetime.time from parse_available_time
+        'party_size': None, # People ordering, from parse_party_size
+        'max_calories': None # Calorie limit from parse_calorie_limit
     }
     if not isinstance(text_query, str) or not text_query.strip():
         return preferences
@@ -124,6 +254,10 @@ def extract_food_preferences(text_query):
                         preferences['non_vegetarian'] = False
                     elif category == 'non_vegetarian' and preferences['non_vegetarian']:
                         preferences['vegetarian'] = False
+    preferences['budget'] = parse_budget(text_query)
+    preferences['available_at'] = parse_available_time(text_query)
+    preferences['party_size'] = parse_party_size(text_query)
+    preferences['max_calories'] = parse_calorie_limit(text_query)
     return preferences
 
 
@@ -250,20 +384,12 @@ def extract_dietary_restrictions_from_text(text_query):
                 restrictions_found.append(restriction_name)
     return restrictions_found
 
-# Example of a more complex recommendation function that might use order history
-# This is NOT directly used by the main.py provided but shows a different approach
 def generate_historical_recommendation_profile(user_order_history):
     """
-    Generate a user profile based on their order history.
-    (This is a conceptual function, not fully integrated with main.py's get_recommendations)
+    Build a taste profile ({feature: weight}, see taste_profile.py) from a whole order history,
+    e.g. to backfill a user whose orders predate profiles. Live profiles are updated per order
+    and rating by taste_profile.py instead of being rebuilt from history.
     """
     if not user_order_history:
         return {}
-
-    # Example: Aggregate preferences for cuisine, price, time
-    # Assumes 'Cuisine', 'Price' are in item details and order has 'timestamp'
-    cuisine_preferences = defaultdict(int)
-    # ... more complex aggregation logic ...
-
-    # This would return a profile that could then be used by another recommendation engine
-    return {"message": "Historical profile generation concept"}
\ No newline at end of file
+    return profile_from_orders(user_order_history)
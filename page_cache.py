@@ -0,0 +1,150 @@
+"""
+On-disk cache of rendered pages for scraper re-runs.
+
+Each entry is the gzipped rendered HTML of one URL plus a small JSON sidecar
+({url, fetched_at, content_hash, size}), stored under `<cache_dir>/<key[:2]>/<key>` where key is
+the SHA-1 of the URL. get_restaurant_links and scrape_restaurant_data look pages up here before
+navigating, so after one crawl a change to the extraction logic can be re-run in seconds.
+
+Entries expire after `ttl_seconds`. In cache-only mode (replay) entries never expire and a
+miss is not fetched, so no browser is needed at all.
+
+Usage:
+    QUICKBITES_PAGE_CACHE_DIR=page_cache python scraper.py                             # fetch and fill
+    QUICKBITES_PAGE_CACHE_DIR=page_cache QUICKBITES_PAGE_CACHE_ONLY=1 python scraper.py  # replay
+    python page_cache.py stats page_cache/
+    python page_cache.py purge page_cache/ --expired
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import time
+
+from config import SCRAPER_PAGE_CACHE_DIR, SCRAPER_PAGE_CACHE_TTL_SECONDS, SCRAPER_PAGE_CACHE_ONLY
+
+
+def url_key(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+def content_hash(html):
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+class PageCache:
+    def __init__(self, cache_dir, ttl_seconds=SCRAPER_PAGE_CACHE_TTL_SECONDS, cache_only=False):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.cache_only = cache_only
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'writes': 0, 'unchanged': 0}
+
+    def _paths(self, url):
+        key = url_key(url)
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return f"{base}.html.gz", f"{base}.json"
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_expired(self, meta, now=None):
+        if self.cache_only or not self.ttl_seconds:
+            return False
+        return (now or time.time()) - meta['fetched_at'] > self.ttl_seconds
+
+    def get(self, url):
+        """Cached HTML for url, or None if missing or expired."""
+        html_path, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path)
+        if meta is None or not os.path.exists(html_path):
+            self.stats['misses'] += 1
+            return None
+        if self.is_expired(meta):
+            self.stats['expired'] += 1
+            return None
+        with gzip.open(html_path, 'rt', encoding='utf-8') as f:
+            html = f.read()
+        self.stats['hits'] += 1
+        return html
+
+    def put(self, url, html):
+        """Store html for url. Unchanged content (same hash) only refreshes fetched_at."""
+        html_path, meta_path = self._paths(url)
+        os.makedirs(os.path.dirname(html_path), exist_ok=True)
+        digest = content_hash(html)
+        meta = self._read_meta(meta_path)
+        if meta is None or meta.get('content_hash') != digest or not os.path.exists(html_path):
+            tmp_path = f"{html_path}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                f.write(html)
+            os.replace(tmp_path, html_path)
+            self.stats['writes'] += 1
+        else:
+            self.stats['unchanged'] += 1
+        meta = {'url': url, 'fetched_at': time.time(), 'content_hash': digest, 'size': len(html.encode('utf-8'))}
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def entries(self):
+        """Yield (meta, html_path, meta_path) for every entry in the cache."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                if filename.endswith('.json'):
+                    meta_path = os.path.join(dirpath, filename)
+                    meta = self._read_meta(meta_path)
+                    if meta is not None:
+                        yield meta, meta_path[:-len('.json')] + '.html.gz', meta_path
+
+
+def page_cache_from_config():
+    """The PageCache configured by QUICKBITES_PAGE_CACHE_DIR / _ONLY, or None when caching is off."""
+    if not SCRAPER_PAGE_CACHE_DIR:
+        return None
+    return PageCache(SCRAPER_PAGE_CACHE_DIR, SCRAPER_PAGE_CACHE_TTL_SECONDS, cache_only=SCRAPER_PAGE_CACHE_ONLY)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or purge the scraper page cache")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    stats_parser = subparsers.add_parser('stats', help="Entry count, sizes and expired entries")
+    stats_parser.add_argument('cache_dir')
+    purge_parser = subparsers.add_parser('purge', help="Delete cache entries")
+    purge_parser.add_argument('cache_dir')
+    purge_parser.add_argument('--expired', action='store_true', help="Only delete entries older than the TTL")
+    for sub in (stats_parser, purge_parser):
+        sub.add_argument('--ttl', type=float, default=SCRAPER_PAGE_CACHE_TTL_SECONDS, help="TTL in seconds")
+    args = parser.parse_args()
+
+    cache = PageCache(args.cache_dir, args.ttl)
+    now = time.time()
+    if args.command == 'stats':
+        entries = list(cache.entries())
+        html_bytes = sum(meta['size'] for meta, _, _ in entries)
+        disk_bytes = sum(os.path.getsize(p) for _, p, _ in entries if os.path.exists(p))
+        expired = sum(1 for meta, _, _ in entries if cache.is_expired(meta, now))
+        print(f"{len(entries)} pages, {html_bytes / 1e6:.1f} MB of HTML stored as {disk_bytes / 1e6:.1f} MB, "
+              f"{expired} expired (TTL {args.ttl:.0f}s)")
+        return
+
+    removed = 0
+    for meta, html_path, meta_path in list(cache.entries()):
+        if args.expired and not cache.is_expired(meta, now):
+            continue
+        for path in (html_path, meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        removed += 1
+    print(f"Removed {removed} entries")
+
+
+if __name__ == '__main__':
+    main()
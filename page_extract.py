@@ -0,0 +1,241 @@
+"""
+Browser-free extraction of restaurant data from rendered Zomato page HTML.
+
+These functions hold the selector logic of scraper.py as pure functions over an HTML string,
+so the same extraction can run on a live page source or on saved page snapshots
+(see snapshot_parser.py). They return the same `restaurant_data` dicts the scraper writes.
+
+Two backends produce identical output:
+  * 'lxml' parses with lxml and runs the selectors as precompiled XPath, all in C. Parsing is
+    the small part of the cost; BeautifulSoup's CSS matching (soupsieve) is pure Python and
+    walks the whole tree once per selector, which dominates on real menu pages.
+  * any BeautifulSoup builder name ('html.parser', 'html5lib', ...) uses BeautifulSoup + soupsieve.
+The default is 'lxml' when it is installed, else 'html.parser'.
+"""
+import re
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    lxml = None
+    DEFAULT_PARSER = 'html.parser'
+
+PRICE_MARKERS = ('₹', 'Rs.', 'INR')
+
+# Menu item containers, tried in order and all collected (same order as the live scraper).
+# The live scraper also tried "div:contains('₹')" style selectors; :contains() is not CSS,
+# so browsers rejected them and they never matched. The price-text fallback covers that case.
+MENU_SELECTORS = [
+    # By class
+    "div[class*='sc-1s0saks-']",
+    "div[class*='sc-1s0saks']",
+    "div[class*='sc-1s0saks'] div",
+    "div[class*='sc-1s0saks'] h4",
+    "div[class*='sc-1s0saks'] p",
+    "div[class*='sc-1s0saks'] span",
+    "div[class*='sc-1s0saks'] a",
+    "div[class*='sc-1s0saks'] button",
+    # By data attributes
+    "div[data-testid*='menu-item']",
+    "div[data-testid*='dish']",
+    "div[data-testid*='item']",
+    "div[data-testid*='food']",
+    # By role or aria attributes
+    "div[role='menuitem']",
+    "div[role='listitem']",
+    "div[aria-label*='menu']",
+    "div[aria-label*='dish']",
+    "div[aria-label*='item']",
+]
+
+NAME_SELECTORS = ['h1', 'h4[class*="sc-1hp8d8a-0"]', 'h4[class*="sc-1hp8d8a-1"]']
+LOCATION_SELECTORS = ['p[class*="sc-1hez2tp-0"]', 'p[class*="sc-1hez2tp-1"]', 'address', 'div[class*="sc-1yq6ixn-0"]']
+RATING_SELECTORS = ['div[class*="sc-1q7bklc-5"]', 'div[class*="sc-1q7bklc-6"]',
+                    'span[class*="sc-1q7bklc-1"]', 'span[class*="sc-1q7bklc-3"]']
+
+# Search result (dish listing) pages
+RESTAURANT_CARD_SELECTORS = ["div[class*='sc-1mo3ldo-0']", "div[class*='sc-1mo3ldo-1']", "div[class*='sc-1mo3ldo-2']"]
+RESTAURANT_LINK_SELECTORS = ["a[class*='sc-1mo3ldo-0']", "a[class*='sc-1mo3ldo-1']", "a[class*='sc-1mo3ldo-2']", "a[href*='/order']"]
+
+
+_ATTRIBUTE_RE = re.compile(r"""\[([\w-]+)\s*([*^~]?=)\s*(?:'([^']*)'|"([^"]*)")\]""")
+_COMPOUND_RE = re.compile(r"""^([\w*]+)?((?:\[[^\]]+\])*)$""")
+_NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+
+def css_to_xpath(selector):
+    """
+    Translate the CSS subset used by the selectors above (type selectors, [attr=v], [attr*=v],
+    [attr^=v], [attr~=v] and the descendant combinator) into an XPath expression.
+    """
+    steps = []
+    for compound in selector.split():
+        match = _COMPOUND_RE.match(compound)
+        if not match:
+            raise ValueError(f"Unsupported selector: {selector}")
+        predicates = []
+        for name, op, single, double in _ATTRIBUTE_RE.findall(match.group(2)):
+            value = single or double
+            if op == '*=':
+                predicates.append(f"contains(@{name}, '{value}')")
+            elif op == '^=':
+                predicates.append(f"starts-with(@{name}, '{value}')")
+            elif op == '~=':
+                predicates.append(f"contains(concat(' ', normalize-space(@{name}), ' '), ' {value} ')")
+            else:
+                predicates.append(f"@{name}='{value}'")
+        steps.append((match.group(1) or '*') + ''.join(f"[{p}]" for p in predicates))
+    return 'descendant-or-self::' + '/descendant::'.join(steps)
+
+
+def make_soup(html, parser=None):
+    return BeautifulSoup(html, parser or DEFAULT_PARSER)
+
+
+def element_text(element):
+    """Approximate Selenium's WebElement.text: block children on separate lines, trimmed."""
+    return element.get_text('\n', strip=True)
+
+
+def lxml_element_text(element):
+    """element_text() for an lxml element: same text nodes, same joining."""
+    parts = []
+    for node in element.iter():
+        if isinstance(node.tag, str) and node.tag not in _NON_TEXT_TAGS and node.text:
+            parts.append(node.text)
+        if node is not element and node.tail:
+            parts.append(node.tail)
+    return '\n'.join(part.strip() for part in parts if part.strip())
+
+
+def _first_text(soup, selectors):
+    # find_element() returns the first match only, so only the first match per selector counts
+    for selector in selectors:
+        element = soup.select_one(selector)
+        if element is not None:
+            text = element_text(element)
+            if text:
+                return text
+    return None
+
+
+def _unique_texts(elements_per_selector, text_fn, seen, texts):
+    for elements in elements_per_selector:
+        for element in elements:
+            text = text_fn(element)
+            if text and text not in seen:
+                seen.add(text)
+                texts.append(text)
+
+
+def extract_menu_texts(soup):
+    """Unique menu text blobs from the menu selectors, falling back to every div containing a price."""
+    seen = set()
+    menu_texts = []
+    _unique_texts((soup.select(selector) for selector in MENU_SELECTORS), element_text, seen, menu_texts)
+    if not menu_texts:
+        for div in soup.find_all('div'):
+            text = element_text(div)
+            if text and any(marker in text for marker in PRICE_MARKERS) and text not in seen:
+                seen.add(text)
+                menu_texts.append(text)
+    return menu_texts
+
+
+if lxml is not None:
+    _MENU_XPATHS = [etree.XPath(css_to_xpath(selector)) for selector in MENU_SELECTORS]
+    _NAME_XPATHS = [etree.XPath(css_to_xpath(selector)) for selector in NAME_SELECTORS]
+    _LOCATION_XPATHS = [etree.XPath(css_to_xpath(selector)) for selector in LOCATION_SELECTORS]
+    _RATING_XPATHS = [etree.XPath(css_to_xpath(selector)) for selector in RATING_SELECTORS]
+    _DIV_XPATH = etree.XPath('descendant-or-self::div')
+
+
+def _lxml_first_text(root, xpaths):
+    for xpath in xpaths:
+        elements = xpath(root)
+        if elements:
+            text = lxml_element_text(elements[0])
+            if text:
+                return text
+    return None
+
+
+def _extract_restaurant_data_lxml(html):
+    try:
+        root = lxml.html.document_fromstring(html)
+    except ValueError:  # str input carrying an XML encoding declaration
+        root = lxml.html.document_fromstring(html.encode('utf-8'))
+    except etree.ParserError:  # empty document
+        return {"name": None, "location": None, "rating": None, "menu": []}
+
+    seen = set()
+    menu_texts = []
+    _unique_texts((xpath(root) for xpath in _MENU_XPATHS), lxml_element_text, seen, menu_texts)
+    if not menu_texts:
+        for div in _DIV_XPATH(root):
+            text = lxml_element_text(div)
+            if text and any(marker in text for marker in PRICE_MARKERS) and text not in seen:
+                seen.add(text)
+                menu_texts.append(text)
+    return {
+        "name": _lxml_first_text(root, _NAME_XPATHS),
+        "location": _lxml_first_text(root, _LOCATION_XPATHS),
+        "rating": _lxml_first_text(root, _RATING_XPATHS),
+        "menu": menu_texts,
+    }
+
+
+def extract_restaurant_data(html, parser=None):
+    """Extract {"name", "location", "rating", "menu"} from a restaurant page's HTML."""
+    parser = parser or DEFAULT_PARSER
+    if parser == 'lxml' and lxml is not None:
+        return _extract_restaurant_data_lxml(html)
+    soup = make_soup(html, parser)
+    return {
+        "name": _first_text(soup, NAME_SELECTORS),
+        "location": _first_text(soup, LOCATION_SELECTORS),
+        "rating": _first_text(soup, RATING_SELECTORS),
+        "menu": extract_menu_texts(soup),
+    }
+
+
+def extract_restaurant_cards(html, parser=None):
+    """Restaurant cards on a dish search page as [{'name', 'location', 'rating', 'price'}, ...]."""
+    soup = make_soup(html, parser)
+    cards = []
+    for selector in RESTAURANT_CARD_SELECTORS:
+        cards = soup.select(selector)
+        if cards:
+            break
+
+    results = []
+    for card in cards:
+        name = card.select_one('h4[class*="sc-1hp8d8a-0"], h4[class*="sc-1hp8d8a-1"]')
+        location = card.select_one('p[class*="sc-1hez2tp-0"], p[class*="sc-1hez2tp-1"]')
+        if not (name and location):
+            continue
+        rating = card.select_one('div[class*="sc-1q7bklc-5"], div[class*="sc-1q7bklc-6"]')
+        price = card.select_one('div[class*="sc-1hez2tp-0"]:-soup-contains("₹"), div[class*="sc-1hez2tp-1"]:-soup-contains("₹")')
+        results.append({
+            'name': name.text.strip(),
+            'location': location.text.strip(),
+            'rating': rating.text.strip() if rating else None,
+            'price': price.text.strip() if price else None,
+        })
+    return results
+
+
+def extract_restaurant_links(html, parser=None):
+    """Unique restaurant order links on a dish search page, in page order."""
+    soup = make_soup(html, parser)
+    links = []
+    for selector in RESTAURANT_LINK_SELECTORS:
+        for anchor in soup.select(selector):
+            href = anchor.get('href')
+            if href and '/order' in href and href not in links:
+                links.append(href)
+    return links
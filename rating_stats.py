@@ -0,0 +1,217 @@
+"""
+Live community rating per dish: running count and sum of user ratings per (Item, Restaurant),
+smoothed towards the catalog's static Rating.
+
+The smoothed rating of a catalog row is a Bayesian mean with RATING_PRIOR_WEIGHT pseudo-ratings
+at the row's static Rating (the catalog mean where it has none, RATING_DEFAULT_PRIOR without a
+Rating column):
+    community = (RATING_PRIOR_WEIGHT·prior + sum) / (RATING_PRIOR_WEIGHT + count)
+With no ratings it equals the static column, and it moves towards the users' average as
+ratings come in.
+
+Aggregates are built from data/ratings.json on first use. After that utils.add_or_update_rating
+notifies every upsert with the rating it replaced, so an update is count/sum deltas for one dish
+(a new rating adds, a changed one swaps, and Clear, stored as 0, removes). For each catalog
+DataFrame in use the community column is kept materialized as a float array aligned with its
+rows (for_catalog); an upsert rewrites only the rows of that dish, so ranking reads it for free.
+
+Usage:
+    python rating_stats.py                                   # aggregate stats
+    python rating_stats.py corrected_menu_dataset.csv --top 10  # best community-rated dishes
+"""
+import argparse
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+import memory_report
+import utils
+from config import RATING_DEFAULT_PRIOR, RATING_PRIOR_WEIGHT
+
+
+class _CatalogRatings:
+    """A catalog's row -> dish slot map, per-row priors and materialized community ratings."""
+
+    def __init__(self, df, aggregates):
+        codes, pairs = pd.factorize(df['Item'].astype(str) + '\x1f' + df['Restaurant'].astype(str))
+        self.slot_of_row = np.array([aggregates.slot(tuple(pair.split('\x1f', 1))) for pair in pairs],
+                                    dtype=np.int64)[codes]
+        prior = np.full(len(df), RATING_DEFAULT_PRIOR)
+        if 'Rating' in df.columns:
+            static = pd.to_numeric(df['Rating'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            if np.isfinite(static).any():
+                prior = np.where(np.isnan(static), np.nanmean(static), static)
+        self.prior = prior
+        # Rows grouped by slot: rows of slot s are row_order[row_start[s]:row_start[s + 1]]
+        self.row_order = np.argsort(self.slot_of_row, kind='stable')
+        self.row_start = np.searchsorted(self.slot_of_row[self.row_order], np.arange(len(aggregates) + 1))
+        self.values = aggregates.smooth(prior, self.slot_of_row)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.slot_of_row, self.prior, self.row_order, self.row_start, self.values))
+
+    def refresh(self, slot, aggregates):
+        if slot + 1 >= len(self.row_start):
+            return  # Dish not in this catalog
+        rows = self.row_order[self.row_start[slot]:self.row_start[slot + 1]]
+        if len(rows):
+            self.values[rows] = aggregates.smooth(self.prior[rows], slot)
+
+
+class RatingAggregates:
+    """Count and sum of the current user ratings per (item_name, restaurant_name); see the module docstring."""
+
+    def __init__(self, prior_weight=RATING_PRIOR_WEIGHT):
+        self.prior_weight = prior_weight
+        self.slots = {}  # (item_name, restaurant_name) -> slot
+        self.keys = []  # Keys by slot
+        self.counts = np.zeros(64, dtype=np.int64)  # len >= len(keys)
+        self.sums = np.zeros(64)
+        self._catalogs = {}  # id(df) -> (weakref to df, _CatalogRatings)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def slot(self, key):
+        """The slot of key, added with no ratings if new."""
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = len(self.keys)
+            self.keys.append(key)
+            if slot >= len(self.counts):
+                self.counts = np.concatenate([self.counts, np.zeros_like(self.counts)])
+                self.sums = np.concatenate([self.sums, np.zeros_like(self.sums)])
+        return slot
+
+    @classmethod
+    def from_ratings(cls, ratings, **kwargs):
+        """Bulk build from ratings-store entries (the last entry per user and item wins; 0 means cleared)."""
+        aggregates = cls(**kwargs)
+        latest = {}
+        for entry in ratings:
+            latest[(entry.get('user_id'), entry.get('item_name'), entry.get('restaurant_name'))] = entry.get('rating')
+        slots, values = [], []
+        for (user_id, item_name, restaurant_name), rating in latest.items():
+            if rating and item_name:
+                slots.append(aggregates.slot((str(item_name), str(restaurant_name))))
+                values.append(float(rating))
+        slots = np.array(slots, dtype=np.int64)
+        np.add.at(aggregates.counts, slots, 1)
+        np.add.at(aggregates.sums, slots, np.array(values))
+        return aggregates
+
+    def smooth(self, prior, slot):
+        """Bayesian mean for the given prior(s) and slot(s)."""
+        return (self.prior_weight * prior + self.sums[slot]) / (self.prior_weight + self.counts[slot])
+
+    def update(self, item_name, restaurant_name, rating, previous_rating=None):
+        """Apply one upsert: previous_rating (if any, non-zero) is replaced by rating (0 or None clears)."""
+        with self._lock:
+            slot = self.slot((str(item_name), str(restaurant_name)))
+            if previous_rating:
+                self.counts[slot] -= 1
+                self.sums[slot] -= float(previous_rating)
+            if rating:
+                self.counts[slot] += 1
+                self.sums[slot] += float(rating)
+            for _, catalog in list(self._catalogs.values()):
+                catalog.refresh(slot, self)
+
+    def for_catalog(self, df):
+        """Community ratings aligned with df's rows (kept up to date in place; do not modify)."""
+        entry = self._catalogs.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1].values
+        with self._lock:
+            catalog = _CatalogRatings(df, self)
+            key = id(df)
+            self._catalogs[key] = (weakref.ref(df, lambda _: self._catalogs.pop(key, None)), catalog)
+        return catalog.values
+
+    def rows_of(self, df, item_name, restaurant_name):
+        """Row positions of one dish in df (empty when df does not list it)."""
+        self.for_catalog(df)
+        catalog = self._catalogs[id(df)][1]
+        slot = self.slots.get((str(item_name), str(restaurant_name)))
+        if slot is None or slot + 1 >= len(catalog.row_start):
+            return catalog.row_order[:0]
+        return catalog.row_order[catalog.row_start[slot]:catalog.row_start[slot + 1]]
+
+    def rows_of_dishes(self, df, keys):
+        """
+        Rows of several dishes in df at once: (owners, rows) arrays where rows are the row positions
+        listing keys[owners[i]] ((item_name, restaurant_name) pairs; dishes df lacks have none).
+        """
+        self.for_catalog(df)
+        catalog = self._catalogs[id(df)][1]
+        slots = np.array([self.slots.get((str(item_name), str(restaurant_name)), -1)
+                          for item_name, restaurant_name in keys], dtype=np.int64)
+        owners = np.flatnonzero((slots >= 0) & (slots + 1 < len(catalog.row_start)))
+        starts = catalog.row_start[slots[owners]]
+        counts = catalog.row_start[slots[owners] + 1] - starts
+        # Concatenated ranges starts[i]:starts[i] + counts[i] of row_order
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return np.repeat(owners, counts), catalog.row_order[np.repeat(starts, counts) + offsets]
+
+    def aggregate(self, item_name, restaurant_name):
+        """(count, mean of the user ratings) of one dish; mean is None without ratings."""
+        slot = self.slots.get((str(item_name), str(restaurant_name)))
+        if slot is None or not self.counts[slot]:
+            return 0, None
+        return int(self.counts[slot]), float(self.sums[slot] / self.counts[slot])
+
+    def stats(self):
+        rated = self.counts[:len(self.keys)] > 0
+        return {'dishes': len(self.keys), 'rated_dishes': int(rated.sum()),
+                'ratings': int(self.counts[:len(self.keys)].sum()), 'catalogs': len(self._catalogs)}
+
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+
+def model():
+    """The process-wide aggregates, built from the ratings store on first use."""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                _MODEL = RatingAggregates.from_ratings(utils.load_ratings())
+    return _MODEL
+
+
+def _on_rating(user_id, item_name, restaurant_name, rating_value, previous_rating):
+    if _MODEL is not None:  # Otherwise the first model() call reads the new rating from the store
+        _MODEL.update(item_name, restaurant_name, rating_value, previous_rating)
+
+
+utils.add_rating_listener(_on_rating)
+memory_report.register_component('rating_stats', lambda: memory_report.deep_sizeof(_MODEL) if _MODEL is not None else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the community rating aggregates from the ratings store")
+    parser.add_argument('csv_path', nargs='?', help="Menu CSV whose best community-rated dishes to list")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    aggregates = model()
+    print(f"Built in {(time.perf_counter() - start) * 1000:.1f} ms: {aggregates.stats()}")
+    if args.csv_path:
+        from menu_catalog import load_catalog
+        df, _, _ = load_catalog(args.csv_path)
+        community = aggregates.for_catalog(df)
+        for row in np.argsort(-community, kind='stable')[:args.top]:
+            count, mean = aggregates.aggregate(df['Item'].iat[row], df['Restaurant'].iat[row])
+            users = f"{mean:.2f} from {count} ratings" if count else "no ratings"
+            print(f"  {community[row]:.2f}  {df['Item'].iat[row]} ({df['Restaurant'].iat[row]}): {users}")
+
+
+if __name__ == '__main__':
+    main()
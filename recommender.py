@@ -0,0 +1,348 @@
+import time
+import numpy as np
+
+from config import MENU_DATASET_PATH, CF_BOOST_WEIGHT
+from config import GROUP_BASKET_SIZE, GROUP_CANDIDATE_FACTOR, GROUP_MAX_PER_CATEGORY
+from config import DIVERSITY_CANDIDATE_FACTOR
+from utils import get_users_ratings
+import item_cf
+import trending
+import rating_stats
+import taste_profile
+import diversity
+from ingest import INGESTED_MENU_CSV_PATH
+from filter_index import filter_index_for
+from menu_catalog import load_catalog
+from nlp_utils import parse_available_time, parse_budget, semantic_search
+
+# --- Menu data ---
+MENU_CSV_PATH = MENU_DATASET_PATH
+
+# --- Context boosting maps (used by get_recommendations) ---
+OCCASION_TAGS_MAP = {
+    "Quick Lunch": ["quick_lunch", "snack", "light_meal", "roll", "fast_food"],
+    "Family Dinner": ["family_meal", "main_course", "shareable", "combo", "biryani", "curry"],
+    "Party": ["party_pack", "bulk", "snack_platter", "pizza", "finger_food", "appetizer"],
+    "Healthy Meal": ["healthy", "salad", "low_calorie", "grilled", "soup", "steamed", "fruit"]
+}
+
+MOOD_TAGS_MAP = {
+    "Happy": ["dessert", "celebration", "treat", "sweet", "ice_cream", "cake", "chocolate"],
+    "Stressed": ["comfort_food", "chocolate", "sweet", "rich", "creamy", "pasta", "pizza"],
+    "Cozy": ["soup", "warm", "tea", "coffee", "comfort_food", "hot_drink", "stew", "pasta"],
+    "Adventurous": ["exotic", "new_flavor", "spicy_high", "unique", "fusion", "sushi", "thai"] # Assuming some tags
+}
+
+
+def read_menu_data(csv_path=MENU_CSV_PATH, ingested_csv_path=INGESTED_MENU_CSV_PATH):
+    """
+    Read the menu CSV (any schema menu_catalog.py knows, plus rows upserted by ingest.py)
+    into the canonical typed catalog. Returns (df, missing_columns); missing essential columns
+    are added as placeholders so callers can warn without crashing.
+    """
+    df, missing_columns, _ = load_catalog(csv_path, ingested_csv_path)
+    return df, missing_columns
+
+
+class _StageTimer:
+    """Accumulate wall-clock seconds per named stage into a dict (no-op when timings is None)."""
+
+    def __init__(self, timings):
+        self.timings = timings
+        self._stage = None
+        self._start = None
+
+    def start(self, stage):
+        self.stop()
+        if self.timings is not None:
+            self._stage = stage
+            self._start = time.perf_counter()
+
+    def stop(self):
+        if self._stage is not None:
+            elapsed = time.perf_counter() - self._start
+            self.timings[self._stage] = self.timings.get(self._stage, 0.0) + elapsed
+            self._stage = None
+
+
+def _filtered_rows(df, category, dietary_preferences, dietary_options, cuisine, spice_level, budget,
+                   available_at, user_query):
+    """
+    Dietary, category, cuisine, spice, availability and budget filters: bitwise ANDs over
+    precomputed bitmaps plus a binary search on the sorted price index. Returns the sorted
+    positions of the matching rows, or None when no filter applies.
+    """
+    if budget is None and user_query:
+        budget = parse_budget(user_query)
+    if available_at is None and user_query:
+        available_at = parse_available_time(user_query)
+    return filter_index_for(df).select(dietary_preferences=dietary_preferences, dietary_options=dietary_options,
+                                       category=category, cuisine=cuisine, spice_level=spice_level,
+                                       price_range=budget, available_at=available_at)
+
+
+def _rating_boost(rating):
+    if not rating: return 0.0
+    if rating >= 4: return rating * 2.0
+    if rating == 3: return rating * 0.5
+    return 0.0
+
+
+def _member_scores(df, rows, user_ids, timer):
+    """
+    Personal scores of each user for the filtered rows (positions `rows` of df, or all rows):
+    their own ratings, item-item CF and taste profile. Returns a len(user_ids) x rows array;
+    every stage is one batched pass over all the users.
+    """
+    positions = np.arange(len(df)) if rows is None else rows
+    scores = np.zeros((len(user_ids), len(positions)))
+    column_of = np.full(len(df), -1, dtype=np.int64)  # Catalog row -> column of scores (-1: filtered out)
+    column_of[positions] = np.arange(len(positions))
+    flat_scores = scores.reshape(-1)  # View: user u, column c is u * len(positions) + c (np.add.at's fast 1-D path)
+    aggregates = rating_stats.model()
+
+    def dish_columns(keys):
+        """(index into keys, score column) of every filtered row listing one of the dishes."""
+        owners, dish_rows = aggregates.rows_of_dishes(df, keys)
+        columns = column_of[dish_rows]
+        kept = columns >= 0
+        return owners[kept], columns[kept]
+
+    # User Ratings Boost: one scatter-add of every member's boosts
+    timer.start('ratings')
+    members, keys, boosts = [], [], []
+    for member, user_ratings in enumerate(get_users_ratings(user_ids).values()):
+        for key, rating in user_ratings.items():
+            boost = _rating_boost(rating)
+            if boost:
+                members.append(member)
+                keys.append(key)
+                boosts.append(boost)
+    owners, columns = dish_columns(keys)
+    np.add.at(flat_scores, np.array(members, dtype=np.int64)[owners] * len(positions) + columns,
+              np.array(boosts)[owners])
+
+    # Items similar to what each user rated (item-item CF); only unseen items get a score
+    timer.start('cf')
+    cf_items, cf_scores = item_cf.model().scores_for_users(user_ids)
+    predicted = np.flatnonzero(cf_scores.any(axis=0))
+    owners, columns = dish_columns([cf_items[item] for item in predicted])
+    np.add.at(flat_scores, (np.arange(len(user_ids))[:, None] * len(positions) + columns).reshape(-1),
+              (CF_BOOST_WEIGHT * cf_scores[:, predicted[owners]]).reshape(-1))
+
+    # Cuisines, categories, tags, price bands and spice levels each user orders and rates well
+    timer.start('taste')
+    scores += taste_profile.model().scores_for_users(user_ids, df, rows)
+    return scores
+
+
+def _add_context_scores(results_df, occasion, mood, current_weather_input, user_query, timer):
+    """Add the occasion, mood, weather and query boosts (shared by everyone) to recommendation_score."""
+    # Ensure 'Tags' column is string type for safe operations
+    if 'Tags' in results_df.columns:
+        results_df['Tags'] = results_df['Tags'].astype(str)
+
+    # 3. Occasion-Based Boosting
+    timer.start('occasion')
+    if occasion and occasion != "Any Occasion" and 'Tags' in results_df.columns:
+        if occasion in OCCASION_TAGS_MAP:
+            for tag in OCCASION_TAGS_MAP[occasion]:
+                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 5 if tag in x.lower() else 0)
+
+    # 4. Mood-Based Boosting
+    timer.start('mood')
+    if mood and mood != "Any Mood" and 'Tags' in results_df.columns:
+        if mood in MOOD_TAGS_MAP:
+            for tag in MOOD_TAGS_MAP[mood]:
+                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 3 if tag in x.lower() else 0)
+
+    # 5. Weather-Based Boosting (User Input)
+    timer.start('weather')
+    if current_weather_input and 'Tags' in results_df.columns:
+        temp = current_weather_input.get('temperature') # Float
+        condition = current_weather_input.get('condition', '').lower() # String
+
+        if temp is not None:
+            if temp > 28: # Hot
+                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 4 if any(t in x.lower() for t in ["cold", "refreshing", "juice", "lassi", "ice_cream", "salad"]) else 0)
+            elif temp < 15: # Cold
+                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 4 if any(t in x.lower() for t in ["hot", "warm", "soup", "tea", "coffee", "hearty", "stew", "spicy"]) else 0)
+
+        if condition:
+            if condition == 'rainy':
+                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 5 if any(t in x.lower() for t in ["hot", "soup", "comfort_food", "pakora", "chai", "fried", "warm"]) else 0)
+            elif condition == 'sunny' and (temp is None or temp > 20):
+                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 3 if any(t in x.lower() for t in ["refreshing", "light_meal", "salad", "juice", "fruit", "cold_drink", "ice_cream"]) else 0)
+            elif condition == 'cloudy':
+                results_df['recommendation_score'] += results_df['Tags'].apply(lambda x: 1 if "comfort_food" in x.lower() else 0)
+
+    # 6. User Query (Semantic Search)
+    timer.start('semantic')
+    if user_query:
+        # semantic_search returns the top matches with a 'semantic_score' column;
+        # items it finds get that score added to their recommendation_score.
+        try:
+            matched_items_df_from_query = semantic_search(user_query, results_df.copy(), top_n=20) # semantic_search returns df
+            if not matched_items_df_from_query.empty:
+                # Create a dictionary of boosts: {(Item, Restaurant): boost_value}
+                query_boosts = {}
+                for _, row in matched_items_df_from_query.iterrows():
+                    boost_val = row.get('semantic_score', 20) # Use semantic_score if available, else 20
+                    query_boosts[(row['Item'], row.get('Restaurant'))] = boost_val
+
+                def apply_query_boost(row):
+                    return query_boosts.get((row['Item'], row.get('Restaurant')), 0)
+
+                results_df['recommendation_score'] += results_df.apply(apply_query_boost, axis=1)
+
+        except Exception as e:
+            pass # Continue without semantic search if it fails
+
+
+def _community_ratings(df, rows):
+    """Live community rating (user ratings smoothed towards the static Rating; rating_stats.py) of the rows."""
+    community_ratings = rating_stats.model().for_catalog(df)
+    return community_ratings[rows] if rows is not None else community_ratings.copy()
+
+
+def get_recommendations(df, category=None, dietary_preferences=None, limit=10, user_query=None,
+                        occasion=None, mood=None, current_weather_input=None, user_id=None,
+                        timings=None, dietary_options=None, cuisine=None, spice_level=None, budget=None,
+                        available_at=None, diversify=True):
+    """
+    Rank menu items in df for the given context and return the top `limit` as a list of dicts.
+    dietary_options are config.DIETARY_OPTIONS entries (e.g. 'Vegan', 'Nut-Free'); they and the
+    cuisine / spice_level filters are skipped when the catalog has no column for them.
+    budget is (min_price, max_price) on Price, what the cart charges; by default it is parsed from
+    user_query ("under 300", "between 100 and 250", "cheap").
+    available_at (a datetime, time or "HH:MM") keeps items whose Available_Time covers it; by
+    default it is parsed from user_query ("open now", "at 21:30").
+    With diversify, the best limit x DIVERSITY_CANDIDATE_FACTOR dishes are re-ranked for variety
+    (diversity.rerank: MMR with restaurant, category and dish-name caps).
+    If `timings` is a dict, seconds spent in each stage are added to it
+    (filters, ratings, cf, taste, trending, occasion, mood, weather, semantic, rank, diversity).
+    """
+    if df is None or df.empty:
+        return []
+
+    timer = _StageTimer(timings)
+
+    # 1. Filters
+    timer.start('filters')
+    rows = _filtered_rows(df, category, dietary_preferences, dietary_options, cuisine, spice_level, budget,
+                          available_at, user_query)
+    results_df = df.iloc[rows].copy() if rows is not None else df.copy()
+    results_df['recommendation_score'] = 0.0 # Initialize score
+
+    # 2. The user's own ratings, CF and taste profile
+    if user_id:
+        results_df['recommendation_score'] += _member_scores(df, rows, [user_id], timer)[0]
+
+    # Trending: recent (time-decayed) orders of the item and its restaurant, gathered for the filtered rows
+    timer.start('trending')
+    results_df['recommendation_score'] += trending.model().boost(df, rows)
+
+    # 3.-6. Occasion, mood, weather and query
+    _add_context_scores(results_df, occasion, mood, current_weather_input, user_query, timer)
+
+    # Sort by final recommendation score, then by the live community rating
+    timer.start('rank')
+    results_df['Community_Rating'] = _community_ratings(df, rows)
+    results_df['_row'] = np.arange(len(df)) if rows is None else rows  # Row positions in df
+    results_df = results_df.sort_values(by=['recommendation_score', 'Community_Rating'], ascending=[False, False])
+
+    # Remove duplicates keeping the one with highest recommendation_score
+    # Considering 'Item' and 'Restaurant' as unique identifier for a dish
+    results_df = results_df.drop_duplicates(subset=['Item', 'Restaurant'], keep='first')
+
+    if diversify and limit > 0:
+        timer.start('diversity')
+        results_df = results_df.head(limit * DIVERSITY_CANDIDATE_FACTOR)
+        picks = diversity.rerank(df, results_df['_row'].to_numpy(), results_df['recommendation_score'].to_numpy(), limit)
+        results_df = results_df.iloc[picks]
+        timer.start('rank')
+
+    recommendations = results_df.drop(columns='_row').head(limit).to_dict('records')
+    timer.stop()
+    return recommendations
+
+
+# Group score of a dish from its members' scores (members x rows)
+GROUP_AGGREGATIONS = {
+    'least_misery': lambda member_totals: member_totals.min(axis=0),  # As good as it is for the least happy member
+    'average': lambda member_totals: member_totals.mean(axis=0),
+}
+
+
+def get_group_recommendations(df, user_ids, aggregation='least_misery', basket_size=GROUP_BASKET_SIZE,
+                              category=None, dietary_preferences=None, user_query=None, occasion=None, mood=None,
+                              current_weather_input=None, timings=None, dietary_options=None, cuisine=None,
+                              spice_level=None, budget=None, available_at=None):
+    """
+    A shared basket for several users ordering together (a family, an office).
+    The filters and the trending / occasion / mood / weather / query boosts are computed once for
+    the shared context, the members' personal scores in one batched pass (_member_scores). Each
+    member's total is shared + personal; the dish's group score aggregates them
+    (GROUP_AGGREGATIONS). The basket takes the best dishes with at most GROUP_MAX_PER_CATEGORY
+    per category, topping up from the rest if the categories run out.
+    Returns {'members', 'aggregation', 'items' (dicts with quantity, group_score and member_scores),
+    'total', 'share_text'}.
+    """
+    user_ids = list(dict.fromkeys(user_id for user_id in user_ids if user_id))
+    basket = {'members': user_ids, 'aggregation': aggregation, 'items': [], 'total': 0.0, 'share_text': ''}
+    if df is None or df.empty or not user_ids:
+        return basket
+
+    timer = _StageTimer(timings)
+    timer.start('filters')
+    rows = _filtered_rows(df, category, dietary_preferences, dietary_options, cuisine, spice_level, budget,
+                          available_at, user_query)
+    results_df = df.iloc[rows].copy() if rows is not None else df.copy()
+    results_df['recommendation_score'] = 0.0
+    member_scores = _member_scores(df, rows, user_ids, timer)
+    timer.start('trending')
+    results_df['recommendation_score'] += trending.model().boost(df, rows)
+    _add_context_scores(results_df, occasion, mood, current_weather_input, user_query, timer)
+
+    timer.start('rank')
+    member_totals = member_scores + results_df['recommendation_score'].to_numpy()
+    group_scores = GROUP_AGGREGATIONS[aggregation](member_totals)
+    # Best candidates first (ties on the community rating); only a window of them is walked
+    window = min(len(group_scores), max(basket_size * GROUP_CANDIDATE_FACTOR, basket_size))
+    candidates = np.argpartition(-group_scores, window - 1)[:window] if window < len(group_scores) else np.arange(window)
+    community = _community_ratings(df, rows)
+    candidates = candidates[np.lexsort((-community[candidates], -group_scores[candidates]))]
+
+    items = results_df['Item'].astype(str).to_numpy()
+    restaurants = results_df['Restaurant'].astype(str).to_numpy()
+    categories = results_df['Category'].astype(str).to_numpy() if 'Category' in results_df.columns else None
+    chosen, seen_dishes, per_category = [], set(), {}
+    for capped in (True, False):
+        for position in candidates:
+            if len(chosen) >= basket_size:
+                break
+            dish = (items[position], restaurants[position])
+            if dish in seen_dishes:
+                continue
+            category_name = categories[position] if categories is not None else None
+            if capped and per_category.get(category_name, 0) >= GROUP_MAX_PER_CATEGORY:
+                continue
+            seen_dishes.add(dish)
+            per_category[category_name] = per_category.get(category_name, 0) + 1
+            chosen.append(position)
+
+    records = results_df.iloc[chosen].to_dict('records')
+    for record, position in zip(records, chosen):
+        record['quantity'] = 1
+        record['group_score'] = float(group_scores[position])
+        record['member_scores'] = {user_id: float(member_totals[member, position])
+                                   for member, user_id in enumerate(user_ids)}
+    basket['items'] = records
+    basket['total'] = float(sum(float(record.get('Price', 0) or 0) for record in records))
+    basket['share_text'] = "\n".join(
+        [f"Group basket for {', '.join(user_ids)} ({aggregation.replace('_', ' ')}):"]
+        + [f"- {record['Item']} ({record.get('Restaurant', 'N/A')}) ₹{float(record.get('Price', 0) or 0):.2f}"
+           for record in records]
+        + [f"Total: ₹{basket['total']:.2f}"])
+    timer.stop()
+    return basket
@@ -1,21 +1,176 @@
+import os
+import re
 import time
 import logging
 import random
-import json
+from contextlib import contextmanager
+from urllib.parse import urljoin
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
+from config import (
+    SCRAPER_BASE_URL, SCRAPER_SNAPSHOT_DIR, SCRAPER_PAGE_DELAY_RANGE, SCRAPER_DISH_DELAY_RANGE,
+    SCRAPER_READY_TIMEOUT, SCRAPER_QUIET_SECONDS, SCRAPER_SETTLE_SECONDS
+)
+from jsonl_stream import JsonlWriter
+from page_cache import page_cache_from_config
+from page_extract import MENU_SELECTORS, extract_restaurant_cards, extract_restaurant_data, extract_restaurant_links
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Any one menu container being present means the menu has rendered
+MENU_READY_SELECTOR = ", ".join(MENU_SELECTORS)
+# Dishes to scrape (one search page each)
+FOOD_ITEMS = [
+    'burger',
+    'pizza',
+    'biryani',
+    'paneer',
+    'chicken',
+    'naan'
+]
+RESTAURANTS_PER_DISH = 5
+# Results are written as {food_item}.jsonl.gz: one restaurant record per line (see jsonl_stream.py)
+RESULTS_EXTENSION = '.jsonl.gz'
+
+RESTAURANT_CARD_READY_SELECTOR = "div[class*='sc-1mo3ldo-0']"
+
+# Readiness probe: document state, resources fetched so far (network activity) and DOM size
+READY_PROBE_SCRIPT = """
+return [document.readyState,
+        performance.getEntriesByType('resource').length,
+        document.getElementsByTagName('*').length,
+        document.body ? document.body.innerHTML.length : 0];
+"""
+READY_POLL_SECONDS = 0.1
+
+@contextmanager
+def timed(timings, stage):
+    """Add the seconds spent in the with-block to timings[stage]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - start)
+
+class PolitenessPolicy:
+    """
+    Minimum pause between finishing one page and requesting the next. Time spent on other work
+    in between (extraction, writing results) counts towards the pause, so it never adds up
+    with readiness waits the way fixed sleeps did.
+
+    Optionally also takes a turn from a shared rate limiter (anything with acquire(url) returning
+    the seconds waited, e.g. crawler.HostRateLimiter) so several browsers respect one request cap.
+    """
+
+    def __init__(self, page_delay_range=SCRAPER_PAGE_DELAY_RANGE, rate_limiter=None):
+        self.page_delay_range = page_delay_range
+        self.rate_limiter = rate_limiter
+        self._next_request_at = 0.0
+
+    def space_next(self, delay_range=None):
+        """Require at least a random delay from delay_range (default: page delay) before the next request."""
+        low, high = delay_range or self.page_delay_range
+        self._next_request_at = max(self._next_request_at, time.monotonic() + random.uniform(low, high))
+
+    def wait_turn(self, url=None):
+        """Sleep until the next request (to url) is allowed; returns the seconds slept."""
+        waited = 0.0
+        remaining = self._next_request_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+            waited += remaining
+        if self.rate_limiter is not None:
+            waited += self.rate_limiter.acquire(url)
+        return waited
+
+def navigate(driver, url, timings, politeness=None):
+    """Wait for the politeness delay, then load url (recording 'politeness' and 'navigation' seconds)."""
+    if politeness is not None:
+        timings['politeness'] = timings.get('politeness', 0.0) + politeness.wait_turn(url)
+    with timed(timings, 'navigation'):
+        driver.get(url)
+
+def wait_until_ready(driver, selector=None, timeout=SCRAPER_READY_TIMEOUT,
+                     quiet_seconds=SCRAPER_QUIET_SECONDS, settle_seconds=SCRAPER_SETTLE_SECONDS):
+    """
+    Wait until the page is ready instead of sleeping a fixed time. Ready means
+    document.readyState is 'complete' and both the resource count (network idle) and the DOM
+    size (DOM stability) have stayed unchanged for quiet_seconds, with `selector` present.
+    If the selector never appears, a page that stays quiet for settle_seconds counts as ready.
+    Returns True if ready, False on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    found = selector is None
+    last_probe = None
+    quiet_since = None
+    while True:
+        now = time.monotonic()
+        probe = driver.execute_script(READY_PROBE_SCRIPT)
+        if not found:
+            found = bool(driver.find_elements(By.CSS_SELECTOR, selector))
+        if probe and probe[0] == 'complete' and probe == last_probe:
+            quiet_since = quiet_since or now
+            quiet_for = now - quiet_since
+            if (found and quiet_for >= quiet_seconds) or quiet_for >= settle_seconds:
+                return True
+        else:
+            quiet_since = None
+        last_probe = probe
+        if now >= deadline:
+            logger.warning(f"Page not ready after {timeout}s (selector {'found' if found else 'missing'})")
+            return False
+        time.sleep(READY_POLL_SECONDS)
+
+def load_page(driver, url, ready_selector, timings, politeness=None):
+    """
+    Navigate, wait for readiness, browse like a human, then wait for content loaded by the
+    scrolling to settle. Records politeness / navigation / ready / human seconds in timings.
+    """
+    navigate(driver, url, timings, politeness)
+    with timed(timings, 'ready'):
+        wait_until_ready(driver, ready_selector)
+    with timed(timings, 'human'):
+        simulate_human_behavior(driver)
+    with timed(timings, 'ready'):
+        wait_until_ready(driver, ready_selector)
+
+def fetch_page_source(driver, url, ready_selector, timings, politeness=None, page_cache=None):
+    """
+    Rendered HTML of url: from page_cache when it has a fresh copy, else loaded in the browser
+    (and stored in the cache). Returns (page_source, fetched), where fetched says whether a
+    request was made; page_source is None on a miss in cache-only mode.
+    """
+    if page_cache is not None:
+        with timed(timings, 'cache'):
+            page_source = page_cache.get(url)
+        if page_source is not None:
+            return page_source, False
+        if page_cache.cache_only:
+            logger.warning(f"Not in the page cache (cache-only mode): {url}")
+            return None, False
+
+    if not check_driver_session(driver):
+        raise WebDriverException("Driver session is invalid")
+    load_page(driver, url, ready_selector, timings, politeness)
+    with timed(timings, 'extraction'):
+        page_source = driver.page_source
+    if page_cache is not None:
+        with timed(timings, 'cache'):
+            page_cache.put(url, page_source)
+    return page_source, True
+
+def format_timings(timings):
+    return ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items())
+
 def initialize_driver():
     try:
         # Set up Chrome options with anti-detection measures
@@ -101,9 +256,8 @@ def wait_for_element(driver, by, value, timeout=15):
             EC.visibility_of(element)
         )
         
-        # Scroll element into view
-        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-        time.sleep(0.5)  # Small delay after scrolling
+        # Scroll element into view (instant, so no settling delay is needed afterwards)
+        driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", element)
         
         return element
     except TimeoutException:
@@ -167,60 +321,28 @@ def simulate_human_behavior(driver):
     except Exception as e:
         logger.error(f"Error in human behavior simulation: {str(e)}")
 
-def scrape_burger_items(driver, url):
+def scrape_burger_items(driver, url, politeness=None):
+    timings = {}
     try:
         if not check_driver_session(driver):
             raise WebDriverException("Driver session is invalid")
-            
-        driver.get(url)
-        time.sleep(random.uniform(3, 5))  # Random wait time
-        
-        # Simulate human behavior
-        simulate_human_behavior(driver)
-        
-        # Wait for restaurant cards to load and be visible
-        restaurant_selector = "div[class*='sc-1mo3ldo-0']"
-        wait_for_element(driver, By.CSS_SELECTOR, restaurant_selector)
-        
-        # Get page source after JavaScript execution
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        # Find restaurant cards with multiple possible selectors
-        restaurant_selectors = [
-            "div[class*='sc-1mo3ldo-0']",
-            "div[class*='sc-1mo3ldo-1']",
-            "div[class*='sc-1mo3ldo-2']"
-        ]
-        
-        restaurants = []
-        for selector in restaurant_selectors:
-            restaurants.extend(soup.select(selector))
-            if restaurants:
-                break
+
+        # Wait until the restaurant cards have rendered and the page is quiet
+        load_page(driver, url, RESTAURANT_CARD_READY_SELECTOR, timings, politeness)
         
+        # Get page source after JavaScript execution and parse the restaurant cards in-process
+        restaurants = extract_restaurant_cards(driver.page_source)
+
         if restaurants:
             logger.info(f"Found {len(restaurants)} restaurants:")
             for restaurant in restaurants[:5]:  # Limit to top 5 restaurants
-                try:
-                    # Try multiple selectors for each piece of information
-                    name = restaurant.select_one('h4[class*="sc-1hp8d8a-0"], h4[class*="sc-1hp8d8a-1"]')
-                    location = restaurant.select_one('p[class*="sc-1hez2tp-0"], p[class*="sc-1hez2tp-1"]')
-                    rating = restaurant.select_one('div[class*="sc-1q7bklc-5"], div[class*="sc-1q7bklc-6"]')
-                    price = restaurant.select_one('div[class*="sc-1hez2tp-0"]:-soup-contains("₹"), div[class*="sc-1hez2tp-1"]:-soup-contains("₹")')
-                    
-                    if name and location:
-                        logger.info(f"Restaurant: {name.text.strip()}")
-                        logger.info(f"Location: {location.text.strip()}")
-                        if rating:
-                            logger.info(f"Rating: {rating.text.strip()}")
-                        if price:
-                            logger.info(f"Price Range: {price.text.strip()}")
-                        logger.info("---")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing restaurant: {e}")
-                    continue
+                logger.info(f"Restaurant: {restaurant['name']}")
+                logger.info(f"Location: {restaurant['location']}")
+                if restaurant['rating']:
+                    logger.info(f"Rating: {restaurant['rating']}")
+                if restaurant['price']:
+                    logger.info(f"Price Range: {restaurant['price']}")
+                logger.info("---")
         else:
             logger.error("No restaurants found. This might be due to:")
             logger.error("1. Zomato's anti-scraping measures")
@@ -232,50 +354,31 @@ def scrape_burger_items(driver, url):
         raise
     except Exception as e:
         logger.error(f"Error scraping burger items: {str(e)}")
+    finally:
+        if politeness is not None:
+            politeness.space_next()
 
-def get_restaurant_links(driver, url):
-    """Extract restaurant links from the search page"""
+def get_restaurant_links(driver, url, timings=None, politeness=None, page_cache=None):
+    """Extract restaurant links from the search page (served from page_cache when cached)"""
+    page_timings = {}
+    fetched = False
     try:
-        if not check_driver_session(driver):
-            raise WebDriverException("Driver session is invalid")
-            
-        driver.get(url)
-        time.sleep(random.uniform(3, 5))
-        
-        # Simulate human behavior
-        simulate_human_behavior(driver)
-        
-        # Wait for restaurant cards to load
-        restaurant_selector = "div[class*='sc-1mo3ldo-0']"
-        wait_for_element(driver, By.CSS_SELECTOR, restaurant_selector)
-        
-        # Get all restaurant links
+        # Wait until the restaurant cards have rendered and the page is quiet
+        page_source, fetched = fetch_page_source(driver, url, RESTAURANT_CARD_READY_SELECTOR, page_timings,
+                                                 politeness, page_cache)
+        if page_source is None:
+            return []
+
+        # Get all restaurant links from one snapshot of the rendered page.
+        # page_source keeps hrefs as written (often relative), so resolve them against the page URL.
         restaurant_links = []
-        link_selectors = [
-            "a[class*='sc-1mo3ldo-0']",
-            "a[class*='sc-1mo3ldo-1']",
-            "a[class*='sc-1mo3ldo-2']",
-            "a[href*='/order']"
-        ]
-        
-        for selector in link_selectors:
-            try:
-                elements = wait_for_elements(driver, By.CSS_SELECTOR, selector)
-                for element in elements:
-                    href = element.get_attribute('href')
-                    if href and '/order' in href and href not in restaurant_links:
-                        restaurant_links.append(href)
-            except Exception:
-                continue
-        
-        if not restaurant_links:
-            # Try alternative approach using BeautifulSoup
-            page_source = driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
-            links = soup.find_all('a', href=lambda x: x and '/order' in x)
-            restaurant_links = [link['href'] for link in links if link['href'] not in restaurant_links]
-        
+        for href in extract_restaurant_links(page_source):
+            absolute = urljoin(url, href)
+            if absolute not in restaurant_links:
+                restaurant_links.append(absolute)
+
         logger.info(f"Found {len(restaurant_links)} restaurant links")
+        logger.info(f"Timing for {url}: {format_timings(page_timings)}")
         return restaurant_links
         
     except WebDriverException as e:
@@ -284,184 +387,54 @@ def get_restaurant_links(driver, url):
     except Exception as e:
         logger.error(f"Error getting restaurant links: {str(e)}")
         return []
+    finally:
+        _merge_timings(timings, page_timings)
+        if politeness is not None and fetched:
+            politeness.space_next()
 
-def scrape_restaurant_data(driver, url):
+def _merge_timings(timings, page_timings):
+    if timings is not None:
+        for stage, seconds in page_timings.items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+
+def scrape_restaurant_data(driver, url, timings=None, snapshot_path=None, politeness=None, page_cache=None):
+    """
+    Load a restaurant page and extract its name, location, rating and menu texts.
+
+    The rendered DOM is fetched once (driver.page_source) and every selector runs in-process
+    via page_extract, instead of one WebDriver round trip per selector and per element.
+    If `timings` is a dict, seconds spent per stage are added to it: politeness (delay before
+    the request), navigation, ready (readiness waits), human (simulated browsing) and extraction.
+    If `snapshot_path` is given, the rendered page is also saved there.
+    With a `page_cache`, a fresh cached copy is used instead of navigating (see page_cache.py).
+    """
     restaurant_data = {
         "name": None,
         "location": None,
         "rating": None,
         "menu": []
     }
+    page_timings = {}
+    fetched = False
     try:
-        if not check_driver_session(driver):
-            raise WebDriverException("Driver session is invalid")
-            
-        driver.get(url)
-        time.sleep(random.uniform(3, 5))  # Random wait time
-        
-        # Simulate human behavior
-        simulate_human_behavior(driver)
-        
-        # Wait for the page to load completely
-        time.sleep(5)  # Give more time for dynamic content to load
-        
-        # Try to find menu items using multiple approaches
-        menu_items = []
-        
-        # Approach 1: Try to find menu items by class
-        menu_selectors = [
-            "div[class*='sc-1s0saks-']",  # Generic menu item class
-            "div[class*='sc-1s0saks']",   # Alternative class pattern
-            "div[class*='sc-1s0saks'] div",  # Nested divs
-            "div[class*='sc-1s0saks'] h4",   # Menu item titles
-            "div[class*='sc-1s0saks'] p",    # Menu item descriptions
-            "div[class*='sc-1s0saks'] span", # Menu item prices
-            "div[class*='sc-1s0saks'] a",    # Menu item links
-            "div[class*='sc-1s0saks'] button" # Menu item buttons
-        ]
-        
-        for selector in menu_selectors:
-            try:
-                elements = wait_for_elements(driver, By.CSS_SELECTOR, selector)
-                if elements:
-                    menu_items.extend(elements)
-            except Exception:
-                continue
-        
-        # Approach 2: Try to find menu items by data attributes
-        data_selectors = [
-            "div[data-testid*='menu-item']",
-            "div[data-testid*='dish']",
-            "div[data-testid*='item']",
-            "div[data-testid*='food']"
-        ]
-        
-        for selector in data_selectors:
-            try:
-                elements = wait_for_elements(driver, By.CSS_SELECTOR, selector)
-                if elements:
-                    menu_items.extend(elements)
-            except Exception:
-                continue
-        
-        # Approach 3: Try to find menu items by text content
-        text_selectors = [
-            "div:contains('₹')",  # Price indicator
-            "div:contains('Rs.')", # Alternative price indicator
-            "div:contains('INR')", # Currency indicator
-            "div:contains('Menu')", # Menu section
-            "div:contains('Items')" # Items section
-        ]
-        
-        for selector in text_selectors:
-            try:
-                elements = wait_for_elements(driver, By.CSS_SELECTOR, selector)
-                if elements:
-                    menu_items.extend(elements)
-            except Exception:
-                continue
-        
-        # Approach 4: Try to find menu items by role or aria attributes
-        role_selectors = [
-            "div[role='menuitem']",
-            "div[role='listitem']",
-            "div[aria-label*='menu']",
-            "div[aria-label*='dish']",
-            "div[aria-label*='item']"
-        ]
-        
-        for selector in role_selectors:
-            try:
-                elements = wait_for_elements(driver, By.CSS_SELECTOR, selector)
-                if elements:
-                    menu_items.extend(elements)
-            except Exception:
-                continue
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_menu_texts = []
-        for item in menu_items:
-            item_text = item.text.strip()
-            if item_text and item_text not in seen:
-                seen.add(item_text)
-                unique_menu_texts.append(item_text)
-        
-        # If no menu items found, try fallback
-        if not unique_menu_texts:
-            try:
-                all_divs = driver.find_elements(By.TAG_NAME, "div")
-                for div in all_divs:
-                    try:
-                        text = div.text.strip()
-                        if text and ('₹' in text or 'Rs.' in text or 'INR' in text) and text not in seen:
-                            seen.add(text)
-                            unique_menu_texts.append(text)
-                    except:
-                        continue
-            except Exception as e:
-                logger.error(f"Error in final menu scraping attempt: {e}")
-            if not unique_menu_texts:
-                logger.error("No menu items found. This might be due to:")
-                logger.error("1. Zomato's anti-scraping measures")
-                logger.error("2. The menu items not being available")
-                logger.error("3. Network issues")
-        restaurant_data["menu"] = unique_menu_texts
-
-        # Extract name, location, rating (try multiple selectors for robustness)
-        try:
-            # Name
-            name_elem = None
-            for sel in [
-                'h1',
-                'h4[class*="sc-1hp8d8a-0"]',
-                'h4[class*="sc-1hp8d8a-1"]'
-            ]:
-                try:
-                    name_elem = driver.find_element(By.CSS_SELECTOR, sel)
-                    if name_elem and name_elem.text.strip():
-                        restaurant_data["name"] = name_elem.text.strip()
-                        break
-                except Exception:
-                    continue
-        except Exception:
-            pass
-        try:
-            # Location
-            location_elem = None
-            for sel in [
-                'p[class*="sc-1hez2tp-0"]',
-                'p[class*="sc-1hez2tp-1"]',
-                'address',
-                'div[class*="sc-1yq6ixn-0"]'
-            ]:
-                try:
-                    location_elem = driver.find_element(By.CSS_SELECTOR, sel)
-                    if location_elem and location_elem.text.strip():
-                        restaurant_data["location"] = location_elem.text.strip()
-                        break
-                except Exception:
-                    continue
-        except Exception:
-            pass
-        try:
-            # Rating
-            rating_elem = None
-            for sel in [
-                'div[class*="sc-1q7bklc-5"]',
-                'div[class*="sc-1q7bklc-6"]',
-                'span[class*="sc-1q7bklc-1"]',
-                'span[class*="sc-1q7bklc-3"]'
-            ]:
-                try:
-                    rating_elem = driver.find_element(By.CSS_SELECTOR, sel)
-                    if rating_elem and rating_elem.text.strip():
-                        restaurant_data["rating"] = rating_elem.text.strip()
-                        break
-                except Exception:
-                    continue
-        except Exception:
-            pass
+        # Wait until any menu container has rendered and the page is quiet
+        page_source, fetched = fetch_page_source(driver, url, MENU_READY_SELECTOR, page_timings,
+                                                 politeness, page_cache)
+        if page_source is None:
+            return restaurant_data
+
+        with timed(page_timings, 'extraction'):
+            restaurant_data = extract_restaurant_data(page_source)
+
+        if snapshot_path:
+            save_page_snapshot(page_source, snapshot_path)
+
+        if not restaurant_data["menu"]:
+            logger.error("No menu items found. This might be due to:")
+            logger.error("1. Zomato's anti-scraping measures")
+            logger.error("2. The menu items not being available")
+            logger.error("3. Network issues")
+        logger.info(f"Timing for {url}: {format_timings(page_timings)}")
         return restaurant_data
     except WebDriverException as e:
         logger.error(f"Driver session error in restaurant scraping: {str(e)}")
@@ -469,21 +442,34 @@ def scrape_restaurant_data(driver, url):
     except Exception as e:
         logger.error(f"Error scraping restaurant data: {str(e)}")
         return restaurant_data
+    finally:
+        _merge_timings(timings, page_timings)
+        if politeness is not None and fetched:
+            politeness.space_next()
+
+def snapshot_path_for(snapshot_dir, food_item, url):
+    """<snapshot_dir>/<food_item>/<slug>.html, the layout snapshot_parser.py expects."""
+    slug = re.sub(r'[^\w-]+', '_', url.split('://', 1)[-1]).strip('_')[:150]
+    return os.path.join(snapshot_dir, food_item, f"{slug}.html")
+
+def save_page_snapshot(page_source, path):
+    """Save a rendered page for offline re-extraction with snapshot_parser.py."""
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(page_source)
+    except Exception as e:
+        logger.error(f"Error saving page snapshot to {path}: {str(e)}")
 
 def main():
-    # List of food items to scrape
-    food_items = [
-        'burger',
-        'pizza',
-        'biryani',
-        'paneer',
-        'chicken',
-        'naan'
-    ]
-    
+    food_items = FOOD_ITEMS
+
     driver = None
+    politeness = PolitenessPolicy()
+    page_cache = page_cache_from_config()
     try:
-        driver = initialize_driver()
+        if page_cache is None or not page_cache.cache_only:
+            driver = initialize_driver()
         
         for food_item in food_items:
             try:
@@ -492,32 +478,35 @@ def main():
                 logger.info(f"{'='*50}\n")
                 
                 # Construct the URL for the current food item
-                url = f'https://www.zomato.com/kolkata/delivery/dish-{food_item}'
+                url = f'{SCRAPER_BASE_URL}/delivery/dish-{food_item}'
                 
                 # First get all restaurant links
                 logger.info(f"Getting restaurant links for {food_item}...")
-                restaurant_links = get_restaurant_links(driver, url)
+                dish_timings = {}
+                restaurant_links = get_restaurant_links(driver, url, timings=dish_timings, politeness=politeness,
+                                                        page_cache=page_cache)
                 
                 if restaurant_links:
-                    # Scrape each restaurant's menu
-                    all_restaurants = []
-                    for i, restaurant_url in enumerate(restaurant_links[:5]):  # Limit to top 5 restaurants
-                        try:
-                            logger.info(f"\nScraping restaurant {i+1}/{min(5, len(restaurant_links))} for {food_item}: {restaurant_url}")
-                            data = scrape_restaurant_data(driver, restaurant_url)
-                            all_restaurants.append(data)
-                            time.sleep(random.uniform(2, 4))  # Add delay between restaurants
-                        except Exception as e:
-                            logger.error(f"Error scraping restaurant {restaurant_url} for {food_item}: {str(e)}")
-                            continue
-                    # After all restaurants for this item:
-                    with open(f"{food_item}.json", "w", encoding="utf-8") as f:
-                        json.dump(all_restaurants, f, ensure_ascii=False, indent=2)
+                    # Scrape each restaurant's menu; each record is written (and flushed) as soon as it is scraped
+                    with JsonlWriter(f"{food_item}{RESULTS_EXTENSION}", append=False) as writer:
+                        for i, restaurant_url in enumerate(restaurant_links[:RESTAURANTS_PER_DISH]):  # Limit to the top restaurants
+                            try:
+                                logger.info(f"\nScraping restaurant {i+1}/{min(RESTAURANTS_PER_DISH, len(restaurant_links))} for {food_item}: {restaurant_url}")
+                                snapshot_path = snapshot_path_for(SCRAPER_SNAPSHOT_DIR, food_item, restaurant_url) if SCRAPER_SNAPSHOT_DIR else None
+                                # The politeness policy spaces requests (SCRAPER_PAGE_DELAY_RANGE between restaurants)
+                                data = scrape_restaurant_data(driver, restaurant_url, timings=dish_timings,
+                                                              snapshot_path=snapshot_path, politeness=politeness,
+                                                              page_cache=page_cache)
+                                writer.write(dict(data, url=restaurant_url))
+                            except Exception as e:
+                                logger.error(f"Error scraping restaurant {restaurant_url} for {food_item}: {str(e)}")
+                                continue
+                    logger.info(f"Total time for {writer.count} {food_item} restaurants: {format_timings(dish_timings)}")
                 else:
                     logger.error(f"No restaurant links found for {food_item}. Moving to next item.")
                 
-                # Add delay between different food items
-                time.sleep(random.uniform(5, 8))
+                # Add delay between different food items (taken before the next dish's first request)
+                politeness.space_next(SCRAPER_DISH_DELAY_RANGE)
                 
             except Exception as e:
                 logger.error(f"Error processing {food_item}: {str(e)}")
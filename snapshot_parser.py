@@ -0,0 +1,160 @@
+"""
+Offline, parallel extraction of restaurant data from saved page snapshots.
+
+Re-runs the scraper's extraction (page_extract.py) over a directory of saved restaurant pages
+without a browser, fanned out over a process pool. Snapshots are grouped by their parent
+directory, which names the dish, and each group is written as `{dish}.jsonl.gz` in the same
+format scraper.py produces, so the output can go straight into ingest.py.
+
+Snapshots are `*.html`, `*.htm` or gzipped `*.html.gz` files. The scraper saves them when
+QUICKBITES_SNAPSHOT_DIR is set (see config.py), as `<dir>/<dish>/<restaurant>.html`.
+
+Usage:
+    python snapshot_parser.py parse snapshots/ --output-dir scraped/ --workers 8
+    python snapshot_parser.py bench snapshots/ --workers 1,4,8 --parsers lxml,html.parser
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from jsonl_stream import JsonlWriter
+from page_extract import DEFAULT_PARSER, extract_restaurant_data
+
+SNAPSHOT_EXTENSIONS = ('.html', '.htm', '.html.gz', '.htm.gz')
+
+
+def find_snapshots(root):
+    """Every snapshot file under root (recursively), in sorted order."""
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.lower().endswith(SNAPSHOT_EXTENSIONS):
+                paths.append(os.path.join(dirpath, filename))
+    return sorted(paths)
+
+
+def read_snapshot(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def parse_snapshot(path, parser=None):
+    """Extract one snapshot. Returns (path, restaurant_data, html_size_in_bytes)."""
+    html = read_snapshot(path)
+    return path, extract_restaurant_data(html, parser), len(html.encode('utf-8'))
+
+
+def _parse_batch(paths, parser):
+    return [parse_snapshot(path, parser) for path in paths]
+
+
+def parse_snapshots(paths, workers=1, parser=None, batch_size=16):
+    """
+    Extract every snapshot in paths, in order. With workers > 1 the files are split into
+    batches (one task per batch keeps pickling overhead low) and parsed in worker processes.
+    """
+    if workers <= 1 or len(paths) <= batch_size:
+        return _parse_batch(paths, parser)
+    batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch_results in executor.map(_parse_batch, batches, [parser] * len(batches)):
+            results.extend(batch_results)
+    return results
+
+
+def group_by_dish(results, root):
+    """{dish: [restaurant_data, ...]} using each snapshot's parent directory as the dish name."""
+    root_name = os.path.basename(os.path.normpath(root))
+    grouped = {}
+    for path, restaurant_data, _ in results:
+        parent = os.path.dirname(os.path.relpath(path, root))
+        dish = parent.split(os.sep)[0] if parent else root_name
+        grouped.setdefault(dish, []).append(restaurant_data)
+    return grouped
+
+
+def write_outputs(grouped, output_dir):
+    written = []
+    for dish, restaurants in grouped.items():
+        path = os.path.join(output_dir, f"{dish}.jsonl.gz")
+        with JsonlWriter(path, append=False) as writer:
+            for restaurant_data in restaurants:
+                writer.write(restaurant_data)
+        written.append(path)
+    return written
+
+
+def run_benchmark(paths, worker_counts, parsers, batch_size):
+    """Time a full extraction pass per (parser, workers) pair; returns a list of result dicts."""
+    total_bytes = sum(os.path.getsize(p) for p in paths)
+    rows = []
+    for parser in parsers:
+        for workers in worker_counts:
+            start = time.perf_counter()
+            results = parse_snapshots(paths, workers=workers, parser=parser, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            html_bytes = sum(size for _, _, size in results)
+            rows.append({
+                'parser': parser,
+                'workers': workers,
+                'pages': len(results),
+                'seconds': round(elapsed, 3),
+                'pages_per_second': round(len(results) / elapsed, 1) if elapsed else None,
+                'mb_per_second': round(html_bytes / 1e6 / elapsed, 2) if elapsed else None,
+                'menu_blobs': sum(len(data['menu']) for _, data, _ in results),
+            })
+    print(f"{len(paths)} snapshots, {total_bytes / 1e6:.1f} MB on disk")
+    print(f"{'parser':<14}{'workers':>8}{'seconds':>10}{'pages/s':>10}{'MB/s':>8}{'blobs':>8}")
+    for row in rows:
+        print(f"{row['parser']:<14}{row['workers']:>8}{row['seconds']:>10.2f}{row['pages_per_second']:>10.1f}"
+              f"{row['mb_per_second']:>8.2f}{row['menu_blobs']:>8}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract restaurant data from saved page snapshots")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    parse_parser = subparsers.add_parser('parse', help="Extract snapshots into {dish}.jsonl.gz files")
+    parse_parser.add_argument('snapshot_dir')
+    parse_parser.add_argument('--output-dir', default='.', help="Where {dish}.jsonl.gz files are written")
+    parse_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parse_parser.add_argument('--parser', default=DEFAULT_PARSER, help="BeautifulSoup parser backend")
+    parse_parser.add_argument('--batch-size', type=int, default=16)
+
+    bench_parser = subparsers.add_parser('bench', help="Measure extraction throughput")
+    bench_parser.add_argument('snapshot_dir')
+    bench_parser.add_argument('--workers', default=f"1,{os.cpu_count() or 1}", help="Comma-separated worker counts")
+    bench_parser.add_argument('--parsers', default=f"{DEFAULT_PARSER},html.parser", help="Comma-separated parser backends")
+    bench_parser.add_argument('--batch-size', type=int, default=16)
+    bench_parser.add_argument('--output', help="Write the benchmark rows as JSON")
+
+    args = parser.parse_args()
+    paths = find_snapshots(args.snapshot_dir)
+    if not paths:
+        parser.error(f"No snapshots found under {args.snapshot_dir}")
+
+    if args.command == 'bench':
+        worker_counts = [int(w) for w in args.workers.split(',')]
+        parsers = list(dict.fromkeys(args.parsers.split(',')))
+        rows = run_benchmark(paths, worker_counts, parsers, args.batch_size)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(rows, f, indent=4)
+        return
+
+    start = time.perf_counter()
+    results = parse_snapshots(paths, workers=args.workers, parser=args.parser, batch_size=args.batch_size)
+    written = write_outputs(group_by_dish(results, args.snapshot_dir), args.output_dir)
+    elapsed = time.perf_counter() - start
+    print(f"Extracted {len(results)} snapshots in {elapsed:.1f}s ({len(results) / elapsed:.1f} pages/s) "
+          f"into {len(written)} files: {', '.join(written)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Local static stand-in for the Zomato pages the scraper visits.
+
+Serves dish search pages and restaurant pages with the same markup classes the scraper's
+selectors target, so scraper.py can be exercised end to end without touching the real site:
+
+    python standin_site.py --port 8765 --restaurants 8 --items 30
+    QUICKBITES_SCRAPER_BASE_URL=http://127.0.0.1:8765/kolkata python scraper.py
+
+Routes:
+    /<city>/delivery/dish-<dish>       search page with restaurant cards linking to ...
+    /<city>/<dish>-<n>/order           a restaurant page with a menu
+    /__stats                           JSON request log (path, timestamp) for checking crawl pacing
+
+Pages are generated deterministically from --seed, or served from a snapshot directory laid
+out as <dir>/<dish>/<page>.html (the layout scraper.py writes with QUICKBITES_SNAPSHOT_DIR).
+--latency-ms delays every response; --render-delay-ms inserts the menu with JavaScript after
+a delay, like the client-side rendering of the real site.
+"""
+import argparse
+import html
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DISH_WORDS = ['Classic', 'Spicy', 'Cheesy', 'Tandoori', 'Peri Peri', 'Smoky', 'Crispy', 'Masala', 'Double', 'Loaded']
+DESCRIPTIONS = [
+    "Freshly prepared with house spices and served hot with a side of mint chutney",
+    "A customer favourite made with hand picked ingredients and a generous topping",
+    "Slow cooked for hours and finished on the grill for a smoky flavour",
+]
+AREAS = ['Park Street', 'Salt Lake', 'New Town', 'Ballygunge', 'Gariahat', 'Esplanade']
+
+SEARCH_RE = re.compile(r'^/(?P<city>[\w-]+)/delivery/dish-(?P<dish>[\w-]+)/?$')
+RESTAURANT_RE = re.compile(r'^/(?P<city>[\w-]+)/(?P<dish>[\w]+)-(?P<index>\d+)/order/?$')
+
+
+class StandInSite:
+    """Page generator plus request log shared by all handler threads."""
+
+    def __init__(self, restaurants=5, items=25, seed=0, snapshot_dir=None, latency_ms=0, render_delay_ms=0):
+        self.restaurants = restaurants
+        self.items = items
+        self.seed = seed
+        self.snapshot_dir = snapshot_dir
+        self.latency = latency_ms / 1000.0
+        self.render_delay_ms = render_delay_ms
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def log_request(self, path):
+        with self._lock:
+            self.requests.append({'path': path, 'time': time.time()})
+
+    def _snapshot_files(self, dish):
+        dish_dir = os.path.join(self.snapshot_dir, dish)
+        if not os.path.isdir(dish_dir):
+            return []
+        return sorted(f for f in os.listdir(dish_dir) if f.endswith(('.html', '.htm')))
+
+    def restaurant_count(self, dish):
+        return len(self._snapshot_files(dish)) if self.snapshot_dir else self.restaurants
+
+    def search_page(self, city, dish):
+        cards = []
+        for index in range(self.restaurant_count(dish)):
+            rng = random.Random(f"{self.seed}-{dish}-{index}")
+            cards.append(
+                f'<div class="sc-1mo3ldo-0 card"><a class="sc-1mo3ldo-0 link" href="/{city}/{dish}-{index}/order">'
+                f'<h4 class="sc-1hp8d8a-0">{html.escape(self._restaurant_name(dish, index))}</h4></a>'
+                f'<p class="sc-1hez2tp-0">{rng.choice(AREAS)}, Kolkata</p>'
+                f'<div class="sc-1q7bklc-5">{rng.uniform(3.2, 4.9):.1f}</div>'
+                f'<div class="sc-1hez2tp-1">₹{rng.randrange(150, 600, 50)} for one</div></div>')
+        return f"<html><body><h1>Best {html.escape(dish)} near you</h1>{''.join(cards)}</body></html>"
+
+    def _restaurant_name(self, dish, index):
+        return f"{random.Random(f'{self.seed}-name-{index}').choice(DISH_WORDS)} {dish.title()} House {index}"
+
+    def restaurant_page(self, dish, index):
+        if self.snapshot_dir:
+            files = self._snapshot_files(dish)
+            if index >= len(files):
+                return None
+            with open(os.path.join(self.snapshot_dir, dish, files[index]), 'r', encoding='utf-8', errors='replace') as f:
+                return f.read()
+        if index >= self.restaurants:
+            return None
+
+        rng = random.Random(f"{self.seed}-{dish}-{index}")
+        menu = ''.join(
+            f'<div class="sc-1s0saks-17 item"><div class="sc-1s0saks-15">'
+            f'<h4 class="sc-1s0saks-15">{rng.choice(DISH_WORDS)} {html.escape(dish.title())} {n + 1}</h4>'
+            f'<span class="sc-17hyc2s-1">₹{rng.randrange(90, 450, 10)}</span>'
+            f'<p class="sc-1s0saks-12">{rng.choice(DESCRIPTIONS)}</p></div></div>'
+            for n in range(self.items))
+        if self.render_delay_ms:
+            # Client-side render: the menu only appears after the delay
+            menu = (f'<div id="menu-root"></div><script>setTimeout(function() {{'
+                    f'document.getElementById("menu-root").innerHTML = {json.dumps(menu)};'
+                    f'}}, {int(self.render_delay_ms)});</script>')
+        filler = ''.join(f'<div class="nav-{n}"><span>Link {n}</span></div>' for n in range(50))
+        return (f"<html><body>{filler}<h1>{html.escape(self._restaurant_name(dish, index))}</h1>"
+                f'<p class="sc-1hez2tp-0">{rng.choice(AREAS)}, Kolkata</p>'
+                f'<div class="sc-1q7bklc-5">{rng.uniform(3.2, 4.9):.1f}</div>'
+                f"<section>{menu}</section></body></html>")
+
+
+def make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/__stats':
+                return self._send(200, json.dumps(site.requests), 'application/json')
+            site.log_request(path)
+            if site.latency:
+                time.sleep(site.latency)
+            body = None
+            match = SEARCH_RE.match(path)
+            if match:
+                body = site.search_page(match['city'], match['dish'])
+            else:
+                match = RESTAURANT_RE.match(path)
+                if match:
+                    body = site.restaurant_page(match['dish'], int(match['index']))
+            if body is None:
+                return self._send(404, "<html><body><h1>Not found</h1></body></html>")
+            self._send(200, body)
+
+        def _send(self, status, body, content_type='text/html; charset=utf-8'):
+            payload = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass  # Keep test output quiet; /__stats has the request log
+
+    return Handler
+
+
+def start_server(site, host='127.0.0.1', port=0):
+    """Serve `site` on a background thread. Returns (server, base_url); call server.shutdown() to stop."""
+    server = ThreadingHTTPServer((host, port), make_handler(site))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in of the pages scraper.py visits")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--restaurants', type=int, default=5, help="Restaurants per dish search page")
+    parser.add_argument('--items', type=int, default=25, help="Menu items per restaurant page")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--snapshots', help="Serve saved pages from <dir>/<dish>/*.html instead of generated ones")
+    parser.add_argument('--latency-ms', type=int, default=0, help="Delay before every response")
+    parser.add_argument('--render-delay-ms', type=int, default=0, help="Insert the menu with JavaScript after this delay")
+    args = parser.parse_args()
+
+    site = StandInSite(args.restaurants, args.items, args.seed, args.snapshots, args.latency_ms, args.render_delay_ms)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(site))
+    print(f"Stand-in site on http://{args.host}:{args.port}/kolkata/delivery/dish-burger")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Synthetic data generator for benchmarking.
+
+Produces menus in the schema load_menu_data expects (Item, Description, Price, Category,
+Restaurant, Location, Rating, Is_Vegetarian, Discount, Tags), ratings.json-compatible rating
+lists and order histories shaped like the orders built by app.process_order.
+
+Usage:
+    python synthetic_data.py --sizes 1000,100000 --output-dir synthetic_data
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Vocabulary used to compose item names, descriptions and tags
+DISHES = [
+    ("Biryani", "Main Course", "rice,main_course,family_meal,aromatic,hearty,biryani"),
+    ("Butter Masala", "Main Course", "curry,main_course,rich,creamy,comfort_food"),
+    ("Tikka", "Starter", "grilled,starter,smoky,appetizer,party_pack"),
+    ("Pizza", "Main Course", "pizza,italian,shareable,party_pack,finger_food"),
+    ("Burger", "Snack", "fast_food,snack,quick_lunch,american"),
+    ("Roll", "Snack", "roll,snack,quick_lunch,street_food"),
+    ("Fried Rice", "Main Course", "rice,chinese,main_course,fried"),
+    ("Noodles", "Main Course", "noodles,chinese,main_course,comfort_food"),
+    ("Soup", "Starter", "soup,warm,healthy,light_meal"),
+    ("Salad", "Starter", "salad,healthy,fresh,low_calorie,refreshing"),
+    ("Pakora", "Snack", "pakora,fried,snack,rainy_day,hot"),
+    ("Lassi", "Beverage", "lassi,cold,refreshing,sweet"),
+    ("Chai", "Beverage", "tea,chai,hot_drink,warm"),
+    ("Cold Coffee", "Beverage", "coffee,cold,refreshing,sweet"),
+    ("Ice Cream", "Dessert", "ice_cream,dessert,sweet,cold,treat"),
+    ("Brownie", "Dessert", "chocolate,dessert,sweet,treat,celebration"),
+    ("Gulab Jamun (2 pcs)", "Dessert", "dessert,sweet,indian,celebration"),
+    ("Raita", "Side", "side,cold,yogurt,refreshing"),
+    ("Naan", "Bread", "bread,side,tandoor"),
+]
+VEG_PROTEINS = ["Paneer", "Veg", "Mushroom", "Aloo", "Corn", "Chana"]
+NON_VEG_PROTEINS = ["Chicken", "Mutton", "Fish", "Prawn", "Egg"]
+STYLES = ["Classic", "Spicy", "Hyderabadi", "Kolkata", "Tandoori", "Smoky", "Special", "Royal", "Street", "Masala"]
+RESTAURANT_WORDS = ["Spice", "Royal", "Biryani", "Dragon", "Chai", "Tandoor", "Curry", "Urban", "Bengal", "Grill"]
+RESTAURANT_SUFFIXES = ["House", "Kitchen", "Corner", "Express", "Cafe", "Dhaba", "Bistro", "Point"]
+LOCATIONS = ["Kolkata", "Mumbai", "Delhi", "Bengaluru", "Chennai", "Hyderabad", "Pune"]
+DESCRIPTION_WORDS = ["aromatic", "spicy", "creamy", "crispy", "smoky", "tangy", "fresh", "rich",
+                     "slow-cooked", "grilled", "buttery", "zesty", "hearty", "light", "sweet"]
+
+
+def generate_menu(n_rows, seed=0):
+    """Generate a synthetic menu DataFrame with n_rows rows."""
+    rng = np.random.default_rng(seed)
+    dish_idx = rng.integers(0, len(DISHES), n_rows)
+    is_veg = rng.random(n_rows) < 0.6
+    veg_protein = rng.integers(0, len(VEG_PROTEINS), n_rows)
+    non_veg_protein = rng.integers(0, len(NON_VEG_PROTEINS), n_rows)
+    style_idx = rng.integers(0, len(STYLES), n_rows)
+
+    n_restaurants = max(5, n_rows // 40)
+    restaurant_names = np.array([
+        f"{RESTAURANT_WORDS[i % len(RESTAURANT_WORDS)]} {RESTAURANT_SUFFIXES[(i // len(RESTAURANT_WORDS)) % len(RESTAURANT_SUFFIXES)]} {i}"
+        for i in range(n_restaurants)
+    ])
+    restaurant_idx = rng.integers(0, n_restaurants, n_rows)
+
+    dish_names = np.array([d[0] for d in DISHES])
+    dish_categories = np.array([d[1] for d in DISHES])
+    dish_tags = np.array([d[2] for d in DISHES])
+    proteins = np.where(is_veg, np.array(VEG_PROTEINS)[veg_protein], np.array(NON_VEG_PROTEINS)[non_veg_protein])
+    styles = np.array(STYLES)[style_idx]
+
+    items = pd.Series(styles).str.cat([pd.Series(proteins), pd.Series(dish_names[dish_idx])], sep=" ")
+    desc_words = np.array(DESCRIPTION_WORDS)
+    descriptions = (pd.Series(desc_words[rng.integers(0, len(desc_words), n_rows)]).str.capitalize()
+                    .str.cat([pd.Series(desc_words[rng.integers(0, len(desc_words), n_rows)]),
+                              pd.Series(proteins).str.lower(),
+                              pd.Series(dish_names[dish_idx]).str.lower()], sep=" "))
+    veg_tag = np.where(is_veg, "veg", "non-veg")
+    tags = pd.Series(veg_tag).str.cat([pd.Series(dish_tags[dish_idx]), pd.Series(styles).str.lower()], sep=",")
+
+    return pd.DataFrame({
+        'Item': items,
+        'Description': descriptions,
+        'Price': (rng.integers(6, 120, n_rows) * 5).astype(int),
+        'Category': dish_categories[dish_idx],
+        'Restaurant': restaurant_names[restaurant_idx],
+        'Location': np.array(LOCATIONS)[restaurant_idx % len(LOCATIONS)],
+        'Rating': np.round(rng.uniform(3.0, 5.0, n_rows), 1),
+        'Is_Vegetarian': np.where(is_veg, "Veg", "Non-Veg"),
+        'Discount': rng.choice([0, 0, 0, 5, 10, 15, 20], n_rows),
+        'Tags': tags,
+    })
+
+
+def _timestamps(rng, n, days=90):
+    base = datetime.now() - timedelta(days=days)
+    offsets = rng.integers(0, days * 24 * 3600, n)
+    return [(base + timedelta(seconds=int(s))).strftime("%Y-%m-%d %H:%M:%S") for s in offsets]
+
+
+def generate_ratings(menu_df, n_ratings, n_users=None, seed=0):
+    """Generate a ratings.json-compatible list of rating entries over menu_df items."""
+    rng = np.random.default_rng(seed)
+    n_users = n_users or max(1, n_ratings // 20)
+    user_ids = [f"u{i:07d}" for i in range(n_users)]
+    rows = rng.integers(0, len(menu_df), n_ratings)
+    users = rng.integers(0, n_users, n_ratings)
+    values = rng.choice([1, 2, 3, 4, 5], n_ratings, p=[0.05, 0.1, 0.25, 0.35, 0.25])
+    items = menu_df['Item'].to_numpy()
+    restaurants = menu_df['Restaurant'].to_numpy()
+    timestamps = _timestamps(rng, n_ratings)
+    return [
+        {
+            'user_id': user_ids[users[k]],
+            'item_name': items[rows[k]],
+            'restaurant_name': restaurants[rows[k]],
+            'rating': int(values[k]),
+            'timestamp': timestamps[k],
+        }
+        for k in range(n_ratings)
+    ]
+
+
+def generate_order_histories(menu_df, n_orders, n_users=None, max_items_per_order=4, seed=0):
+    """Generate order histories {user_id: [order, ...]} in the process_order format."""
+    rng = np.random.default_rng(seed)
+    n_users = n_users or max(1, n_orders // 10)
+    records = menu_df.to_dict('records') if len(menu_df) <= 200000 else None
+    timestamps = _timestamps(rng, n_orders)
+    histories = {}
+    for k in range(n_orders):
+        user_id = f"u{int(rng.integers(0, n_users)):07d}"
+        n_items = int(rng.integers(1, max_items_per_order + 1))
+        rows = rng.integers(0, len(menu_df), n_items)
+        items = []
+        for row in rows:
+            item = dict(records[row]) if records is not None else menu_df.iloc[int(row)].to_dict()
+            item['quantity'] = int(rng.integers(1, 4))
+            items.append(item)
+        total = sum(float(item['Price']) * item['quantity'] for item in items)
+        histories.setdefault(user_id, []).append({
+            'order_id': f"{k:08x}",
+            'items': items,
+            'total': total,
+            'payment_method': "Wallet" if rng.random() < 0.5 else "Cash on Delivery",
+            'restaurant': items[0]['Restaurant'],
+            'timestamp': timestamps[k],
+        })
+    return histories
+
+
+def _json_default(value):
+    """json.dump fallback for numpy scalars coming out of DataFrame records."""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def write_dataset(size, output_dir, ratings_per_row=0.1, orders_per_row=0.01, seed=0):
+    """Write menu_<size>.csv, ratings_<size>.json and orders_<size>.json; return their paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    menu_df = generate_menu(size, seed=seed)
+    paths = {
+        'menu': os.path.join(output_dir, f"menu_{size}.csv"),
+        'ratings': os.path.join(output_dir, f"ratings_{size}.json"),
+        'orders': os.path.join(output_dir, f"orders_{size}.json"),
+    }
+    menu_df.to_csv(paths['menu'], index=False)
+    with open(paths['ratings'], 'w') as f:
+        json.dump(generate_ratings(menu_df, max(1, int(size * ratings_per_row)), seed=seed), f)
+    with open(paths['orders'], 'w') as f:
+        json.dump(generate_order_histories(menu_df, max(1, int(size * orders_per_row)), seed=seed), f,
+                  default=_json_default)
+    return paths
+
+
+def parse_sizes(text):
+    """Parse '1k,100k,1M' or '1000,100000' into a list of ints."""
+    multipliers = {'k': 1000, 'm': 1000000}
+    sizes = []
+    for part in text.split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if part[-1] in multipliers:
+            sizes.append(int(float(part[:-1]) * multipliers[part[-1]]))
+        else:
+            sizes.append(int(part))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic QuickBites datasets")
+    parser.add_argument('--sizes', default="1k,100k,1M", help="Comma-separated menu sizes (e.g. 1k,100k,1M)")
+    parser.add_argument('--output-dir', default="synthetic_data")
+    parser.add_argument('--ratings-per-row', type=float, default=0.1)
+    parser.add_argument('--orders-per-row', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for size in parse_sizes(args.sizes):
+        paths = write_dataset(size, args.output_dir, args.ratings_per_row, args.orders_per_row, args.seed)
+        print(f"{size} rows -> {', '.join(paths.values())}")
+
+
+if __name__ == '__main__':
+    main()
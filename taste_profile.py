@@ -0,0 +1,363 @@
+"""
+Per-user taste profiles: weights over item features, learned from orders and ratings.
+
+An item's features are its cuisine, category, spice level, each of its tags and its price band
+(TASTE_PRICE_BANDS), e.g. 'cuisine:indian', 'tag:spicy', 'price:150-300'. A user's profile is a
+sparse {feature: weight} dict:
+    every unit ordered adds TASTE_ORDER_WEIGHT to the dish's features
+    a rating adds (rating - CF_RATING_CENTER)·TASTE_RATING_WEIGHT (1-2 stars push features down);
+    a changed or cleared rating first takes back exactly what the previous one added
+so an order or rating costs O(features of the items involved), never a replay of history.
+Ratings only name the dish, so profiles also remember the features of the
+TASTE_REMEMBERED_DISHES dishes the user ordered last (ratings are given from the order history);
+other dishes are looked up in the last catalog scored. What each rating applied (features and
+weight) is kept per rated dish, so taking it back does not depend on either lookup.
+
+Each user's profile is its own small JSON file under TASTE_PROFILE_DIR, read on the user's
+first request (O(1) in the number of users and orders). Changed profiles are written back
+together at most every TASTE_SAVE_SECONDS and at exit, not on every order or rating.
+
+For scoring, each catalog DataFrame gets a sparse item x feature matrix X (built once, rows
+L2-normalized). A user's score for the rows is one sparse product with their normalized profile:
+    taste = TASTE_BOOST_WEIGHT · X[rows] · p / |p|
+i.e. the cosine between the dish and the user's taste.
+
+Usage:
+    python taste_profile.py d88b0c87                                   # a user's top features
+    python taste_profile.py d88b0c87 --catalog corrected_menu_dataset.csv  # and their best-matching dishes
+"""
+import argparse
+import atexit
+import math
+import os
+import re
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import memory_report
+import rating_stats
+import utils
+from config import (CF_RATING_CENTER, TASTE_BOOST_WEIGHT, TASTE_ORDER_WEIGHT, TASTE_PRICE_BANDS,
+                    TASTE_PROFILE_DIR, TASTE_RATING_WEIGHT, TASTE_REMEMBERED_DISHES, TASTE_SAVE_SECONDS)
+
+# (catalog column, feature prefix) of the single-valued features
+FEATURE_COLUMNS = [('Cuisine', 'cuisine'), ('Category', 'category'), ('Spice_Level', 'spice')]
+EMPTY_VALUES = {'', 'nan', 'none', 'unknown', 'n/a', '-'}
+PRICE_BAND_NAMES = (['price:<%g' % TASTE_PRICE_BANDS[0]]
+                    + ['price:%g-%g' % bounds for bounds in zip(TASTE_PRICE_BANDS, TASTE_PRICE_BANDS[1:])]
+                    + ['price:%g+' % TASTE_PRICE_BANDS[-1]])
+
+
+def _token(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    token = str(value).strip().lower()
+    return None if token in EMPTY_VALUES else token
+
+
+def _tags(value):
+    tokens = (_token(part) for part in str(value).split(',')) if _token(value) else ()
+    return [f"tag:{token}" for token in tokens if token]
+
+
+def _single_feature(prefix):
+    def features(value):
+        token = _token(value)
+        return [f"{prefix}:{token}"] if token else []
+    return features
+
+
+def price_band(price):
+    """Price band feature of a price (None if it is not a number)."""
+    try:
+        price = float(price)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(price):
+        return None
+    return PRICE_BAND_NAMES[int(np.searchsorted(TASTE_PRICE_BANDS, price, side='right'))]
+
+
+def item_features(item):
+    """Feature names of one item dict (a catalog row or a cart item)."""
+    features = []
+    for col, prefix in FEATURE_COLUMNS:
+        token = _token(item.get(col))
+        if token:
+            features.append(f"{prefix}:{token}")
+    features.extend(_tags(item.get('Tags')))
+    band = price_band(item.get('Price'))
+    if band:
+        features.append(band)
+    return list(dict.fromkeys(features))
+
+
+class CatalogFeatures:
+    """Sparse item x feature matrix of one catalog DataFrame (rows L2-normalized)."""
+
+    def __init__(self, df):
+        self.feature_index = {}
+        self.feature_names = []
+        # Features are named once per distinct column value, then gathered by each row's code
+        blocks = []
+        for col, features_of in [(col, _single_feature(prefix)) for col, prefix in FEATURE_COLUMNS] + [('Tags', _tags)]:
+            if col in df.columns:
+                codes, uniques = pd.factorize(df[col])
+                per_value = [[self._feature(name) for name in features_of(value)] for value in uniques] + [[]]
+                blocks.append((np.where(codes < 0, len(per_value) - 1, codes), per_value))
+        band_columns = [self._feature(name) for name in PRICE_BAND_NAMES]
+
+        shape = (len(df), len(self.feature_names))
+        matrix = sparse.csr_matrix(shape, dtype=np.float32)
+        for codes, per_value in blocks:
+            indptr = np.concatenate([[0], np.cumsum([len(features) for features in per_value])])
+            indices = np.array([f for features in per_value for f in features], dtype=np.int64)
+            by_value = sparse.csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                                         shape=(len(per_value), shape[1]))
+            matrix = matrix + by_value[codes]
+        if 'Price' in df.columns:
+            prices = pd.to_numeric(df['Price'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            priced = np.flatnonzero(~np.isnan(prices))
+            bands = np.searchsorted(TASTE_PRICE_BANDS, prices[priced], side='right')
+            matrix = matrix + sparse.csr_matrix(
+                (np.ones(len(priced), dtype=np.float32), (priced, np.array(band_columns)[bands])), shape=shape)
+        matrix = matrix.tocsr()
+        matrix.data[:] = 1.0  # A tag listed twice is still one feature
+        norms = np.sqrt(np.diff(matrix.indptr)).astype(np.float32)
+        self.matrix = (sparse.diags(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)) @ matrix).tocsr()
+
+    def _feature(self, name):
+        index = self.feature_index.get(name)
+        if index is None:
+            index = self.feature_index[name] = len(self.feature_names)
+            self.feature_names.append(name)
+        return index
+
+    @property
+    def nbytes(self):
+        return self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes
+
+    def row_features(self, row):
+        return [self.feature_names[i] for i in self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row + 1]]]
+
+    def vector(self, weights):
+        """A {feature: weight} dict as a dense vector over this catalog's features."""
+        vector = np.zeros(len(self.feature_names), dtype=np.float32)
+        for name, weight in weights.items():
+            index = self.feature_index.get(name)
+            if index is not None:
+                vector[index] = weight
+        return vector
+
+
+def _empty_profile():
+    # rated: dish key -> [features, weight] its current rating added to 'features'
+    return {'features': {}, 'dishes': {}, 'rated': {}, 'orders': 0, 'ratings': 0}
+
+
+def _dish_key(item_name, restaurant_name):
+    return f"{item_name}\x1f{restaurant_name}"
+
+
+class TasteProfiles:
+    """Profiles of the users seen by this process, each loaded from its own file on first use."""
+
+    def __init__(self, profile_dir=TASTE_PROFILE_DIR):
+        self.profile_dir = profile_dir
+        self._profiles = {}  # user_id -> profile dict (see _empty_profile)
+        self._catalogs = {}  # id(df) -> (weakref to df, CatalogFeatures)
+        self._last_catalog = None  # weakref to the DataFrame scored last
+        self._dirty = set()  # Users whose profile changed since it was last saved
+        self._lock = threading.RLock()
+
+    def _path(self, user_id):
+        return os.path.join(self.profile_dir, re.sub(r'[^\w-]', '_', str(user_id)) + '.json')
+
+    def profile(self, user_id):
+        """The user's profile (empty if they have none yet)."""
+        profile = self._profiles.get(user_id)
+        if profile is None:
+            path = self._path(user_id)
+            stored = utils.load_json_file(path, default_data={}) if os.path.exists(path) else {}
+            profile = self._profiles[user_id] = dict(_empty_profile(), **stored)
+        return profile
+
+    def flush(self):
+        """Save the profiles that changed since they were last saved."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            for user_id in dirty:
+                utils.save_json_file(self._path(user_id), self._profiles[user_id])
+
+    @staticmethod
+    def _add(profile, features, weight):
+        weights = profile['features']
+        for name in features:
+            value = round(weights.get(name, 0.0) + weight, 4)
+            if value:
+                weights[name] = value
+            else:
+                weights.pop(name, None)
+
+    def record_order(self, user_id, items):
+        """Add one order's cart items (dicts with catalog columns and quantity) to the user's profile."""
+        if not user_id:
+            return
+        with self._lock:
+            profile = self.profile(user_id)
+            for item in items:
+                features = item_features(item)
+                dishes = profile['dishes']
+                dishes.pop(_dish_key(item.get('Item'), item.get('Restaurant')), None)  # Re-insert as most recent
+                dishes[_dish_key(item.get('Item'), item.get('Restaurant'))] = features
+                while len(dishes) > TASTE_REMEMBERED_DISHES:
+                    dishes.pop(next(iter(dishes)))
+                self._add(profile, features, TASTE_ORDER_WEIGHT * float(item.get('quantity', 1) or 1))
+            profile['orders'] += 1
+            self._dirty.add(user_id)
+
+    def _rating_weight(self, rating):
+        return (float(rating) - CF_RATING_CENTER) * TASTE_RATING_WEIGHT if rating else 0.0
+
+    def record_rating(self, user_id, item_name, restaurant_name, rating, previous_rating=None):
+        """Apply one rating upsert (0 or None clears) to the user's profile."""
+        if not user_id:
+            return
+        key = _dish_key(item_name, restaurant_name)
+        weight = self._rating_weight(rating)
+        with self._lock:
+            profile = self.profile(user_id)
+            if rating and not previous_rating:
+                profile['ratings'] += 1
+            elif previous_rating and not rating:
+                profile['ratings'] -= 1
+            applied = profile['rated'].pop(key, None)
+            if applied:
+                self._add(profile, applied[0], -applied[1])
+            features = profile['dishes'].get(key)
+            if features is None and weight:
+                df = self._last_catalog() if self._last_catalog is not None else None
+                rows = rating_stats.model().rows_of(df, item_name, restaurant_name) if df is not None else []
+                features = self.features_for(df).row_features(rows[0]) if len(rows) else []
+            if features and weight:
+                self._add(profile, features, weight)
+                profile['rated'][key] = [features, weight]
+            self._dirty.add(user_id)
+
+    def features_for(self, df):
+        """The CatalogFeatures of df, built on first use."""
+        entry = self._catalogs.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        with self._lock:
+            features = CatalogFeatures(df)
+            key = id(df)
+            self._catalogs[key] = (weakref.ref(df, lambda _: self._catalogs.pop(key, None)), features)
+        return features
+
+    def scores(self, user_id, df, rows=None):
+        """Taste scores of df's rows (or of the given row positions) for the user; zeros without a profile."""
+        return self.scores_for_users([user_id], df, rows)[0]
+
+    def scores_for_users(self, user_ids, df, rows=None):
+        """
+        Taste scores of several users at once: a len(user_ids) x rows array from one sparse
+        product of the rows' features with the stacked, normalized profiles (zeros without one).
+        """
+        self._last_catalog = weakref.ref(df)
+        count = len(df) if rows is None else len(rows)
+        profiles = [self.profile(user_id)['features'] if user_id else {} for user_id in user_ids]
+        if not any(profiles):
+            return np.zeros((len(user_ids), count))
+        catalog = self.features_for(df)
+        vectors = np.column_stack([catalog.vector(weights) for weights in profiles])
+        norms = np.linalg.norm(vectors, axis=0)
+        vectors *= np.divide(TASTE_BOOST_WEIGHT, norms, out=np.zeros_like(norms), where=norms > 0)
+        matrix = catalog.matrix if rows is None else catalog.matrix[rows]
+        return np.asarray(matrix @ vectors, dtype=np.float64).T
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+_last_saved = time.monotonic()
+
+
+def model():
+    """The process-wide profiles."""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                _MODEL = TasteProfiles()
+    return _MODEL
+
+
+def profile_from_orders(orders):
+    """Feature weights of an order history built from scratch (for backfilling a profile)."""
+    profile = _empty_profile()
+    for order in orders:
+        for item in order.get('items', []):
+            TasteProfiles._add(profile, item_features(item), TASTE_ORDER_WEIGHT * float(item.get('quantity', 1) or 1))
+    return profile['features']
+
+
+def flush():
+    """Save the profiles that changed since the last save."""
+    global _last_saved
+    if _MODEL is not None:
+        _MODEL.flush()
+        _last_saved = time.monotonic()
+
+
+def _flush_if_due():
+    if time.monotonic() - _last_saved >= TASTE_SAVE_SECONDS:
+        flush()
+
+
+def _on_order(order):
+    model().record_order(order.get('user_id'), order.get('items', []))
+    _flush_if_due()
+
+
+def _on_rating(user_id, item_name, restaurant_name, rating_value, previous_rating):
+    model().record_rating(user_id, item_name, restaurant_name, rating_value, previous_rating)
+    _flush_if_due()
+
+
+utils.add_order_listener(_on_order)
+utils.add_rating_listener(_on_rating)
+atexit.register(flush)
+memory_report.register_component('taste_profiles', lambda: memory_report.deep_sizeof(_MODEL) if _MODEL is not None else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a user's taste profile")
+    parser.add_argument('user_id')
+    parser.add_argument('--catalog', help="Menu CSV to score against the profile")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    profiles = model()
+    profile = profiles.profile(args.user_id)
+    print(f"{args.user_id}: {profile['orders']} orders, {profile['ratings']} ratings, "
+          f"{len(profile['features'])} features")
+    for name, weight in sorted(profile['features'].items(), key=lambda kv: -abs(kv[1]))[:args.top]:
+        print(f"  {weight:+8.2f}  {name}")
+    if args.catalog:
+        from menu_catalog import load_catalog
+        df, _, _ = load_catalog(args.catalog)
+        profiles.scores(args.user_id, df)  # Builds the feature matrix
+        start = time.perf_counter()
+        scores = profiles.scores(args.user_id, df)
+        elapsed = time.perf_counter() - start
+        for row in np.argsort(-scores, kind='stable')[:args.top]:
+            print(f"  {scores[row]:6.2f}  {df['Item'].iat[row]} ({df['Restaurant'].iat[row]})")
+        print(f"{len(df)} rows scored in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import ingest
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'ingest')
+BIRYANI = os.path.join(FIXTURES, 'biryani.json')
+RESCRAPE = os.path.join(FIXTURES, 'rescrape', 'biryani.jsonl')
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {'ingested_csv_path': str(tmp_path / 'ingested_menu.csv'), 'state_path': str(tmp_path / 'ingest_state.json')}
+
+
+@pytest.mark.parametrize('text, price', [
+    ("₹250", 250.0),
+    ("Rs. 1,299.50", 1299.5),
+    ("INR 90", 90.0),
+    ("Raita ₹40 Add +", 40.0),
+    ("Serves 2", None),
+    ("", None),
+])
+def test_parse_price(text, price):
+    assert ingest.parse_price(text) == price
+
+
+def test_parse_menu_blob_splits_items_and_descriptions():
+    blob = ("Bestseller\nChicken Biryani\n₹250\nAromatic basmati rice slow cooked with tender chicken and potato\n"
+            "Veg Biryani\n₹180\nAdd +\nRaita ₹40")
+    assert ingest.parse_menu_blob(blob) == [
+        {'Item': 'Chicken Biryani', 'Price': 250.0,
+         'Description': 'Aromatic basmati rice slow cooked with tender chicken and potato'},
+        {'Item': 'Veg Biryani', 'Price': 180.0, 'Description': ''},
+        {'Item': 'Raita', 'Price': 40.0, 'Description': ''},
+    ]
+
+
+def test_parse_scraper_file():
+    rows = ingest.parse_scraper_file(BIRYANI)
+    # The repeated Chicken Biryani card and the nameless restaurant are dropped
+    assert [(row['Restaurant'], row['Item'], row['Price']) for row in rows] == [
+        ('Aminia', 'Chicken Biryani', 250.0), ('Aminia', 'Veg Biryani', 180.0), ('Aminia', 'Raita', 40.0),
+        ('Arsalan', 'Mutton Biryani', 1299.5), ('Arsalan', 'Firni', 90.0),
+    ]
+    assert rows[0]['Rating'] == 4.2
+    assert rows[0]['Description'].startswith('Aromatic')
+    assert [row['Is_Vegetarian'] for row in rows] == ['Non-Veg', 'Veg', 'Veg', 'Non-Veg', 'Veg']
+    assert rows[0]['Tags'] == 'non-veg,main_course,biryani'
+
+
+def test_upsert_writes_only_new_and_changed_rows(paths):
+    assert ingest.upsert_rows(ingest.parse_scraper_file(BIRYANI), **paths) == {'new': 5, 'changed': 0, 'unchanged': 0}
+    assert ingest.upsert_rows(ingest.parse_scraper_file(BIRYANI), **paths) == {'new': 0, 'changed': 0, 'unchanged': 5}
+    # Chicken Biryani went up to ₹270 and Chicken Chaap is new
+    assert ingest.upsert_rows(ingest.parse_scraper_file(RESCRAPE), **paths) == {'new': 1, 'changed': 1, 'unchanged': 2}
+
+    ingested = pd.read_csv(paths['ingested_csv_path'])
+    assert list(ingested.columns) == ingest.CATALOG_COLUMNS
+    assert list(ingested['Item']) == ['Chicken Biryani', 'Veg Biryani', 'Raita', 'Mutton Biryani', 'Firni',
+                                      'Chicken Biryani', 'Chicken Chaap']
+    with open(paths['state_path']) as f:
+        assert len(json.load(f)['hashes']) == 6
+
+
+def test_upsert_dedups_against_the_base_catalog(paths):
+    rows = ingest.parse_scraper_file(BIRYANI)
+    base = pd.DataFrame([dict(rows[1], Restaurant='AMINIA.'), dict(rows[3], Price=1199.0)])
+    assert ingest.upsert_rows(rows, base, **paths) == {'new': 3, 'changed': 1, 'unchanged': 1}
+
+
+def test_dry_run_writes_nothing(paths):
+    assert ingest.upsert_rows(ingest.parse_scraper_file(BIRYANI), dry_run=True, **paths)['new'] == 5
+    assert not os.path.exists(paths['ingested_csv_path'])
+
+
+def test_ingester_saves_the_manifest_in_batches(paths):
+    ingester = ingest.Ingester(**paths)
+    assert ingester.upsert(ingest.parse_scraper_file(BIRYANI)) == {'new': 5, 'changed': 0, 'unchanged': 0}
+    assert ingester.upsert(ingest.parse_scraper_file(RESCRAPE)) == {'new': 1, 'changed': 1, 'unchanged': 2}
+    assert os.path.exists(paths['ingested_csv_path'])
+    assert not os.path.exists(paths['state_path'])
+    ingester.save()
+    # A later run picks up where this one stopped
+    assert ingest.upsert_rows(ingest.parse_scraper_file(RESCRAPE), **paths)['unchanged'] == 4
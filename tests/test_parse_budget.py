@@ -0,0 +1,51 @@
+import pytest
+
+from config import BUDGET_AROUND_TOLERANCE, BUDGET_CHEAP_MAX_PRICE
+from nlp_utils import parse_available_time, parse_budget
+
+
+@pytest.mark.parametrize('query, budget', [
+    ("biryani under 200", (None, 200.0)),
+    ("pizza between 100 and 250", (100.0, 250.0)),
+    ("thali ₹100-250", (100.0, 250.0)),
+    ("dessert over 300", (300.0, None)),
+    ("something cheap", (None, float(BUDGET_CHEAP_MAX_PRICE))),
+    ("my budget is 400", (None, 400.0)),
+    ("budget of 600", (None, 600.0)),
+    ("biryani budget 350", (None, 350.0)),
+    ("budget: ₹1,200 for dinner", (None, 1200.0)),
+    ("cheap biryani ₹150", (None, 150.0)),
+    ("budget friendly thali", (None, float(BUDGET_CHEAP_MAX_PRICE))),
+])
+def test_budget_phrases(query, budget):
+    assert parse_budget(query) == budget
+
+
+@pytest.mark.parametrize('query, amount', [("soup around 300", 300), ("rolls around ₹150", 150)])
+def test_around_budget(query, amount):
+    low, high = parse_budget(query)
+    assert low == pytest.approx(amount * (1 - BUDGET_AROUND_TOLERANCE))
+    assert high == pytest.approx(amount * (1 + BUDGET_AROUND_TOLERANCE))
+
+
+@pytest.mark.parametrize('query', [
+    "soup around 9:30 pm",
+    "soup around 9.30 pm",
+    "dinner around 9 pm",
+    "lunch between 1 and 2 pm",
+    "family pack 10 to 12 people",
+    "biryani for 10-12 persons",
+    "salad under 500 kcal",
+    "serves 2-3",
+    "pizza within 30 minutes",
+    "biryani within 45 mins",
+    "rolls under 2 km",
+    "lunch in under 1 hour",
+    "dinner within 2 hrs",
+])
+def test_times_and_head_counts_are_not_prices(query):
+    assert parse_budget(query) is None
+
+
+def test_time_still_parsed_as_time():
+    assert parse_available_time("soup around 9:30 pm").strftime('%H:%M') == '21:30'
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from utils import get_smart_cart_suggestions, item_rows_for
+
+MENU = pd.DataFrame({
+    'Item': ['Raita', 'Chicken Biryani', 'Raita', 'Gulab Jamun', 'Raita'],
+    'Restaurant': ['Arsalan', 'Aminia', 'Aminia', 'Aminia', 'Shiraz'],
+    'Price': [40, 250, 45, 60, 50],
+})
+
+
+def test_item_rows_are_ascending_per_name():
+    rows = item_rows_for(MENU)
+    assert list(rows['Raita']) == [0, 2, 4]
+    assert item_rows_for(MENU) is rows  # Built once per DataFrame
+
+
+def test_learned_complements_prefer_the_cart_items_restaurant():
+    cart = [{'Item': 'Chicken Biryani', 'Restaurant': 'Aminia', 'quantity': 1}]
+    learned = {'Chicken Biryani': ['Raita', 'Chicken Biryani', 'Phirni', 'Gulab Jamun']}
+    suggestions = get_smart_cart_suggestions(cart, MENU, {}, learned_complements=lambda name: learned.get(name, []))
+    assert [(s['Item'], s['Restaurant']) for s in suggestions] == [('Raita', 'Aminia'), ('Gulab Jamun', 'Aminia')]
+
+
+def test_learned_complements_fall_back_to_the_first_listing():
+    cart = [{'Item': 'Chicken Biryani', 'Restaurant': 'Royal', 'quantity': 1}]
+    suggestions = get_smart_cart_suggestions(cart, MENU, {}, learned_complements=lambda name: ['Raita'])
+    assert [(s['Item'], s['Restaurant']) for s in suggestions] == [('Raita', 'Arsalan')]
@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from taste_profile import TasteProfiles, item_features
+
+DOSA = {'Item': 'Masala Dosa', 'Restaurant': 'Udupi', 'Cuisine': 'South Indian', 'Category': 'Main Course',
+        'Tags': 'veg,breakfast', 'Price': 120, 'quantity': 1}
+
+
+@pytest.fixture
+def profiles(tmp_path):
+    return TasteProfiles(profile_dir=str(tmp_path))
+
+
+def test_rating_before_any_catalog_takes_nothing_back(profiles):
+    profiles.record_rating('u1', 'Masala Dosa', 'Udupi', 5)
+    catalog = pd.DataFrame([{key: value for key, value in DOSA.items() if key != 'quantity'}])
+    profiles.scores('u1', catalog)  # The dish can be looked up from now on
+    profiles.record_rating('u1', 'Masala Dosa', 'Udupi', 0, previous_rating=5)
+    profile = profiles.profile('u1')
+    assert profile['features'] == {}
+    assert profile['ratings'] == 0
+
+
+def test_changed_and_cleared_ratings_take_back_what_they_added(profiles):
+    profiles.record_order('u1', [DOSA])
+    ordered = dict(profiles.profile('u1')['features'])
+    assert set(ordered) == set(item_features(DOSA))
+
+    profiles.record_rating('u1', 'Masala Dosa', 'Udupi', 5)
+    assert all(weight == 3.0 for weight in profiles.profile('u1')['features'].values())
+    profiles.record_rating('u1', 'Masala Dosa', 'Udupi', 1, previous_rating=5)
+    assert all(weight == -1.0 for weight in profiles.profile('u1')['features'].values())
+    profiles.record_rating('u1', 'Masala Dosa', 'Udupi', 0, previous_rating=1)
+    assert profiles.profile('u1')['features'] == ordered
+
+
+def test_profiles_are_reloaded_from_disk(tmp_path, profiles):
+    profiles.record_order('u1', [DOSA])
+    profiles.record_rating('u1', 'Masala Dosa', 'Udupi', 4)
+    assert not list(tmp_path.iterdir())  # Saved in batches, not on every change
+    profiles.flush()
+    reloaded = TasteProfiles(profile_dir=str(tmp_path))
+    reloaded.record_rating('u1', 'Masala Dosa', 'Udupi', 0, previous_rating=4)
+    assert all(weight == 1.0 for weight in reloaded.profile('u1')['features'].values())
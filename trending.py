@@ -0,0 +1,261 @@
+"""
+Time-decayed order counters per item and per restaurant ("trending").
+
+An order of q units at time t adds q·2^(-(now - t) / TRENDING_HALF_LIFE_HOURS) to the item's and
+its restaurant's count at any later time `now`. Decaying every counter on every order would be
+O(counters), so counts are stored forward-decayed instead: an order adds q·e^(λ(t - epoch)) to
+a stored value, and the count at `now` is the stored value times e^(-λ(now - epoch)), one scale
+factor shared by all counters. Updates are O(1). When the exponent gets large, all stored values
+are rescaled to a new epoch (rare, and O(counters) when it happens).
+
+Counters live in numpy arrays indexed by slot. The first time a catalog DataFrame is scored,
+every (Item, Restaurant) and Restaurant in it gets a slot and the row -> slot arrays are cached
+(weakly, like filter_index), so boost() for any set of rows is two gathers and a log1p:
+    boost = TRENDING_ITEM_WEIGHT·log1p(item count) + TRENDING_RESTAURANT_WEIGHT·log1p(restaurant count)
+Order history is never rescanned.
+
+Counters are saved to TRENDING_FILE_PATH at most every TRENDING_SAVE_SECONDS and on exit.
+
+Usage:
+    python trending.py                                   # counter stats
+    python trending.py corrected_menu_dataset.csv --top 10  # trending items of a catalog
+"""
+import argparse
+import atexit
+import math
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+import memory_report
+import utils
+from config import (TRENDING_FILE_PATH, TRENDING_HALF_LIFE_HOURS, TRENDING_ITEM_WEIGHT, TRENDING_MIN_COUNT,
+                    TRENDING_RESTAURANT_WEIGHT, TRENDING_SAVE_SECONDS)
+
+REBASE_EXPONENT = 50.0  # Rescale stored values once e^(λ(t - epoch)) passes e^50
+
+
+class DecayedCounters:
+    """Exponentially decayed counts keyed by hashable keys, stored forward-decayed in one array."""
+
+    def __init__(self, half_life_seconds, epoch=None):
+        self.rate = math.log(2) / half_life_seconds
+        self.epoch = time.time() if epoch is None else epoch
+        self.slots = {}  # key -> slot
+        self.keys = []  # Keys by slot
+        self.values = np.zeros(64)  # Stored (forward-decayed) counts; len >= len(keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def slot(self, key):
+        """The slot of key, added with a zero count if new."""
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = len(self.keys)
+            self.keys.append(key)
+            if slot >= len(self.values):
+                self.values = np.concatenate([self.values, np.zeros(len(self.values))])
+        return slot
+
+    def _rebase(self, now):
+        self.values *= math.exp(-self.rate * (now - self.epoch))
+        self.epoch = now
+
+    def add(self, key, weight=1.0, now=None):
+        now = time.time() if now is None else now
+        if self.rate * (now - self.epoch) > REBASE_EXPONENT:
+            self._rebase(now)
+        slot = self.slot(key)  # May grow self.values
+        self.values[slot] += weight * math.exp(self.rate * (now - self.epoch))
+
+    def scale(self, now=None):
+        """Factor turning stored values into counts at `now`."""
+        now = time.time() if now is None else now
+        return math.exp(-self.rate * (now - self.epoch))
+
+    def count(self, key, now=None):
+        slot = self.slots.get(key)
+        return 0.0 if slot is None else float(self.values[slot]) * self.scale(now)
+
+    def to_dict(self):
+        return {'epoch': self.epoch,
+                'counts': [[key, float(value)] for key, value in zip(self.keys, self.values) if value > 0]}
+
+    def load(self, data):
+        self.epoch = float(data.get('epoch', self.epoch))
+        for key, value in data.get('counts', []):
+            slot = self.slot(tuple(key) if isinstance(key, list) else key)
+            self.values[slot] = value
+
+
+class _CatalogSlots:
+    """Row -> slot arrays of one catalog DataFrame."""
+
+    def __init__(self, df, items, restaurants):
+        restaurant_codes, restaurant_names = pd.factorize(df['Restaurant'].astype(str))
+        self.restaurant = np.array([restaurants.slot(name) for name in restaurant_names],
+                                   dtype=np.int64)[restaurant_codes]
+        pair_codes, pairs = pd.factorize(df['Item'].astype(str) + '\x1f' + df['Restaurant'].astype(str))
+        self.item = np.array([items.slot(tuple(pair.split('\x1f', 1))) for pair in pairs],
+                             dtype=np.int64)[pair_codes]
+        # Each distinct (Item, Restaurant) slot of the catalog and its first row
+        self.unique_items, self.first_rows = np.unique(self.item, return_index=True)
+
+    @property
+    def nbytes(self):
+        return self.item.nbytes + self.restaurant.nbytes + self.unique_items.nbytes + self.first_rows.nbytes
+
+
+class TrendingModel:
+    """Decayed order counters per (Item, Restaurant) and per Restaurant; see the module docstring."""
+
+    def __init__(self, half_life_hours=TRENDING_HALF_LIFE_HOURS, item_weight=TRENDING_ITEM_WEIGHT,
+                 restaurant_weight=TRENDING_RESTAURANT_WEIGHT):
+        self.half_life_hours = half_life_hours
+        self.item_weight = item_weight
+        self.restaurant_weight = restaurant_weight
+        self.items = DecayedCounters(half_life_hours * 3600)
+        self.restaurants = DecayedCounters(half_life_hours * 3600, epoch=self.items.epoch)
+        self.dirty = False
+        self._catalogs = {}  # id(df) -> (weakref to df, _CatalogSlots)
+        self._lock = threading.Lock()
+
+    def record_order(self, items, now=None):
+        """Count one order's cart items (dicts with Item, Restaurant and quantity)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            for item in items:
+                if not item.get('Item'):
+                    continue
+                quantity = float(item.get('quantity', 1) or 1)
+                restaurant = str(item.get('Restaurant'))
+                self.items.add((str(item['Item']), restaurant), quantity, now)
+                self.restaurants.add(restaurant, quantity, now)
+            self.dirty = True
+
+    def _slots_for(self, df):
+        entry = self._catalogs.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        with self._lock:
+            slots = _CatalogSlots(df, self.items, self.restaurants)
+            key = id(df)
+            self._catalogs[key] = (weakref.ref(df, lambda _: self._catalogs.pop(key, None)), slots)
+        return slots
+
+    def item_counts(self, df, rows=None, now=None):
+        """Decayed order count of each row's (Item, Restaurant); rows are positions (default: all)."""
+        slots = self._slots_for(df).item
+        slots = slots if rows is None else slots[rows]
+        return self.items.values[slots] * self.items.scale(now)
+
+    def boost(self, df, rows=None, now=None):
+        """Trending boost aligned with df (or with the given row positions of it)."""
+        slots = self._slots_for(df)
+        item_slots = slots.item if rows is None else slots.item[rows]
+        restaurant_slots = slots.restaurant if rows is None else slots.restaurant[rows]
+        boost = self.item_weight * np.log1p(self.items.values[item_slots] * self.items.scale(now))
+        if self.restaurant_weight:
+            boost += self.restaurant_weight * np.log1p(
+                self.restaurants.values[restaurant_slots] * self.restaurants.scale(now))
+        return boost
+
+    def top_rows(self, df, n=6, min_count=TRENDING_MIN_COUNT, now=None):
+        """
+        Positions of df's n most-ordered dishes right now (decayed count >= min_count), best
+        first; one row per (Item, Restaurant) when the catalog repeats a dish.
+        """
+        slots = self._slots_for(df)
+        counts = self.items.values[slots.unique_items] * self.items.scale(now)
+        candidates = np.flatnonzero(counts >= min_count)
+        if len(candidates) > n:
+            candidates = candidates[np.argpartition(-counts[candidates], n - 1)[:n]]
+        return slots.first_rows[candidates[np.argsort(-counts[candidates], kind='stable')]]
+
+    def to_dict(self):
+        with self._lock:
+            return {'half_life_hours': self.half_life_hours,
+                    'items': self.items.to_dict(), 'restaurants': self.restaurants.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data, **kwargs):
+        model = cls(**kwargs)
+        model.items.load(data.get('items', {}))
+        model.restaurants.load(data.get('restaurants', {}))
+        return model
+
+    def save(self, file_path=None):
+        if utils.save_json_file(file_path or TRENDING_FILE_PATH, self.to_dict()):
+            self.dirty = False
+            return True
+        return False
+
+    def stats(self, now=None):
+        return {
+            'items': len(self.items),
+            'restaurants': len(self.restaurants),
+            'recent_orders': round(float(self.restaurants.values[:len(self.restaurants)].sum())
+                                   * self.restaurants.scale(now), 2),
+        }
+
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+_last_saved = time.monotonic()
+
+
+def model():
+    """The process-wide counters, loaded from TRENDING_FILE_PATH on first use."""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                _MODEL = TrendingModel.from_dict(utils.load_json_file(TRENDING_FILE_PATH, default_data={}))
+    return _MODEL
+
+
+def flush():
+    """Save the counters if they changed since the last save."""
+    global _last_saved
+    if _MODEL is not None and _MODEL.dirty:
+        _MODEL.save()
+        _last_saved = time.monotonic()
+
+
+def _on_order(order):
+    model().record_order(order.get('items', []))
+    if time.monotonic() - _last_saved >= TRENDING_SAVE_SECONDS:
+        flush()
+
+
+utils.add_order_listener(_on_order)
+atexit.register(flush)
+memory_report.register_component('trending', lambda: memory_report.deep_sizeof(_MODEL) if _MODEL is not None else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the trending order counters")
+    parser.add_argument('csv_path', nargs='?', help="Menu CSV whose trending items to list")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    counters = model()
+    print(', '.join(f"{key}={value}" for key, value in counters.stats().items()))
+    if args.csv_path:
+        from menu_catalog import load_catalog
+        df, _, _ = load_catalog(args.csv_path)
+        start = time.perf_counter()
+        rows = counters.top_rows(df, args.top)
+        counts = counters.item_counts(df, rows)
+        elapsed = time.perf_counter() - start
+        for row, count in zip(rows, counts):
+            print(f"  {count:8.2f}  {df['Item'].iat[row]} ({df['Restaurant'].iat[row]})")
+        print(f"{len(df)} rows ranked in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
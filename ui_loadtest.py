@@ -0,0 +1,200 @@
+"""
+Concurrent-session UI load simulation for app.py.
+
+Runs many headless Streamlit sessions through Streamlit's app testing API (AppTest), each
+performing a realistic flow (search, add items, change quantity, remove, checkout, rate),
+and reports per interaction: latency, server CPU time, script reruns and CPU per rerun.
+Sessions are spread over worker processes so CPU time can be attributed per process.
+
+app.py counts full script runs and fragment-scoped reruns in session_state. AppTest executes
+a click inside an st.fragment as a full script run, so here fragment clicks show up as one
+full rerun each; under `streamlit run` they are counted as fragment reruns instead.
+
+Usage:
+    python ui_loadtest.py --sessions 40 --concurrency 4 --output ui_loadtest_report.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+SEARCH_QUERIES = [
+    "spicy chicken for dinner",
+    "something sweet",
+    "healthy vegetarian lunch",
+    "biryani",
+    "cold drink",
+    "",
+]
+
+
+class SessionDriver:
+    """One simulated user session: wraps an AppTest and records the cost of each interaction."""
+
+    def __init__(self, app_path, timeout, rng):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(app_path, default_timeout=timeout)
+        self.rng = rng
+        self.samples = []
+
+    def _run_counts(self):
+        state = self.at.session_state
+        script_runs = state['script_run_count'] if 'script_run_count' in state else 0
+        fragment_runs = state['fragment_run_count'] if 'fragment_run_count' in state else 0
+        return script_runs, fragment_runs
+
+    def interact(self, action, prepare=None):
+        """Apply `prepare(at)` (widget changes), run the app and record latency, CPU and reruns."""
+        if prepare is not None and prepare(self.at) is False:
+            return False  # Widget not on the page; nothing to measure
+        runs_before, fragments_before = self._run_counts()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        self.at.run()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        runs_after, fragments_after = self._run_counts()
+        self.samples.append({
+            'action': action,
+            'latency': wall,
+            'cpu': cpu,
+            'reruns': runs_after - runs_before,
+            'fragment_reruns': fragments_after - fragments_before,
+            'error': bool(self.at.exception),
+        })
+        return True
+
+    def click(self, key_prefix, pick_random=False):
+        """Prepare callback clicking the first (or a random) button whose key starts with key_prefix."""
+        def prepare(at):
+            buttons = [b for b in at.button if b.key and b.key.startswith(key_prefix)]
+            if not buttons:
+                return False
+            (self.rng.choice(buttons) if pick_random else buttons[0]).click()
+        return prepare
+
+    def run_flow(self, items_to_add=3):
+        """Search, add items, adjust quantity, remove one, checkout with cash and rate an item."""
+        self.interact('initial_load')
+        query = self.rng.choice(SEARCH_QUERIES)
+
+        def search(at):
+            at.text_input(key="user_query_input_main_page").input(query)
+            at.button(key="find_food_button_main_page").click()
+        self.interact('search', search)
+
+        for _ in range(items_to_add):
+            self.interact('add_to_cart', self.click('add_', pick_random=True))
+        self.interact('quantity_plus', self.click('plus_', pick_random=True))
+        self.interact('quantity_minus', self.click('minus_', pick_random=True))
+        self.interact('remove_from_cart', self.click('remove_'))
+        if self.interact('place_order', self.click('place_order_button')):
+            self.interact('confirm_order', self.click('confirm_cod_button'))
+            self.interact('back_to_menu', self.click('back_to_menu_from_order_details'))
+        self.interact('view_history', self.click('view_history_btn'))
+        self.interact('rate_item', self.click('rate_', pick_random=True))
+        return self.samples
+
+
+def _worker(worker_id, session_count, timeout, seed, items_to_add):
+    """Run session_count sessions sequentially in a scratch copy of data/ and return their samples."""
+    scratch_dir = tempfile.mkdtemp(prefix=f'quickbites_ui_{worker_id}_')
+    shutil.copytree(DATA_DIR, os.path.join(scratch_dir, 'data'))
+    os.chdir(scratch_dir)  # app.py and utils.py use relative data/ paths
+    os.environ['QUICKBITES_STATE_DIR'] = os.path.join(scratch_dir, 'data')  # ...and config.STATE_DIR, even if set
+    rng = random.Random(seed + worker_id)
+    samples = []
+    try:
+        for _ in range(session_count):
+            samples.extend(SessionDriver(APP_PATH, timeout, rng).run_flow(items_to_add))
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    return samples
+
+
+def summarize(samples, wall_seconds, sessions, concurrency):
+    """Aggregate samples per action: latency percentiles, CPU per interaction and per rerun."""
+    report = {
+        'sessions': sessions,
+        'concurrency': concurrency,
+        'wall_seconds': round(wall_seconds, 3),
+        'interactions': len(samples),
+        'errors': sum(1 for s in samples if s['error']),
+        'actions': {},
+    }
+    by_action = {}
+    for sample in samples:
+        by_action.setdefault(sample['action'], []).append(sample)
+    by_action['ALL'] = samples
+
+    for action, action_samples in by_action.items():
+        latency_ms = np.array([s['latency'] for s in action_samples]) * 1000.0
+        cpu_ms = np.array([s['cpu'] for s in action_samples]) * 1000.0
+        reruns = np.array([s['reruns'] for s in action_samples])
+        fragment_reruns = np.array([s['fragment_reruns'] for s in action_samples])
+        total_runs = int(reruns.sum() + fragment_reruns.sum())
+        report['actions'][action] = {
+            'count': len(action_samples),
+            'latency_p50_ms': round(float(np.percentile(latency_ms, 50)), 2),
+            'latency_p95_ms': round(float(np.percentile(latency_ms, 95)), 2),
+            'cpu_mean_ms': round(float(cpu_ms.mean()), 2),
+            'reruns_per_action': round(float(reruns.mean()), 2),
+            'fragment_reruns_per_action': round(float(fragment_reruns.mean()), 2),
+            'cpu_per_rerun_ms': round(float(cpu_ms.sum() / total_runs), 2) if total_runs else None,
+        }
+    return report
+
+
+def print_report(report):
+    print(f"Sessions: {report['sessions']}  Concurrency: {report['concurrency']}  "
+          f"Interactions: {report['interactions']}  Errors: {report['errors']}  Wall: {report['wall_seconds']:.1f}s")
+    header = (f"{'action':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'cpu ms':>10}"
+              f"{'reruns':>8}{'frag':>7}{'cpu/run':>10}")
+    print(header)
+    print("-" * len(header))
+    for action, stats in report['actions'].items():
+        cpu_per_run = f"{stats['cpu_per_rerun_ms']:.2f}" if stats['cpu_per_rerun_ms'] is not None else "-"
+        print(f"{action:<18}{stats['count']:>7}{stats['latency_p50_ms']:>10.1f}{stats['latency_p95_ms']:>10.1f}"
+              f"{stats['cpu_mean_ms']:>10.1f}{stats['reruns_per_action']:>8.2f}"
+              f"{stats['fragment_reruns_per_action']:>7.2f}{cpu_per_run:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent Streamlit sessions against app.py")
+    parser.add_argument('--sessions', type=int, default=20, help="Total sessions to simulate")
+    parser.add_argument('--concurrency', type=int, default=4, help="Worker processes running sessions in parallel")
+    parser.add_argument('--items', type=int, default=3, help="Items each session adds to the cart")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Seconds allowed per script run")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the JSON report here")
+    args = parser.parse_args()
+
+    concurrency = max(1, min(args.concurrency, args.sessions))
+    per_worker = [args.sessions // concurrency + (1 if i < args.sessions % concurrency else 0) for i in range(concurrency)]
+    start = time.perf_counter()
+    samples = []
+    with ProcessPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(_worker, i, n, args.timeout, args.seed, args.items)
+                   for i, n in enumerate(per_worker) if n]
+        for future in futures:
+            samples.extend(future.result())
+    report = summarize(samples, time.perf_counter() - start, args.sessions, concurrency)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
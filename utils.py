@@ -2,7 +2,11 @@ import json
 import os
 from datetime import datetime
 import uuid
+import weakref
 import logging # For potential logging if issues arise
+import numpy as np
+import pandas as pd
+from fuzzywuzzy import fuzz
 
 # --- Configuration (can be moved to a config.py if it grows) ---
 RATINGS_FILE_PATH = 'data/ratings.json'
@@ -62,6 +66,16 @@ def save_ratings(all_ratings_data):
     return save_json_file(RATINGS_FILE_PATH, all_ratings_data)
 
 
+# Called as callback(user_id, item_name, restaurant_name, rating_value, previous_rating) after a rating
+# is stored; previous_rating is the value it replaced (None for a new rating, 0 if it had been cleared)
+RATING_LISTENERS = []
+
+
+def add_rating_listener(callback):
+    """Register a callback to be notified of every rating stored by add_or_update_rating (e.g. item_cf.py, rating_stats.py)."""
+    RATING_LISTENERS.append(callback)
+
+
 def add_or_update_rating(user_id, item_name, restaurant_name, rating_value):
     """Add a new rating or update an existing one for a specific user and item."""
     if not all([user_id, item_name, restaurant_name]): # Basic validation
@@ -70,12 +84,14 @@ def add_or_update_rating(user_id, item_name, restaurant_name, rating_value):
         
     current_ratings_list = load_ratings()
     rating_updated = False
+    previous_rating = None
 
     for rating_entry in current_ratings_list:
         if rating_entry.get('user_id') == user_id and \
            rating_entry.get('item_name') == item_name and \
            rating_entry.get('restaurant_name') == restaurant_name:
             # Update existing rating
+            previous_rating = rating_entry.get('rating')
             rating_entry['rating'] = rating_value
             rating_entry['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             rating_updated = True
@@ -92,7 +108,26 @@ def add_or_update_rating(user_id, item_name, restaurant_name, rating_value):
         }
         current_ratings_list.append(new_rating)
     
-    return save_ratings(current_ratings_list)
+    saved = save_ratings(current_ratings_list)
+    if saved:
+        for listener in RATING_LISTENERS:
+            listener(user_id, item_name, restaurant_name, rating_value, previous_rating)
+    return saved
+
+
+# Called as callback(order) for every order placed (the order dict built by app.process_order)
+ORDER_LISTENERS = []
+
+
+def add_order_listener(callback):
+    """Register a callback to be notified of every placed order (e.g. co_purchase.py)."""
+    ORDER_LISTENERS.append(callback)
+
+
+def record_order(order):
+    """Notify the order listeners of a placed order."""
+    for listener in ORDER_LISTENERS:
+        listener(order)
 
 
 def get_user_ratings(user_id_to_find):
@@ -107,6 +142,16 @@ def get_user_ratings(user_id_to_find):
     return user_specific_ratings_dict
 
 
+def get_users_ratings(user_ids):
+    """get_user_ratings for several users with one read of the ratings file: {user_id: {(item, restaurant): rating}}."""
+    users_ratings = {user_id: {} for user_id in user_ids}
+    for rating_entry in load_ratings():
+        user_ratings = users_ratings.get(rating_entry.get('user_id'))
+        if user_ratings is not None:
+            user_ratings[(rating_entry.get('item_name'), rating_entry.get('restaurant_name'))] = rating_entry.get('rating')
+    return users_ratings
+
+
 def load_smart_cart_rules():
     """Load smart cart suggestion rules from the JSON file."""
     default_rules = {
@@ -118,6 +163,86 @@ def load_smart_cart_rules():
     return load_json_file(SMART_CART_RULES_FILE_PATH, default_data=default_rules)
 
 
+# Row positions per item name of each catalog DataFrame, keyed by id() and dropped when the DataFrame is collected
+_ITEM_ROWS = {}
+
+
+def item_rows_for(menu_df):
+    """{item name: its row positions in menu_df, ascending} of menu_df, built on first use."""
+    entry = _ITEM_ROWS.get(id(menu_df))
+    if entry is not None and entry[0]() is menu_df:
+        return entry[1]
+    codes, names = pd.factorize(menu_df['Item'])
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+    item_rows = {name: order[bounds[code]:bounds[code + 1]] for code, name in enumerate(names)}
+    key = id(menu_df)
+    _ITEM_ROWS[key] = (weakref.ref(menu_df, lambda _: _ITEM_ROWS.pop(key, None)), item_rows)
+    return item_rows
+
+
+def get_smart_cart_suggestions(cart_items, menu_df, smart_cart_rules, max_suggestions=3, learned_complements=None):
+    """
+    Suggest complementary menu items for the cart.
+    learned_complements(item_name), when given, returns complement names learned from past
+    orders (co_purchase.py); they come first, looked up by exact name (item_rows_for) and
+    preferably from the cart item's restaurant. The smart cart rules follow: rule keys are fuzzy-matched against
+    cart item names and each suggested name is looked up in menu_df (first match wins).
+    Returns a list of item dicts not already in the cart.
+    """
+    suggestions = []
+    if menu_df is None or menu_df.empty or not cart_items:
+        return suggestions
+
+    # Set of items already in cart for quick lookup (Item Name, Restaurant Name)
+    cart_item_identifiers = set((item['Item'], item.get('Restaurant')) for item in cart_items)
+    cart_item_names = set(name for name, _ in cart_item_identifiers)
+    suggested_keys = set()
+
+    def add_suggestion(item_to_suggest):
+        # Final check: ensure this specific (Item, Restaurant) combo is not in cart or already suggested
+        suggestion_key = (item_to_suggest['Item'], item_to_suggest.get('Restaurant'))
+        if suggestion_key not in cart_item_identifiers and suggestion_key not in suggested_keys:
+            suggested_keys.add(suggestion_key)
+            suggestions.append(item_to_suggest)
+
+    for cart_item_name, cart_restaurant in [(item['Item'], item.get('Restaurant')) for item in cart_items]:
+        if len(suggestions) >= max_suggestions: break
+
+        for learned_name in (learned_complements(cart_item_name) if learned_complements else ()):
+            if len(suggestions) >= max_suggestions: break
+            if learned_name in cart_item_names:
+                continue
+            rows = item_rows_for(menu_df).get(learned_name)
+            if rows is None:
+                continue
+            same_restaurant = rows[menu_df['Restaurant'].iloc[rows].to_numpy() == cart_restaurant]
+            add_suggestion(menu_df.iloc[same_restaurant[0] if len(same_restaurant) else rows[0]].to_dict())
+
+        matched_rule_key = None
+        # Fuzzy match against rule keys
+        for rule_key in smart_cart_rules.keys():
+            if fuzz.partial_ratio(cart_item_name.lower(), rule_key.lower()) > 85:
+                matched_rule_key = rule_key
+                break
+
+        if not matched_rule_key:
+            continue
+
+        for suggested_item_name in smart_cart_rules[matched_rule_key]:
+            if len(suggestions) >= max_suggestions: break
+            # Skip if any variant of this suggested item name is already in cart
+            if suggested_item_name in cart_item_names:
+                continue
+
+            # Find actual item from menu (any restaurant offering it)
+            matches = menu_df[menu_df['Item'].str.contains(suggested_item_name, case=False, na=False, regex=False)]
+            if matches.empty:
+                continue
+            add_suggestion(matches.iloc[0].to_dict()) # Pick first match
+    return suggestions
+
+
 # --- Optional/Advanced Utility Functions (not directly called by current main.py) ---
 
 def get_current_formatted_timestamp():